@@ -1,5 +1,9 @@
+from multiprocessing import freeze_support
+
 from src.fixture_processor.main import main
 
 
 if __name__ == '__main__':
+    # required for the batch workers in a frozen (pyinstaller) build.
+    freeze_support()
     main()
@@ -0,0 +1,164 @@
+"""
+This module contains a small helper used to run long
+tasks (such as parsing the fixture) in a worker thread,
+so the Tk mainloop stays responsive.
+
+Tk is not thread safe, so the worker never touches the
+widgets. Its progress, messages (message boxes) and result
+are put on a queue, which is polled from the mainloop
+(with 'after'), and the callbacks are called from there.
+"""
+
+import queue
+import logging
+import threading
+
+from src.fixture_processor.helper_functions import message_box as mb
+from src.fixture_processor.helper_functions import TaskCancelled
+
+
+fp_logger = logging.getLogger('fixture_processing.background_task')
+
+# how often the queue is checked for messages from the worker.
+POLL_INTERVAL = 0.05
+
+
+class BackgroundTask:
+    """
+    Calls function(*args, progress=report_progress) in a worker thread.
+
+    The function should call 'progress' regularly (with any arguments,
+    these are passed to on_progress), which is also where the worker
+    stops once the task has been cancelled.
+
+    on_done is called with the result, or on_error with the exception.
+    Once cancelled, none of the callbacks are called.
+
+    Message boxes shown by the worker are passed to
+    on_message(kind, title, message), by default they are shown.
+    """
+
+    def __init__(self, function, *args, on_progress=None, on_done=None,
+                 on_error=None, on_message=None):
+        self.function = function
+        self.args = args
+
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_message = on_message
+
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.widget = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def start(self, widget=None):
+        """
+        starts the worker, if a widget is given, the
+        messages are polled using its mainloop.
+        """
+
+        self.thread.start()
+
+        if widget is not None:
+            self.widget = widget
+            self.schedule_poll()
+
+        return self
+
+    def cancel(self):
+        "stops the worker (at its next progress report)."
+        self.cancel_event.set()
+
+    def report_progress(self, *progress):
+        """
+        called by the worker, raises TaskCancelled
+        once the task has been cancelled.
+        """
+
+        if self.cancelled:
+            raise TaskCancelled()
+
+        self.messages.put(("progress", progress))
+
+    def queue_message(self, kind, title, message):
+        "called (via message_box) when the worker shows a message."
+        self.messages.put(("message", (kind, title, message)))
+
+    def show_message(self, kind, title, message):
+        if self.on_message is not None:
+            self.on_message(kind, title, message)
+        else:
+            getattr(mb, f"show{kind}")(title, message)
+
+    def run(self):
+        "the body of the worker thread."
+
+        try:
+            with mb.redirect(self.queue_message):
+                result = self.function(*self.args, progress=self.report_progress)
+
+        except TaskCancelled:
+            fp_logger.info("%s was cancelled", self.function.__name__)
+            self.messages.put(("cancelled", None))
+
+        except Exception as error:  # pylint: disable=broad-except
+            fp_logger.exception("%s failed", self.function.__name__)
+            self.messages.put(("error", error))
+
+        else:
+            self.messages.put(("done", result))
+
+    def poll(self):
+        """
+        passes the queued messages to the callbacks (in the calling
+        thread), only the latest progress is passed on. returns
+        False once the task has finished.
+        """
+
+        progress = None
+
+        while True:
+            try:
+                kind, value = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                progress = value
+                continue
+
+            if kind == "message":
+                if not self.cancelled:
+                    self.show_message(*value)
+                continue
+
+            # the task has finished.
+            if self.cancelled:
+                return False
+
+            if progress is not None and self.on_progress is not None:
+                self.on_progress(*progress)
+
+            callback = self.on_done if kind == "done" else self.on_error
+            if kind != "cancelled" and callback is not None:
+                callback(value)
+
+            return False
+
+        if progress is not None and self.on_progress is not None and not self.cancelled:
+            self.on_progress(*progress)
+
+        return True
+
+    def schedule_poll(self):
+        "polls the queue, until the task has finished."
+
+        if self.poll():
+            self.widget.after(int(POLL_INTERVAL * 1000), self.schedule_poll)
@@ -0,0 +1,292 @@
+"""
+This module contains the code used to process many
+fixture directories in one go, without the window.
+
+Each fixture is processed in its own worker process
+(using the same pipeline as the 'Process Wires & Inserts'
+button), using the options saved in the fixtures
+'user_options.ini' (or the defaults if there is none).
+
+Progress is reported as each fixture completes, and
+a summary table is reported at the end.
+"""
+
+import os
+import glob
+import time
+import logging
+
+from pathlib import Path
+from typing import NamedTuple
+from logging.handlers import QueueHandler
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src.fixture_processor.helper_functions import message_box
+from src.fixture_processor.fixture_processor_form import GenerationTuple, USER_OPTIONS_FILE, fp_options
+from src.fixture_processor.fixture_processor_form import run_fixture_processing
+from src.fixture_processor.options_lib import fixture_processing_options
+
+
+fp_logger = logging.getLogger('fixture_processing.batch_processor')
+
+
+class BatchResult(NamedTuple):
+    fixture_dir: str
+    success: bool
+    duration: float
+    message: str = ""
+    up_to_date: bool = False
+
+    @property
+    def status(self):
+        if not self.success:
+            return "FAILED"
+
+        return "UP TO DATE" if self.up_to_date else "OK"
+
+
+def find_fixture_dirs(patterns):
+    """
+    Each pattern can be a fixture directory, a path to a
+    'fixture.o' file, or a glob of either ('**' is allowed).
+
+    returns the matching fixture directories (directories
+    containing a 'fixture.o'), in the order given,
+    without duplicates.
+    """
+
+    fixture_dirs = []
+    found = set()
+
+    for pattern in patterns:
+
+        matches = sorted(glob.glob(pattern, recursive=True))
+
+        # a pattern with no glob characters which
+        # doesn't exist is still reported (as a failure)
+        if not matches and not glob.has_magic(pattern):
+            matches = [pattern]
+
+        for match in matches:
+            path = Path(match)
+
+            if path.name == "fixture.o":
+                path = path.parent
+
+            if glob.has_magic(pattern) and not (path / "fixture.o").is_file():
+                continue
+
+            path = path.resolve()
+            if path in found:
+                continue
+
+            found.add(path)
+            fixture_dirs.append(path)
+
+    return fixture_dirs
+
+
+def load_processing_options(fixture_dir):
+    """
+    loads the processing options saved in the fixtures
+    user options file, falling back on the defaults
+    when the file (or an option) is missing.
+    """
+
+    user_options_path = fixture_dir / USER_OPTIONS_FILE
+
+    if user_options_path.is_file():
+        with user_options_path.open() as f_user_options:
+            user_options = fp_options.load(f_user_options)
+    else:
+        user_options = fp_options.load()
+
+    option_values = {name: value
+                     for section in user_options.values()
+                     for name, value in section.items()}
+
+    return fixture_processing_options.encode_options(option_values)
+
+
+def process_fixture(fixture_dir, profile_options=None):
+    """
+    The worker function, processes a single fixture directory.
+
+    Any message box the pipeline would normally display is
+    collected instead, errors are returned in the result message.
+
+    if profile_options is given, each stage is profiled,
+    see performance_lib.stage_profiler.
+    """
+
+    errors = []
+    up_to_date = False
+
+    def collect_message(kind, title, message):
+        if kind == "error":
+            errors.append(" ".join(message.split()))
+
+    start = time.perf_counter()
+
+    try:
+        if not (fixture_dir / "fixture.o").is_file():
+            raise FileNotFoundError(f"no 'fixture.o' in {fixture_dir}")
+
+        processing_options = load_processing_options(fixture_dir)
+
+        generation_flags = GenerationTuple(processing=True,
+                                           gplane_plot=False,
+                                           wires_plot=False)
+
+        with message_box.redirect(collect_message):
+            processing_result = run_fixture_processing(fixture_dir, processing_options,
+                                                       generation_flags,
+                                                       profile_options=profile_options)
+
+        success = processing_result.success
+        up_to_date = success and not processing_result.processed
+
+    except Exception as err:  # pylint: disable=broad-except
+        success = False
+        errors.append(f"{type(err).__name__}: {err}")
+
+    if not success and not errors:
+        errors.append("no targets were output")
+
+    duration = time.perf_counter() - start
+
+    return BatchResult(str(fixture_dir), bool(success), duration,
+                       "; ".join(errors), up_to_date)
+
+
+def start_worker_logging(log_queue, level):
+    """
+    the worker process initializer, the worker's log records are
+    sent (through log_queue) to the main process, which writes them.
+    """
+
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [QueueHandler(log_queue)]
+    root_logger.setLevel(level)
+
+
+def run_batch(fixture_dirs, workers=None, max_pending=None, report=print,
+              profile_options=None, log_queue=None):
+    """
+    processes each fixture directory on a pool of worker processes.
+
+    At most 'max_pending' fixtures (default twice the number of
+    workers) are queued at any one time, so memory stays flat
+    however many fixtures are given.
+
+    'report' is called with a line of text as each fixture completes.
+    if profile_options is given, each fixture is profiled.
+    if log_queue (a multiprocessing queue) is given, the workers log to it.
+    returns a list of BatchResult, in the order they completed.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if max_pending is None:
+        max_pending = workers * 2
+
+    total = len(fixture_dirs)
+    fixture_iter = iter(fixture_dirs)
+
+    results = []
+    pending = set()
+
+    if log_queue is None:
+        initializer, initargs = None, ()
+    else:
+        initializer, initargs = start_worker_logging, (log_queue, logging.getLogger().level)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as executor:
+
+        while True:
+
+            # keep the queue topped up (but bounded)
+            while len(pending) < max_pending:
+                fixture_dir = next(fixture_iter, None)
+                if fixture_dir is None:
+                    break
+                pending.add(executor.submit(process_fixture, fixture_dir, profile_options))
+
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                result = future.result()
+                results.append(result)
+
+                fp_logger.info("%s %s (%.2fs) %s", result.status,
+                               result.fixture_dir, result.duration, result.message)
+
+                report(f"[{len(results):>{len(str(total))}}/{total}] "
+                       f"{result.status:<10} {result.fixture_dir} ({result.duration:.2f}s)")
+
+    return results
+
+
+def format_summary(results):
+    """
+    creates a table summarising the batch results.
+    """
+
+    headers = ("Status", "Time (s)", "Fixture", "Message")
+
+    rows = [(result.status, f"{result.duration:.2f}",
+             result.fixture_dir, result.message)
+            for result in sorted(results, key=lambda result: result.fixture_dir)]
+
+    widths = [max([len(header)] + [len(row[i]) for row in rows])
+              for i, header in enumerate(headers[:-1])]
+
+    def format_row(row):
+        columns = [f"{value:<{width}}" for value, width in zip(row, widths)]
+        return " | ".join(columns + [row[-1]]).rstrip()
+
+    lines = [format_row(headers),
+             "-+-".join("-" * width for width in widths) + "-+-" + "-" * len(headers[-1])]
+    lines.extend(format_row(row) for row in rows)
+
+    failures = sum(not result.success for result in results)
+    up_to_date = sum(result.up_to_date for result in results)
+    total_time = sum(result.duration for result in results)
+
+    lines.append("")
+    lines.append(f"{len(results) - failures} succeeded ({up_to_date} up to date), {failures} failed, "
+                 f"{total_time:.2f}s total processing time.")
+
+    return "\n".join(lines)
+
+
+def batch_main(patterns, workers=None, report=print, profile_options=None,
+               log_queue=None):
+    """
+    The entry point for the batch command.
+    returns True if every fixture was processed successfully.
+    """
+
+    fixture_dirs = find_fixture_dirs(patterns)
+
+    if not fixture_dirs:
+        report("No fixture directories found.")
+        return False
+
+    report(f"Processing {len(fixture_dirs)} fixture(s) "
+           f"using {workers or os.cpu_count() or 1} worker(s).")
+
+    start = time.perf_counter()
+    results = run_batch(fixture_dirs, workers=workers, report=report,
+                        profile_options=profile_options, log_queue=log_queue)
+
+    report("")
+    report(format_summary(results))
+    report(f"Elapsed time: {time.perf_counter() - start:.2f}s")
+
+    return all(result.success for result in results)
@@ -2,6 +2,10 @@
 This module contains useful file related functions
 that can and will be used from anywhere in the program.
 """
+import io
+import os
+import hashlib
+import threading
 import subprocess
 import logging
 from pathlib import Path
@@ -53,3 +57,66 @@ def open_file_for_editing(file_path: Path):
         return
 
     subprocess.Popen('{0} "{1}"'.format("notepad", str(file_path)))
+
+
+def hash_text_lines(lines, ignore_prefixes=()):
+    """
+    returns the sha256 of the lines, skipping any
+    lines starting with one of the ignore_prefixes.
+    """
+
+    text_hash = hashlib.sha256()
+
+    for line in lines:
+        if ignore_prefixes and line.startswith(ignore_prefixes):
+            continue
+        text_hash.update(line.encode("utf-8", "surrogateescape"))
+
+    return text_hash.hexdigest()
+
+
+def write_if_changed(file_path: Path, text: str, ignore_prefixes=()):
+    """
+    writes text to file_path, unless the file already contains
+    the same text (lines starting with one of ignore_prefixes,
+    such as a date line, are not compared).
+
+    The text is written to a temporary file next to file_path,
+    which then replaces file_path in one step. An interrupted
+    write never leaves a partly written file_path.
+
+    returns True if the file was written, False if it was unchanged.
+    raises PermissionError if the file cannot be replaced
+    (for instance, if it is open in another program).
+    """
+
+    ignore_prefixes = tuple(ignore_prefixes)
+
+    if file_path.is_file():
+        # (splitlines would also split on form feeds)
+        new_hash = hash_text_lines(io.StringIO(text), ignore_prefixes)
+
+        with file_path.open(errors="surrogateescape") as f_old:
+            old_hash = hash_text_lines(f_old, ignore_prefixes)
+
+        if new_hash == old_hash:
+            logging.info("'%s' is unchanged, it has not been re-written", file_path)
+            return False
+
+    # unique to this process and thread.
+    temp_path = file_path.with_name(
+        f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        with temp_path.open("w") as f_temp:
+            f_temp.write(text)
+            f_temp.flush()
+            os.fsync(f_temp.fileno())
+
+        os.replace(temp_path, file_path)
+
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+    return True
@@ -1,18 +1,53 @@
 """
 This module holds all of the code to
 extract relevent data from the fixture file
-and draw it to the turtle canvas
+and draw it to the canvas
 """
 
 import re
-import turtle
-from turtle import Vec2D
 
 import tkinter as tk
 
+from src.fixture_processor.helper_functions import message_box as mb
+from src.fixture_processor.background_task import BackgroundTask
 from src.fixture_processor.fixture_functions import fixture_input as fi
 
 
+# every item drawn is tagged with PLOT_TAG,
+# along with the tag of its layer.
+PLOT_TAG = "plot"
+
+PANEL_OUTLINE_TAG = "panel_outline"
+BOARD_OUTLINE_TAG = "board_outline"
+PANEL_TOOLING_TAG = "panel_tooling"
+BOARD_TOOLING_TAG = "board_tooling"
+BOARD_NUMBER_TAG = "board_number"
+
+# the zoom applied by each mouse wheel step,
+# and the limits of the zoom.
+ZOOM_STEP = 1.2
+MIN_ZOOM = 0.1
+MAX_ZOOM = 50
+
+
+def canvas_coords(locations, close=False):
+    """
+    flattens plot locations (origin at the centre, y up)
+    into canvas coordinates (y down), so an outline can be
+    created with a single call. if close is True, the first
+    location is repeated at the end.
+    """
+
+    coords = []
+    for x_coord, y_coord in locations:
+        coords.extend((x_coord, -y_coord))
+
+    if close:
+        coords.extend(coords[:2])
+
+    return coords
+
+
 class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
     """
     The frame showing the canvas of
@@ -31,6 +66,15 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
         self.program_options = {}
         self.raw_fixture_data = tuple()
 
+        # the view (zoom and pan) applied to the drawn
+        # items, a location is shown at location * scale + offset.
+        self.view_scale = 1.0
+        self.view_offset = (0, 0)
+        self.drag_start = None
+
+        # the fixture being loaded (in the background).
+        self.load_task = None
+
         self.window = window
         self.create_widgets()
 
@@ -59,21 +103,92 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
         This method is called in __init__
         in order to fill this frame with widgets.
         """
-        # create canvas for holding turtle screen
+        # create canvas for holding the plot
         self.cnv_plot = tk.Canvas(master=self, relief=tk.SUNKEN)
         self.cnv_plot["width"] = self.canvas_width
         self.cnv_plot["height"] = self.canvas_height
+        self.cnv_plot["background"] = "#202020"
         self.cnv_plot.pack()
 
-        # create turtle screen with which to place RawTurtle
-        self.turtle_screen = turtle.TurtleScreen(self.cnv_plot)
-        self.turtle_screen.bgcolor("#202020")
-        self.turtle_screen.tracer(0)
+        # place the origin in the centre of the canvas.
+        width, height = int(self.canvas_width), int(self.canvas_height)
+        self.cnv_plot.config(scrollregion=(-width//2, -height//2, width//2, height//2))
+
+        # mouse wheel zoom (windows / mac, then linux),
+        # drag to pan and double click to reset the view.
+        self.cnv_plot.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.cnv_plot.bind("<Button-4>", self.on_mouse_wheel)
+        self.cnv_plot.bind("<Button-5>", self.on_mouse_wheel)
+        self.cnv_plot.bind("<ButtonPress-1>", self.on_drag_start)
+        self.cnv_plot.bind("<B1-Motion>", self.on_drag)
+        self.cnv_plot.bind("<ButtonRelease-1>", self.on_drag_end)
+        self.cnv_plot.bind("<Double-Button-1>", lambda event: self.reset_view())
+
+    def on_mouse_wheel(self, event):
+        "zooms in / out around the mouse pointer"
+
+        if event.num == 4 or event.delta > 0:
+            factor = ZOOM_STEP
+        else:
+            factor = 1 / ZOOM_STEP
+
+        self.zoom_view(factor, self.cnv_plot.canvasx(event.x), self.cnv_plot.canvasy(event.y))
+
+    def on_drag_start(self, event):
+        self.drag_start = (event.x, event.y)
+
+    def on_drag(self, event):
+        "pans the view with the mouse"
+
+        if self.drag_start is None:
+            return
+
+        start_x, start_y = self.drag_start
+        self.drag_start = (event.x, event.y)
+
+        self.pan_view(event.x - start_x, event.y - start_y)
+
+    def on_drag_end(self, event):
+        self.drag_start = None
+
+    def zoom_view(self, factor, x_coord, y_coord):
+        """
+        scales the drawn items around the (canvas) coordinate,
+        the locations are not processed again.
+        """
+
+        new_scale = min(max(self.view_scale * factor, MIN_ZOOM), MAX_ZOOM)
+        factor = new_scale / self.view_scale
 
-        # place raw turtle.
-        self.pen = turtle.RawTurtle(self.turtle_screen)
-        self.pen.hideturtle()
-        self.pen.speed(0)
+        if factor == 1:
+            return
+
+        self.cnv_plot.scale(PLOT_TAG, x_coord, y_coord, factor, factor)
+
+        offset_x, offset_y = self.view_offset
+        self.view_scale = new_scale
+        self.view_offset = (x_coord + (offset_x - x_coord) * factor,
+                            y_coord + (offset_y - y_coord) * factor)
+
+    def pan_view(self, x_offset, y_offset):
+        "moves the drawn items (in canvas units)"
+
+        self.cnv_plot.move(PLOT_TAG, x_offset, y_offset)
+
+        offset_x, offset_y = self.view_offset
+        self.view_offset = (offset_x + x_offset, offset_y + y_offset)
+
+    def reset_view(self):
+        "undoes any zoom / pan applied to the drawn items"
+
+        offset_x, offset_y = self.view_offset
+        self.cnv_plot.move(PLOT_TAG, -offset_x, -offset_y)
+
+        factor = 1 / self.view_scale
+        self.cnv_plot.scale(PLOT_TAG, 0, 0, factor, factor)
+
+        self.view_scale = 1.0
+        self.view_offset = (0, 0)
 
     def get_program_options(self):
         "loads the program options from the uni file."
@@ -85,19 +200,49 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
         processes the dimensions so they will fit the canvas
         size, then draws them to the screen.
         """
+
+        # nothing to draw until the fixture has loaded.
+        if not self.raw_fixture_data:
+            return
+
         self.get_program_options()
         self.process_locations()
         self.update_plot()
 
     def load_fixture_and_draw(self):
         """
-        This method parses the fixture file,
-        and outputs the result on the canvas.
+        This method parses the fixture file (in the background),
+        and outputs the result on the canvas once it has loaded.
+        Any load already in progress is cancelled.
         """
 
-        self.raw_fixture_data = fi.get_outline_info(self.fixture_path)
+        if self.load_task is not None:
+            self.load_task.cancel()
+
+        self.load_task = BackgroundTask(
+            fi.get_outline_info, self.fixture_path,
+            on_progress=self.show_load_progress,
+            on_done=self.fixture_loaded,
+            on_error=self.fixture_load_failed).start(self)
+
+    def show_load_progress(self, chars_read, file_size, board_count):
+        percent = 100 * chars_read / max(file_size, 1)
+        self.window.show_status(
+            f"Loading fixture.o... {percent:.0f}% ({board_count} boards found)")
+
+    def fixture_loaded(self, raw_fixture_data):
+        self.load_task = None
+        self.window.show_status()
+
+        self.raw_fixture_data = raw_fixture_data
         self.draw_fixture()
 
+    def fixture_load_failed(self, error):
+        self.load_task = None
+        self.window.show_status()
+
+        mb.showerror("ERROR", f"    Unable to load the fixture.o file:\n    {error}")
+
     def process_locations(self):
         """
         This function scales all of the locations so that
@@ -109,6 +254,10 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
         seek_offset provides a method to "move" L, R, U, D
         """
 
+        # turtle is slow to import, so it is imported
+        # once the fixture is drawn (not at startup).
+        from turtle import Vec2D
+
         outlines, tooling = self.raw_fixture_data
 
         self.offset_outlines = {}
@@ -251,12 +400,14 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
 
         outlines, tooling = self.offset_outlines, self.offset_tooling
 
-        self.turtle_screen.bgcolor(background_colour)
+        canvas = self.cnv_plot
+        canvas["background"] = background_colour
 
-        self.pen.clear()
+        canvas.delete(PLOT_TAG)
 
-        self.pen.hideturtle()
-        self.pen.speed(0)
+        # the new items are drawn without any zoom / pan.
+        self.view_scale = 1.0
+        self.view_offset = (0, 0)
 
         for name, locations in outlines.items():
 
@@ -266,45 +417,27 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
                 continue
 
             if name.startswith("P_"):
-                self.pen.pencolor(panel_outline_colour)
+                colour, tag = panel_outline_colour, PANEL_OUTLINE_TAG
             else:
-                self.pen.pencolor(board_outline_colour)
+                colour, tag = board_outline_colour, BOARD_OUTLINE_TAG
 
-            initial_location = locations[0]
-
-            # send the pin to the starting location.
-            self.pen.penup()
-            self.pen.goto(initial_location)
-            self.pen.pendown()
-
-            # draw the outline lines.
-            for loc in locations:
-                self.pen.goto(loc)
-
-            # ensure the pen goes to the initial point
-            # (to ensure the box is complete & without gaps
-            self.pen.goto(initial_location)
-
-            # lift pen, to move onto the next outline.
-            self.pen.penup()
+            # one item per outline, closed back
+            # to the initial location (without gaps).
+            canvas.create_line(*canvas_coords(locations, close=True),
+                               fill=colour, tags=(PLOT_TAG, tag))
 
         # add the tooling holes.
         for name, locations in tooling.items():
 
             if name.startswith("P_"):
-                self.pen.pencolor(panel_tooling_colour)
-                self.pen.fillcolor(panel_tooling_colour)
+                colour, tag = panel_tooling_colour, PANEL_TOOLING_TAG
             else:
-                self.pen.pencolor(board_tooling_colour)
-                self.pen.fillcolor(board_tooling_colour)
+                colour, tag = board_tooling_colour, BOARD_TOOLING_TAG
 
-            for width, location in locations:
-                self.pen.goto(location)
-                self.pen.pendown()
-                self.pen.begin_fill()
-                self.pen.circle(width)
-                self.pen.end_fill()
-                self.pen.penup()
+            for width, (x_coord, y_coord) in locations:
+                canvas.create_oval(x_coord - width, -y_coord - width,
+                                   x_coord + width, -y_coord + width,
+                                   outline=colour, fill=colour, tags=(PLOT_TAG, tag))
 
         # add the board numbers where relevent.
         all_names = outlines.keys()
@@ -312,7 +445,6 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
                                list(all_names)
                                if name.startswith("B_")]
 
-        self.pen.pencolor(text_colour)
         if self.panel_fixture:
 
             for name in board_outline_names:
@@ -320,13 +452,7 @@ class FixtureCanvas(tk.Frame):  # pylint: disable=too-many-ancestors
                 board_number = str(re.split(r"[:%]", name)[-1])
 
                 font = ("Arial", 15, "normal")
-                text_centre = self.board_center[name]
-
-                text_x_offset = -5*len(board_number)
-
-                self.pen.goto(text_centre + Vec2D(text_x_offset, -12))
-                self.pen.pendown()
-                self.pen.write(board_number, font=font)
-                self.pen.penup()
+                text_x, text_y = self.board_center[name]
 
-        self.turtle_screen.update()
+                canvas.create_text(text_x, -text_y, text=board_number, font=font,
+                                   fill=text_colour, tags=(PLOT_TAG, BOARD_NUMBER_TAG))
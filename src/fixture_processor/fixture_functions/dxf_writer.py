@@ -0,0 +1,149 @@
+"""
+This module contains a streaming DXF (R12) writer used
+to output the fixture plots.
+
+dxfwrite keeps every entity of a drawing in memory until
+it is saved, which for a large fixture (~100k wires) is
+several hundred megabytes of small objects. Here each
+entity is formatted as soon as it is added and spooled to
+a temporary file, only the layers are kept.
+
+When saved, dxfwrite is still used for the header, tables
+and blocks (so the layer table is written ahead of the
+entities), and the spooled entities are copied after them.
+The output is identical to that of a dxfwrite drawing.
+"""
+
+import shutil
+import tempfile
+
+from typing import NamedTuple, Tuple
+
+from dxfwrite import DXFEngine as dxf
+from dxfwrite.base import tags2str, writetags
+from dxfwrite.util import to_string
+
+
+# the encoding used by dxfwrite for R12 drawings.
+DXF_ENCODING = "cp1252"
+
+END_OF_SECTION = "  0\nENDSEC\n"
+END_OF_FILE = "  0\nEOF\n"
+
+
+def format_point(point, code=10):
+    "returns the tags of a 2D point (z is always 0)"
+    x, y = point
+    return f"{code:3d}\n{float(x)}\n{code + 10:3d}\n{float(y)}\n{code + 20:3d}\n0.0\n"
+
+
+class DXFLine(NamedTuple):
+    start: Tuple
+    end: Tuple
+
+    def to_dxf(self, layer_tags):
+        return ("  0\nLINE\n" + layer_tags +
+                format_point(self.start, 10) + format_point(self.end, 11))
+
+
+class DXFCircle(NamedTuple):
+    radius: float
+    center: Tuple
+
+    def to_dxf(self, layer_tags):
+        return ("  0\nCIRCLE\n" + layer_tags +
+                format_point(self.center) + f" 40\n{float(self.radius)}\n")
+
+
+class DXFText(NamedTuple):
+    text: str
+    insert: Tuple
+    height: float
+
+    def to_dxf(self, layer_tags):
+        return ("  0\nTEXT\n" + layer_tags + format_point(self.insert) +
+                f" 40\n{float(self.height)}\n  1\n{to_string(self.text)}\n")
+
+
+class DXFStreamWriter:
+    """
+    A drop in replacement for the parts of a dxfwrite
+    drawing used by the plots. Use as a context manager,
+    so the spooled entities are removed.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.header = {}
+
+        # name -> (layer attributes, off), in the order added.
+        self.layers = {}
+
+        # the tags for each (layer, colour) used.
+        self.layer_tags = {}
+
+        self.spool = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.spool.close()
+
+    def add_layer(self, name, off=False, **kwargs):
+        """
+        adds (or replaces) a layer definition, the layer is
+        switched off (hidden) if 'off' is True.
+        """
+        self.layers[name] = (kwargs, off)
+
+    def add(self, entity, layer, color=None):
+        "formats the entity and writes it to the spool"
+
+        key = (layer, color)
+        layer_tags = self.layer_tags.get(key)
+
+        if layer_tags is None:
+            layer_tags = f"  8\n{to_string(layer)}\n"
+            if color is not None:
+                layer_tags = f" 62\n{color}\n" + layer_tags
+            self.layer_tags[key] = layer_tags
+
+        self.spool.write(entity.to_dxf(layer_tags))
+
+    def save(self):
+        "writes the drawing, followed by the spooled entities"
+
+        drawing = dxf.drawing(self.filename)
+
+        # remove default layers
+        drawing.layers.clear()
+
+        for name, (kwargs, off) in self.layers.items():
+            layer_object = drawing.add_layer(name, **kwargs)
+            if off:
+                layer_object.off()
+
+        for key, value in self.header.items():
+            drawing.header[key] = value
+
+        # the entities section (the default viewport only)
+        entities = tags2str(drawing.entities)
+        entities = entities[:-len(END_OF_SECTION)]
+
+        with open(self.filename, "w", encoding=DXF_ENCODING, errors="replace") as file:
+            writetags(file, drawing.header)
+            writetags(file, drawing.tables)
+            writetags(file, drawing.blocks)
+
+            file.write(entities)
+
+            self.spool.flush()
+            self.spool.seek(0)
+            shutil.copyfileobj(self.spool, file)
+
+            file.write(END_OF_SECTION)
+            file.write(END_OF_FILE)
@@ -38,7 +38,11 @@ from src.fixture_processor.fixture_functions import fixture_maths as fm
 from src.fixture_processor.fixture_functions import fixture_input as fi
 from src.fixture_processor.fixture_functions import output_data as od
 from src.fixture_processor.fixture_functions import fixture_processing as fp
+from src.fixture_processor.fixture_functions import ground_index as gi
 
+from src.fixture_processor.fixture_functions import output_manifest as om
+from src.fixture_processor.fixture_functions import parse_cache as pc
+from src.fixture_processor.fixture_functions.lookup_misses import LookupMisses
 from src.fixture_processor.fixture_functions.fixture_output import output_wires_inserts
 
 
@@ -48,11 +52,13 @@ from src.fixture_processor.options_lib import fixture_processing_options
 # from pathlib import Path
 from collections import OrderedDict # , namedtuple 
 
-from tkinter import messagebox as mb
+from src.fixture_processor.helper_functions import message_box as mb
+from src.fixture_processor.helper_functions import TaskCancelled
 from decimal import Decimal
 import re
 import logging
 import typing
+import functools
 
 fp_logger = logging.getLogger('fixture_processing')
 
@@ -200,6 +206,14 @@ class FixtureTuple(typing.NamedTuple):
         return (self.top_wires, self.top_inserts)
 
 
+class ProcessingResult(typing.NamedTuple):
+    success: bool
+    # the targets skipped, as nothing had changed.
+    up_to_date: tuple = ()
+    # the targets which were processed and output.
+    processed: tuple = ()
+
+
 FIXTURE_TARGETS = fixture_processing_options.FIXTURE_TARGETS
 
 
@@ -323,19 +337,23 @@ def diff_lookup(pins_lookup, brc_lookup, performance_flag=True):
         col_diff = abs(Decimal(fix_col) - Decimal(ins_col))
 
         if row_diff <= 0.01 and col_diff < 0.1:
-            fp_logger.info(
-                "Using %s due to a row diff of %s and a col diff of %s", key, row_diff, col_diff)
+            if fp_logger.isEnabledFor(logging.DEBUG):
+                fp_logger.debug(
+                    "Using %s due to a row diff of %s and a col diff of %s", key, row_diff, col_diff)
             return value
 
     # if unable to find result, return empty string.
     return ""
 
 
-def lookup_pin_id(pins_lookup, brc, node):
+def lookup_pin_id(pins_lookup, brc, node, misses=None):
     """
     This function works out the pin ID of the brc extracted from the inserts file.
 
     This will be useful for applying filters and offsets in the future.
+
+    pins which are not found (or only found allowing for rounding)
+    are added to misses (a LookupMisses), if provided.
     """
 
     # replace the *XXXX* with (XXXX)
@@ -345,27 +363,24 @@ def lookup_pin_id(pins_lookup, brc, node):
     else:
         brc_lookup = brc
 
-    if brc_lookup in pins_lookup:
-        x, y = pins_lookup[brc_lookup].offset
+    pin_id = pins_lookup.get(brc_lookup)
+    if pin_id is not None:
+        return pin_id
 
-        return pins_lookup[brc_lookup]
+    pin_res = diff_lookup(pins_lookup, brc_lookup)
 
-    if brc == brc_lookup:
-        fp_logger.info("not found: %s, node name: %s", brc, node)
+    if pin_res == "":
+        pin_res = diff_lookup(pins_lookup, brc_lookup, False)
 
-    else:
-        fp_logger.info(
-            "not found: %s (Using: %s), node name: %s ",
-            brc,
-            brc_lookup,
-            node)
+    if misses is not None:
+        kind = "pin not found" if pin_res == "" else "pin matched with rounding"
 
-    pin_res = diff_lookup(pins_lookup, brc_lookup)
-
-    if pin_res != "":
-        return pin_res
+        if brc == brc_lookup:
+            misses.add(kind, node, "%s, node name: %s", brc, node)
+        else:
+            misses.add(kind, node, "%s (Using: %s), node name: %s", brc, brc_lookup, node)
 
-    return diff_lookup(pins_lookup, brc_lookup, False)
+    return pin_res
 
 
 def inv_coord(coord):
@@ -377,10 +392,13 @@ def inv_coord(coord):
     return (coord_x, -coord_y)
 
 
-def parse_inserts_line(raw_line, pins_lookup, probe_dict, top_flag):
+def parse_inserts_line(raw_line, pins_lookup, probe_dict, top_flag, misses=None):
     """
     This function is a subset of the get_inserts function.
     it is intended to extract the data from a single inserts line.
+
+    the pins and probes which are not found in the fixture.o
+    are added to misses (a LookupMisses), if provided.
     """
 
     # initialise the default data
@@ -448,7 +466,7 @@ def parse_inserts_line(raw_line, pins_lookup, probe_dict, top_flag):
                 spring, _, node, device = split_line + [""]
 
         if insert_type in ["Pin", "Offset"]:
-            fix_id = lookup_pin_id(pins_lookup, brc, node)
+            fix_id = lookup_pin_id(pins_lookup, brc, node, misses)
         elif insert_type == "Transfer":
             fix_id = ""
             if node == "<OTHER>":
@@ -469,9 +487,10 @@ def parse_inserts_line(raw_line, pins_lookup, probe_dict, top_flag):
             if matched_prb_count == 1:
                 fix_id = matched[0].name
 
-            if fix_id == "":
-                fp_logger.info("unable to find probe name for node {} at inserts location: {}, fixture locations: {}".format(
-                    node, coord, probe_list))
+            if fix_id == "" and misses is not None:
+                misses.add("probe not found", node,
+                           "node %s at inserts location: %s, fixture locations: %s",
+                           node, coord, probe_list)
 
         elif insert_type.endswith(" mil"):
             fix_id = ""
@@ -485,9 +504,10 @@ def parse_inserts_line(raw_line, pins_lookup, probe_dict, top_flag):
             if matched_prb_count == 1:
                 fix_id = matched[0].name
 
-            if fix_id == "":
-                fp_logger.info("unable to find probe name for node {} at inserts location: {}, fixture locations: {}".format(
-                    node, coord, probe_list))
+            if fix_id == "" and misses is not None:
+                misses.add("probe not found", node,
+                           "node %s at inserts location: %s, fixture locations: %s",
+                           node, coord, probe_list)
 
         else:
             fix_id = ""
@@ -511,6 +531,8 @@ def get_inserts(fixture_path, pins_lookup, probe_dict):
     inserts = OrderedDict()
     top_inserts = OrderedDict()
 
+    misses = LookupMisses("inserts")
+
     inserts_path = fixture_path / "inserts"
     with inserts_path.open() as f_handle:
         top_flag = False
@@ -528,7 +550,7 @@ def get_inserts(fixture_path, pins_lookup, probe_dict):
                 continue
 
             x_y, inserts_data = parse_inserts_line(
-                line, pins_lookup, probe_dict, top_flag)
+                line, pins_lookup, probe_dict, top_flag, misses)
 
             if top_flag:
                 top_inserts[x_y] = inserts_data
@@ -542,7 +564,7 @@ def get_inserts(fixture_path, pins_lookup, probe_dict):
         if brc not in inserts_lookup:
             inserts_lookup[brc] = x_y
         else:
-            fp_logger.info("duplicate brc location found in inserts: %s", brc)
+            misses.add("duplicate brc location", brc, "%s", brc)
 
     top_inserts_lookup = {}
     for x_y, item in top_inserts.items():
@@ -551,13 +573,15 @@ def get_inserts(fixture_path, pins_lookup, probe_dict):
         if brc not in top_inserts_lookup:
             top_inserts_lookup[brc] = x_y
         else:
-            fp_logger.info("duplicate brc location found in inserts: %s", brc)
+            misses.add("duplicate top brc location", brc, "%s", brc)
 
     fp_logger.info(
         "inserts found; Bottom: %d, Top: %d",
         len(inserts),
         len(top_inserts))
 
+    misses.log_summary(fp_logger)
+
     return inserts, top_inserts, inserts_lookup, top_inserts_lookup
 
 
@@ -801,33 +825,45 @@ def get_wires(fixture_path, all_inserts):
     return wires_list, top_wires_list
 
 
-def get_fixture_info(fixture_path):
+def get_fixture_info(fixture_path, parse_cache=None):
     """
     This function uses the appropriate wires and inserts function to extract the wires
     and inserts.
 
     also get list of pins to allow processing to assosiate each pin with
     an assigned BRC (using the offsets)
+
+    if a parse_cache is provided, stages whose files have not
+    changed since the last call are not parsed again.
     """
 
+    if parse_cache is None:
+        parse_cache = pc.ParseCache()
+
     # pins_lookup: {"B R.00 C.0": PinsTuple(brc, status, (x_offset, y_offset)}
     # probes_dict: {node_name: probe_tuple(probe_name, fix_coord)}
 
-    pins_lookup, probes_dict, ground_nodes = fi.parse_fix_file(
-        fixture_path)
+    pins_lookup, probes_dict, ground_nodes = parse_cache.get(
+        "fixture.o", fixture_path, ["fixture.o"],
+        lambda: fi.parse_fix_file(fixture_path))
 
-    inserts, top_inserts, inserts_lookup, top_inserts_lookup = get_inserts(
-        fixture_path, pins_lookup, probes_dict)
+    inserts, top_inserts, inserts_lookup, top_inserts_lookup = parse_cache.get(
+        "inserts", fixture_path, ["fixture.o", "inserts"],
+        lambda: get_inserts(fixture_path, pins_lookup, probes_dict))
 
-    wires, top_wires = get_wires(
-        fixture_path, (inserts_lookup, top_inserts_lookup))
+    def parse_wires():
+        wires, top_wires = get_wires(
+            fixture_path, (inserts_lookup, top_inserts_lookup))
 
-    fixture_data = FixtureTuple(wires, top_wires, inserts, top_inserts, ground_nodes=ground_nodes)
+        fixture_data = FixtureTuple(wires, top_wires, inserts, top_inserts, ground_nodes=ground_nodes)
 
-    throughput_multiplier, module_list = fm.throughput_multiplier(
-        fixture_data)
+        throughput_multiplier, module_list = fm.throughput_multiplier(
+            fixture_data)
 
-    return fixture_data, throughput_multiplier, module_list
+        return fixture_data, throughput_multiplier, module_list
+
+    return parse_cache.get(
+        "wires", fixture_path, ["fixture.o", "inserts", "wires"], parse_wires)
 
 
 def clean_targets(fixture_dir):
@@ -853,7 +889,7 @@ def clean_targets(fixture_dir):
 
         folder_path = fixture_dir / folder
 
-        for file in ["wires", "inserts"]:
+        for file in ["wires", "inserts", om.MANIFEST_FILENAME]:
 
             file_path = folder_path / file
 
@@ -881,7 +917,48 @@ def clean_targets(fixture_dir):
     return success_flag
 
 
-def process_fixture_info(fixture_dir, flags, generation_flags):
+def get_fixture_target(target_folder):
+    "the fixture root (the fixture plot) is processed as the wiring machine."
+    return "wiring_machine" if target_folder == "." else target_folder
+
+
+def get_target_transforms(transforms_dict, flags, target_folder):
+    """
+    returns the (name, transform) pairs, in order, which
+    have been selected and are run on the target.
+    """
+
+    fixture_target = get_fixture_target(target_folder)
+
+    return [(name, transform)
+            for (name, rule, targets), transform in transforms_dict.items()
+            # has this transform been selected, and is it run on this target?
+            if rule(flags) and fixture_target in targets]
+
+
+def process_fixture_info(fixture_dir, flags, generation_flags, parse_cache=None,
+                         progress=None, profiler=None):
+    """
+    parses the fixture, runs the selected transforms on
+    each selected target, then outputs the results.
+
+    targets whose manifest shows nothing has changed since
+    they were last output are skipped (they are up to date).
+    when every target is up to date, the fixture is not parsed.
+
+    parse_cache (if provided) holds the parsed fixture
+    between calls, see get_fixture_info.
+
+    progress (if provided) is called before each stage with
+    (stage, target, step, total_steps). it may raise TaskCancelled
+    to stop the processing, the targets are then cleaned.
+
+    profiler (if provided) runs each stage (parsing, each transform
+    and each output), see performance_lib.stage_profiler.
+
+    returns a ProcessingResult, success is True if every
+    target was processed and output (or was up to date).
+    """
 
     default_levels = ["NOT_SET", "DEBUG", "INFO",
                       "WARNING", "ERROR", "CRITICAL"]
@@ -891,8 +968,77 @@ def process_fixture_info(fixture_dir, flags, generation_flags):
     if log_level in default_levels:
         fp_logger.setLevel(getattr(logging, log_level))
 
-    original_fixture_data, throughput_multiplier, module_list = get_fixture_info(
-        fixture_dir)
+    if generation_flags.processing:
+        destination_folders = [
+            target for target in FIXTURE_TARGETS if getattr(flags, target)]
+    elif generation_flags.gplane_plot:
+        destination_folders = ["."]
+
+    # the plot is output to the fixture folder.
+    destination_folders = ["." if target_folder == "output_plot" else target_folder
+                           for target_folder in destination_folders]
+
+    target_manifests = {}
+    up_to_date_targets = []
+
+    for target_folder in destination_folders:
+
+        target_manifest = om.get_target_manifest(
+            fixture_dir, target_folder, flags, generation_flags)
+
+        if om.is_up_to_date(target_manifest):
+            fp_logger.info("'%s' target is up to date", target_folder)
+            up_to_date_targets.append(target_folder)
+        else:
+            target_manifests[target_folder] = target_manifest
+
+    if destination_folders and not target_manifests:
+        show_up_to_date(generation_flags)
+        return ProcessingResult(True, tuple(up_to_date_targets))
+
+    transforms_dict = fp.get_transforms()
+
+    # parsing, then the transforms, finalising
+    # and output of each target.
+    total_steps = 1 + sum(
+        len(get_target_transforms(transforms_dict, flags, target_folder)) + 2
+        for target_folder in target_manifests)
+
+    step = 0
+
+    def report_progress(stage, target_folder=""):
+        nonlocal step
+        step += 1
+
+        if progress is None:
+            return
+
+        try:
+            progress(stage, "fixture plot" if target_folder == "." else target_folder,
+                     step, total_steps)
+
+        except TaskCancelled:
+            # once the targets are being processed, they
+            # are left in an unknown state, so are removed.
+            if target_folder:
+                fp_logger.info("processing cancelled, removing the targets.")
+                clean_targets(fixture_dir)
+            raise
+
+    def run_stage(stage, target_folder, function, *args):
+        if profiler is None:
+            return function(*args)
+
+        if target_folder:
+            stage = "{}: {}".format(
+                "fixture plot" if target_folder == "." else target_folder, stage)
+
+        return profiler.run(stage, function, *args)
+
+    report_progress("parsing")
+
+    original_fixture_data, throughput_multiplier, module_list = run_stage(
+        "parsing", "", get_fixture_info, fixture_dir, parse_cache)
 
     flags = flags._replace(throughput_multiplier=throughput_multiplier)
 
@@ -903,24 +1049,13 @@ def process_fixture_info(fixture_dir, flags, generation_flags):
     original_fixture_data = original_fixture_data._replace(
         fixture_size=joint_settings["fixture_size"])
 
-    transforms_dict = fp.get_transforms()
-
-    if generation_flags.processing:
-        destination_folders = [
-            target for target in FIXTURE_TARGETS if getattr(flags, target)]
-    elif generation_flags.gplane_plot:
-        destination_folders = ["."]
-
     # break_flag is set to True if there are any problems.
     break_flag = False
 
-    # set to True when processing and output executes correctly.
-    success_flag = False
+    # set to False if any target is not output correctly.
+    success_flag = bool(target_manifests)
 
-    for target_folder in destination_folders:
-
-        if target_folder == "output_plot":
-            target_folder = "."
+    for target_folder, target_manifest in target_manifests.items():
 
         output_dir = fixture_dir / target_folder
 
@@ -931,26 +1066,27 @@ def process_fixture_info(fixture_dir, flags, generation_flags):
 
         fixture_data = original_fixture_data
 
-        if target_folder == ".":
-            fixture_target = "wiring_machine"
-        else:
-            fixture_target = target_folder
+        fixture_target = get_fixture_target(target_folder)
 
-        for (name, rule, targets), transform in transforms_dict.items():
-            # has this transform been selected?
-            if not rule(flags):
-                continue
+        # the ground pins are found once for the target,
+        # for the ground wire removal and the plot.
+        ground_index = gi.get_target_ground_index(fixture_data, flags)
 
-            # is the transform to be run on this target?
-            if fixture_target not in targets:
-                continue
+        for name, transform in get_target_transforms(
+                transforms_dict, flags, target_folder):
+
+            if name in fp.GROUND_INDEX_TRANSFORMS:
+                transform = functools.partial(transform, ground_index=ground_index)
+
+            report_progress(f"'{name}' transform", target_folder)
 
             fp_logger.info(
                 "applied '%s' transform on '%s' target",
                 name,
                 target_folder)
 
-            fixture_data = transform(
+            fixture_data = run_stage(
+                name, target_folder, transform,
                 fixture_dir, fixture_data, flags, fixture_target)
 
             # A return of None means a problem in the fixture processing
@@ -967,9 +1103,18 @@ def process_fixture_info(fixture_dir, flags, generation_flags):
                 break
 
         if break_flag:
+            success_flag = False
             break
 
-        success_flag = False
+        # resolve the wires connected to moved inserts
+        # once, for all of the outputs.
+        report_progress("finalising", target_folder)
+        fixture_data = run_stage(
+            "finalising", target_folder, fp.finalise_fixture_data, fixture_data)
+
+        report_progress("output", target_folder)
+
+        target_success = False
         plot_filename = ""
         # in ground plane mode, only the
         # ground plane data is produced.
@@ -980,34 +1125,53 @@ def process_fixture_info(fixture_dir, flags, generation_flags):
             plot_filename = "full_fixture_plot.dxf"
 
         if plot_filename and target_folder == ".":
-            success_flag = od.output_fixture_plot(
+            target_success = run_stage(
+                "output_fixture_plot", target_folder,
+                od.output_fixture_plot,
                 output_dir,
                 plot_filename,
                 joint_settings,
                 fixture_data,
                 generation_flags,
                 module_list,
-                flags)
+                flags,
+                ground_index)
 
         if generation_flags.processing and target_folder in FIXTURE_TARGETS:
 
-            success_flag1 = output_wires_inserts(
+            success_flag1 = run_stage(
+                "output_wires", target_folder,
+                output_wires_inserts,
                 output_dir,
                 fixture_dir,
                 wires_settings,
                 fixture_data,
                 "wires")
 
-            success_flag2 = output_wires_inserts(
+            success_flag2 = run_stage(
+                "output_inserts", target_folder,
+                output_wires_inserts,
                 output_dir,
                 fixture_dir,
                 inserts_settings,
                 fixture_data,
                 "inserts")
 
-            success_flag = success_flag1 and success_flag2
+            target_success = success_flag1 and success_flag2
+
+        if target_success:
+            om.save_manifest(target_manifest)
+
+        success_flag = success_flag and target_success
 
     if success_flag:
+        if up_to_date_targets:
+            up_to_date_text = "\n\n    Already up to date: {}".format(
+                ", ".join("fixture plot" if target_folder == "." else target_folder
+                          for target_folder in up_to_date_targets))
+        else:
+            up_to_date_text = ""
+
         if generation_flags.gplane_plot:
 
             info_text = "    Ground plane plot and list generated!\n\n"\
@@ -1019,4 +1183,24 @@ def process_fixture_info(fixture_dir, flags, generation_flags):
             info_text = "    New wires and inserts generation complete!\n\n"\
                         "    Please check 'fixture/wiring_machine' or 'fixture/verifier'"
 
-            mb.showinfo("Processing complete", info_text)
+            mb.showinfo("Processing complete", info_text + up_to_date_text)
+
+    return ProcessingResult(success_flag, tuple(up_to_date_targets),
+                            tuple(target_manifests) if success_flag else ())
+
+
+def show_up_to_date(generation_flags):
+    """
+    tells the user nothing needed to be processed.
+    """
+
+    if generation_flags.gplane_plot:
+        info_text = "    Ground plane plot and list are already up to date.\n\n"\
+                    "    Nothing has changed since they were generated."
+        mb.showinfo("processing complete", info_text)
+
+    if generation_flags.processing:
+        info_text = "    Wires and inserts are already up to date.\n\n"\
+                    "    Nothing has changed since they were generated.\n"\
+                    "    (Clean the job fixture targets to force regeneration)"
+        mb.showinfo("Processing complete", info_text)
@@ -26,6 +26,9 @@ DEFAULT_PLACEMENT = Placement()
 
 TOOLING_TUPLE = namedtuple("Tooling", ["point", "diameter"])
 
+# how often (in lines) the progress of get_outline_info is reported.
+PROGRESS_LINES = 5000
+
 # Handy Regex
 PLACEMENT_RE = re.compile(
     r"PLACEMENT +(?P<x>-?\d+), +(?P<y>-?\d+) +(?P<rotation>-?\d+(\.\d+))?;")
@@ -59,11 +62,14 @@ def apply_placement(placement_list=None):
     return inner
 
 
-def get_outline_info(fixture_path):
+def get_outline_info(fixture_path, progress=None):
     """
     The following function when given a path to a fixture file,
     will extract outlines, tooling information, pins, and where relevent,
     Board numbers.
+
+    progress (if given) is called every few thousand lines with
+    the characters read, the file size and the boards found.
     """
 
     # parse flags
@@ -89,13 +95,22 @@ def get_outline_info(fixture_path):
 
     fixture_file_path = fixture_path / "fixture.o"
 
+    file_size = fixture_file_path.stat().st_size
+    chars_read = 0
+    board_count = 0
+
     fp_logger.info(
         "Getting fixture information from '%s'",
         fixture_file_path.as_posix())
 
     with fixture_file_path.open() as fixture_file:
 
-        for raw_line in fixture_file:
+        for line_number, raw_line in enumerate(fixture_file, 1):
+            chars_read += len(raw_line)
+
+            if progress is not None and not line_number % PROGRESS_LINES:
+                progress(chars_read, file_size, board_count)
+
             line = raw_line.strip()
             if not line:
                 continue
@@ -120,6 +135,7 @@ def get_outline_info(fixture_path):
             # rules for the board_flag
             if line.startswith("BOARD"):
                 board_flag = True
+                board_count += 1
 
                 board_re = r'^BOARD +"?([^"\n ]+)"?'
                 board_name = re.sub(board_re, r"\1", line)
@@ -217,6 +233,9 @@ def get_outline_info(fixture_path):
                 point = local_placement(fm.CoordTuple(x, y))
                 tooling_list.append(TOOLING_TUPLE(point, width))
 
+    if progress is not None:
+        progress(file_size, file_size, board_count)
+
     return (outlines, tooling)
 
 
@@ -838,8 +838,9 @@ def throughput_multiplier(fixture_data):
     for i, (probe, pin_set) in enumerate(probe_dict.items()):
         node = probe.node
 
-        fp_logger.debug("Probe %s (%s) has %d pins",
-                        probe.brc, node, len(pin_set))
+        if fp_logger.isEnabledFor(logging.DEBUG):
+            fp_logger.debug("Probe %s (%s) has %d pins",
+                            probe.brc, node, len(pin_set))
         if node not in node_dict:
             node_dict[node] = set()
 
@@ -850,8 +851,9 @@ def throughput_multiplier(fixture_data):
     fixture_module_list = set()
     
     for node, pin_set in node_dict.items():
-        fp_logger.debug("Node %s  has %d pins", node, len(pin_set))
-        fp_logger.debug("%s", pin_set)
+        if fp_logger.isEnabledFor(logging.DEBUG):
+            fp_logger.debug("Node %s  has %d pins", node, len(pin_set))
+            fp_logger.debug("%s", pin_set)
 
         brc_list = [pin.fix_id.brc for pin in pin_set]
 
@@ -9,7 +9,7 @@ import csv
 import logging
 
 
-from tkinter import messagebox as mb
+from src.fixture_processor.helper_functions import message_box as mb
 from typing import NamedTuple, Optional
 # from decimal import Decimal
 
@@ -1,6 +1,11 @@
 from datetime import datetime
 from src.fixture_processor.fixture_functions import fixture_maths as fm
+from src.fixture_processor.helper_functions import message_box as mb
+from src.fixture_processor import file_operations as fo
 
+import io
+import re
+import itertools
 import logging
 
 fp_logger = logging.getLogger('fixture_processing.fixture_output')
@@ -31,6 +36,10 @@ AGILENT ICT FIXTURE WIRING REPORT          %a %b %d %H:%M:%S %Y
 AGILENT ICT FIXTURE INSERTION REPORT          %a %b %d %H:%M:%S %Y
 """}
 
+# the date line is repeated on every page, and is
+# ignored when checking if the output has changed.
+DATE_LINE_PREFIX = "AGILENT ICT FIXTURE"
+
 WIRES_LINE = """\
 {length:>6} {gauge:>2} {colour:^6} {from_brc} {to_brc:<15} {from_x:>7} {from_y:>7} {to_x:>7} {to_y:>7}
 """
@@ -60,6 +69,41 @@ Wiring Method : {wiring_method}
 """
 
 
+def compile_line_format(line_format):
+    """
+    replaces the named fields in a line format with
+    positional fields (in order of appearance), returning
+    the bound format method. This allows each row to be
+    formatted directly from its values, without building
+    a dict for each row.
+    """
+
+    field_names = []
+
+    def positional_field(match):
+        name = match.group(1)
+        if name not in field_names:
+            field_names.append(name)
+        return "{" + str(field_names.index(name))
+
+    return re.sub(r"\{(\w+)", positional_field, line_format).format
+
+
+# fields: length, gauge, colour, from_brc, to_brc, from_x, from_y, to_x, to_y
+FORMAT_WIRES_ROW = compile_line_format(WIRES_LINE)
+
+# fields: brc, x, y, insert_type, spring_space, spring, node, device_space, device
+FORMAT_INSERTS_ROW = compile_line_format(INSERTS_LINE)
+
+# used when the insert has no spring, node, or device.
+# fields: brc, x, y, insert_type
+FORMAT_REDUCED_INSERTS_ROW = compile_line_format(
+    INSERTS_LINE.split("{spring_space}")[0] + "\n")
+
+# the automatic layout uses a shortened name for these nodes.
+NODE_NAMES = {"<Extra>": "Extra", "<OTHER>": "OTHER", "<AUTOFILE>": "AUTOFILE", None: ""}
+
+
 def insert_page_break(file_handle, page, date_line, source_dir, name):
     """
     Used to simplify the calling of page breaks.
@@ -78,73 +122,50 @@ def insert_page_break(file_handle, page, date_line, source_dir, name):
 
 def write_wires_line(wire, top_flag):
 
-    line_dict = {}
-    lgc, from_brc, to_brc, from_xy, to_xy, custom_wire = wire
-    length, gauge, colour = lgc
-    from_x, from_y = from_xy
-    to_x, to_y = to_xy
-
-    line_dict["length"] = length
-    line_dict["gauge"] = gauge
-    line_dict["colour"] = colour
-
-    line_dict["from_brc"] = from_brc
-    line_dict["to_brc"] = to_brc
+    (length, gauge, colour), from_brc, to_brc, (from_x, from_y), (to_x, to_y), _ = wire
 
-    line_dict["from_x"] = from_x
     if top_flag:
-        line_dict["from_y"] = -from_y
-    else:
-        line_dict["from_y"] = from_y
-
-    line_dict["to_x"] = to_x
+        from_y = -from_y
 
     # probes in the automatic layout have inversed Y.
     if to_brc[0] == "[":
-        line_dict["to_y"] = -to_y
-    else:
-        line_dict["to_y"] = to_y
+        to_y = -to_y
 
-    return WIRES_LINE.format(**line_dict)
+    return FORMAT_WIRES_ROW(length, gauge, colour, from_brc, to_brc,
+                            from_x, from_y, to_x, to_y)
 
 
-def write_inserts_line(insert):
+def write_inserts_line(data):
 
-    xy, data = insert
     x, y = data.coord
+    spring = data.spring
 
-    line_dict = {}
+    if not (spring or data.node or data.device):
+        return FORMAT_REDUCED_INSERTS_ROW(data.brc, x, y, data.insert_type)
 
-    line_dict["x"] = x
-    line_dict["y"] = y
+    node = NODE_NAMES.get(data.node, data.node)
+    device = data.device
 
-    brc = data.brc
-    line_dict["brc"] = brc
+    return FORMAT_INSERTS_ROW(data.brc, x, y, data.insert_type, " ",
+                              str(spring) + " oz" if spring else "",
+                              node, " " if device else "", device)
 
-    line_dict["insert_type"] = data.insert_type
-    line_dict["spring"] = str(data.spring) + " oz" if data.spring else ""
 
-    if data.spring or data.node or data.device:
-        line_dict["spring_space"] = " "
-    else:
-        reduced_inserts_line = INSERTS_LINE.split("{spring_space}")[0]
-        return reduced_inserts_line.format(**line_dict) + "\n"
+def render_wires_rows(wires, top_flag):
+    """
+    generates the formatted line for each wire.
+    """
 
-    node = "" if data.node is None else data.node
+    for wire in wires:
+        yield write_wires_line(wire, top_flag)
 
-    if node == "<Extra>":
-        line_dict["node"] = "Extra"
-    elif node == "<OTHER>":
-        line_dict["node"] = "OTHER"
-    elif node == "<AUTOFILE>":
-        line_dict["node"] = "AUTOFILE"
-    else:
-        line_dict["node"] = node
 
-    line_dict["device"] = data.device
-    line_dict["device_space"] = " " if data.device else ""
+def render_inserts_rows(inserts):
+    """
+    generates the formatted line for each insert.
+    """
 
-    return INSERTS_LINE.format(**line_dict)
+    return map(write_inserts_line, inserts.values())
 
 
 def output_wires_inserts(new_dir, source_dir, settings_dict, fixture_data, name):
@@ -155,14 +176,30 @@ def output_wires_inserts(new_dir, source_dir, settings_dict, fixture_data, name)
 
     The output will be provided in Automatic mode to subvert the requirement
     of calculating wire numbers (this is subject to change).
+
+    The rows are rendered (lazily) into a single buffer. The file
+    is only replaced if the new output differs (ignoring the
+    date lines), and is replaced in one step, so a failed write
+    never leaves a truncated file behind.
+
+    The fixture data must already be finalised
+    (see fixture_processing.finalise_fixture_data).
     """
 
     if name == "wires":
-        data_list, top_data_list = fixture_data._wires
-        inserts_bottom, inserts_top = fixture_data._inserts
+        wires, top_wires = fixture_data._wires
+
+        rows = render_wires_rows(wires, False)
+        top_rows = render_wires_rows(top_wires, True) if top_wires else None
     else:
-        data_list, top_data_list = fixture_data._inserts
-        inserts_bottom, inserts_top = None, None
+        inserts, top_inserts = fixture_data._inserts
+
+        rows = render_inserts_rows(inserts)
+        top_rows = render_inserts_rows(top_inserts) if top_inserts else None
+
+    # None marks the start of the top rows.
+    if top_rows is not None:
+        rows = itertools.chain(rows, [None], top_rows)
 
     output_path = new_dir / name
 
@@ -172,114 +209,71 @@ def output_wires_inserts(new_dir, source_dir, settings_dict, fixture_data, name)
 
     wires_setting_txt = SETTINGS.format(**settings_dict)
 
-    with output_path.open("w") as f_data:
-
-        f_data.write(DASHES)
-        f_data.write(date_line)
-        f_data.write("\n")
-        f_data.write((source_dir / name).as_posix())
-        f_data.write("\n")
-        f_data.write(DASHES)
-        f_data.write("\n")
-        f_data.write(wires_setting_txt)
-        f_data.write(DASHES)
-
-        if name == "wires":
-            f_data.write("\n")
-            f_data.write(WIRES_AUTOMATIC_KEY)
-            f_data.write("\n")
-
-        f_data.write(AUTOMATIC_TABLE_HEADER[name])
-
-        line_count = 0
-        lf_count = 0
-        lf_distance = 5
-        if name == "wires":
-            page_break = 38
-        else:
-            page_break = 42
-        page = 1
-
-        # convert the inserts dict to a list of tuples,
-        # to allow convenient output.
-        if name == "inserts":
-            data_list = [(xy, data) for xy, data in data_list.items()]
-            if top_data_list:
-                top_data_list = [(xy, data)
-                                 for xy, data in top_data_list.items()]
-
-        if top_data_list:
-            all_data = data_list + [None] + top_data_list
-        else:
-            all_data = data_list
-
-        top_flag = False
-        for data in all_data:
-
-            if data is None:
-                top_flag = True
-
-                line_count = line_count + 6
-                f_data.write(TOP)
-                f_data.write(AUTOMATIC_TABLE_HEADER[name])
-                continue
-
-            if top_flag:
-                inserts = inserts_top
-            else:
-                inserts = inserts_bottom
+    buffer = io.StringIO()
+    write = buffer.write
 
-            if name == "wires":
-                replace_dict = {}
-                from_xy, to_xy = data._get_xy_coords
-                from_brc, to_brc = data._get_brc_data
+    write(DASHES)
+    write(date_line)
+    write("\n")
+    write((source_dir / name).as_posix())
+    write("\n")
+    write(DASHES)
+    write("\n")
+    write(wires_setting_txt)
+    write(DASHES)
 
-                for xy, brc, label in data.iter_wire():
-                    terminal_check = f"_{label}_is_terminal"
-                    # skip if the from / to entry is a terminal.
-                    if getattr(data, terminal_check):
-                        continue
+    if name == "wires":
+        write("\n")
+        write(WIRES_AUTOMATIC_KEY)
+        write("\n")
 
-                    insert = inserts[xy]
-                    if insert.coord == xy and not brc.startswith("*"):
-                        continue
+    write(AUTOMATIC_TABLE_HEADER[name])
 
-                    replace_dict[f"{label}_xy"] = insert.coord
-                    replace_dict[f"{label}_brc"] = insert.brc
+    line_count = 0
+    lf_count = 0
+    lf_distance = 5
+    if name == "wires":
+        page_break = 38
+        # the wires file has no blank line every few rows.
+        lf_distance = None
+    else:
+        page_break = 42
+    page = 1
 
-                if replace_dict:
+    for row in rows:
 
-                    # re-calculate wire length if wire is not on
-                    # a terminal.
-                    if not data._is_terminal_wire:
-                        from_insert = inserts[from_xy]
-                        to_insert = inserts[to_xy]
-                        wire_length = fm.get_wire_length(
-                            from_insert, to_insert)
+        if row is None:
+            line_count = line_count + 6
+            write(TOP)
+            write(AUTOMATIC_TABLE_HEADER[name])
+            continue
 
-                        replace_dict["wire_info"] = data.wire_info._replace(
-                            length=wire_length)
+        write(row)
 
-                    data = data._replace(**replace_dict)
+        line_count = line_count + 1
+        lf_count = lf_count + 1
+        if lf_count == lf_distance:
+            lf_count = 0
+            line_count = line_count + 1
+            write("\n")
 
-                f_data.write(write_wires_line(data, top_flag))
+        if line_count >= page_break:
+            line_count = 0
+            page = page + 1
+            if name == "wires":
+                page_break = 44
             else:
-                f_data.write(write_inserts_line(data))
-
-            line_count = line_count + 1
-            lf_count = lf_count + 1
-            if name == "inserts" and lf_count >= lf_distance:
-                lf_count = 0
-                line_count = line_count + 1
-                f_data.write("\n")
-
-            if line_count >= page_break:
-                line_count = 0
-                page = page + 1
-                if name == "wires":
-                    page_break = 44
-                else:
-                    page_break = 48
-                insert_page_break(f_data, page, date_line, source_dir, name)
+                page_break = 48
+            insert_page_break(buffer, page, date_line, source_dir, name)
+
+    try:
+        fo.write_if_changed(output_path, buffer.getvalue(),
+                            ignore_prefixes=[DATE_LINE_PREFIX])
+    except PermissionError:
+        mb.showerror(
+            "Permission Error",
+            "    '{}' has been opened by another process.\n"
+            "    Close this file and try again.".format(output_path.as_posix()))
+        return False
 
     return True
@@ -21,7 +21,7 @@ all of the transforms will be collected into a data structure containing:
 
 from collections import namedtuple, OrderedDict, defaultdict
 from itertools import product
-from tkinter import messagebox as mb
+from src.fixture_processor.helper_functions import message_box as mb
 import logging
 
 
@@ -30,10 +30,15 @@ from src.fixture_processor.options_lib import fixture_processing_options
 from src.fixture_processor.fixture_functions import fixture_maths as fm
 from src.fixture_processor.fixture_functions import fixture_modifications as fmod
 from src.fixture_processor.fixture_functions import extract_wires as ew
+from src.fixture_processor.fixture_functions import ground_index as gi
 
 
 fp_logger = logging.getLogger('fixture_processing.fixture_processing')
 
+# the transforms which are passed the target's ground
+# index (as ground_index), see process_fixture_info.
+GROUND_INDEX_TRANSFORMS = ("remove_ground_wires",)
+
 
 def remove_user_defined_wires(fixture_dir, fixture_data, flags, target):
     """
@@ -165,45 +170,6 @@ def remove_terminal_wires(fixture_dir, fixture_data, flags, target):
     return fixture_data._replace(bottom_wires=new_bottom_wires)
 
 
-def sort_pins(inserts_dict):
-    """
-    Given an inserts object (dictionary), 
-    filter everything but the pins out,
-    
-    then sorts it in the following order
-    module 0, module 1, module 2, module 3
-    Then within each module:
-    top to bottom,
-    left to right.
-    
-    Has the option to reverse the module order.
-    """
-    
-
-    sorted_inserts_dict = {key: value for 
-                           key, value in inserts_dict.items()
-                           if value._is_pin}
-                               
-    # when sortting accross multiple domains,
-    # (in this case by module, then row, then column)
-    # The column sorting must be done first.
-    sorted_by_columns = sorted(sorted_inserts_dict.items(), key=lambda pair: pair[0][0], reverse=True)
-    
-    # then the rows are sorted.
-    sorted_by_rows = sorted(sorted_by_columns, key=lambda pair: pair[0][1])
-    
-    # then sorted by modules
-    sorted_by_modules = sorted(sorted_by_rows,key=lambda pair: pair[1].fix_id.brc.module)
-    
-    
-    return {key: value for 
-            key, value in sorted_by_modules}
-    
-    
-        
-
-
-
 def remove_testjet_wires(fixture_dir, fixture_data, flags, target):
     """
     When producing fixtures, testjet/ vtep transfer tend to be
@@ -241,22 +207,26 @@ def remove_testjet_wires(fixture_dir, fixture_data, flags, target):
             continue
 
         remove_count = remove_count + 1
-        fp_logger.debug(
-            "  from_brc=%s, to_brc=%s has been removed from the wires file. Unnecessary testjet wire.",
-            wire_data.from_brc,
-            wire_data.to_brc)
+        if fp_logger.isEnabledFor(logging.DEBUG):
+            fp_logger.debug(
+                "  from_brc=%s, to_brc=%s has been removed from the wires file. Unnecessary testjet wire.",
+                wire_data.from_brc,
+                wire_data.to_brc)
 
     fp_logger.info(
         "%d testjet related wires have been removed from the fixture.", remove_count)
     return fixture_data._replace(bottom_wires=new_wires)
 
 
-def remove_ground_wires(fixture_dir, fixture_data, flags, target):
+def remove_ground_wires(fixture_dir, fixture_data, flags, target, ground_index=None):
     """
     With a ground plane fixture, all of the hybrid grounds are soldered
     together. This means that there is no need to add a wire between
     2 soldered BRCs. This function is intended to remove all
     ground to bround BRCs.
+
+    ground_index is the target's ground index (see process_fixture_info),
+    it is built from the inserts if not provided.
     """
 
 
@@ -266,8 +236,9 @@ def remove_ground_wires(fixture_dir, fixture_data, flags, target):
 
     new_wires = []
 
-    # are asru switched grounds considerered grounds?
-    include_asru = flags.gplane_include_asru
+    if ground_index is None:
+        # are asru switched grounds considerered grounds?
+        ground_index = gi.build_ground_index(inserts, include_asru=flags.gplane_include_asru)
 
     # first, filter the wires list, so that
     # only ground wires are present.
@@ -281,20 +252,18 @@ def remove_ground_wires(fixture_dir, fixture_data, flags, target):
         from_insert = inserts[wire_data.from_xy]
         from_brc = from_insert.fix_id.brc
 
-        if not from_brc.is_fixture_ground(include_asru=include_asru):
+        if from_brc not in ground_index.brcs:
             new_wires.append(wire_data)
             continue
 
-        to_insert = inserts[wire_data.to_xy]
-        to_fix_id = to_insert.fix_id
-
-        if to_insert._is_fixture_ground(include_asru=include_asru):
+        if wire_data.to_xy in ground_index.coords:
 
             remove_count = remove_count + 1
-            fp_logger.debug(
-                "  from_brc=%s, to_brc=%s has been removed from the wires file. Unnecessary ground wire.",
-                wire_data.from_brc,
-                wire_data.to_brc)
+            if fp_logger.isEnabledFor(logging.DEBUG):
+                fp_logger.debug(
+                    "  from_brc=%s, to_brc=%s has been removed from the wires file. Unnecessary ground wire.",
+                    wire_data.from_brc,
+                    wire_data.to_brc)
             continue
 
         new_wires.append(wire_data)
@@ -302,12 +271,8 @@ def remove_ground_wires(fixture_dir, fixture_data, flags, target):
     # if the target is a verifier, then dummy wires need to be added
     if target == "verifier":
 
-        ground_inserts = {key: value for 
-                          key, value in inserts.items()
-                          if value._is_fixture_ground(include_asru)}
+        sorted_ground_pins = ground_index.pins
 
-        sorted_ground_pins = sort_pins(ground_inserts)
-        
         for from_coord, to_coord in zip(sorted_ground_pins.keys(), list(sorted_ground_pins.keys())[1:]):
             
             from_insert = sorted_ground_pins[from_coord]
@@ -702,15 +667,16 @@ def correct_offset_pins(fixture_dir, fixture_data, flags, target):
                 brc=new_brc, insert_type="Pin", coord=(
                     new_x, new_y))
 
-            log_str = "brc %s with offset   (%-6s %6d) will be corrected to %s (%-8s %8d)"
-            fp_logger.debug(
-                log_str,
-                brc,
-                str(x_offset) + ",",
-                y_offset,
-                new_brc,
-                str(new_x) + ",",
-                new_y)
+            if fp_logger.isEnabledFor(logging.DEBUG):
+                log_str = "brc %s with offset   (%-6s %6d) will be corrected to %s (%-8s %8d)"
+                fp_logger.debug(
+                    log_str,
+                    brc,
+                    str(x_offset) + ",",
+                    y_offset,
+                    new_brc,
+                    str(new_x) + ",",
+                    new_y)
             new_inserts[coord] = new_data
 
     return fixture_data._replace(bottom_inserts=new_inserts)
@@ -788,6 +754,62 @@ def add_user_defined_wires(fixture_dir, fixture_data, flags, target):
     return fixture_data
 
 
+def resolve_wire_inserts(wire, inserts):
+    """
+    The inserts may have been moved (or had their BRC replaced)
+    since the wire was parsed, this updates the wire to match
+    its inserts, recalculating the wire length if required.
+    """
+
+    replace_dict = {}
+    from_xy, to_xy = wire._get_xy_coords
+
+    # terminals are not inserts, so are never moved.
+    if not wire._from_is_terminal:
+        from_insert = inserts[from_xy]
+        if from_insert.coord != from_xy or wire.from_brc.startswith("*"):
+            replace_dict["from_xy"] = from_insert.coord
+            replace_dict["from_brc"] = from_insert.brc
+
+    if not wire._to_is_terminal:
+        to_insert = inserts[to_xy]
+        if to_insert.coord != to_xy or wire.to_brc.startswith("*"):
+            replace_dict["to_xy"] = to_insert.coord
+            replace_dict["to_brc"] = to_insert.brc
+
+    if not replace_dict:
+        return wire
+
+    # re-calculate wire length if wire is not on
+    # a terminal.
+    if not wire._is_terminal_wire:
+        wire_length = fm.get_wire_length(from_insert, to_insert)
+
+        replace_dict["wire_info"] = wire.wire_info._replace(
+            length=wire_length)
+
+    return wire._replace(**replace_dict)
+
+
+def finalise_fixture_data(fixture_data):
+    """
+    This is ran after the transforms, before the fixture
+    data is output.
+
+    The transforms move inserts without updating the wires
+    connected to them. This resolves the coordinates, BRCs
+    and lengths of the affected wires once, so the outputs
+    (wires file and plot) only need to format the data.
+    """
+
+    bottom_wires, top_wires = fixture_data._wires
+    bottom_inserts, top_inserts = fixture_data._inserts
+
+    bottom_wires = [resolve_wire_inserts(wire, bottom_inserts) for wire in bottom_wires]
+    top_wires = [resolve_wire_inserts(wire, top_inserts) for wire in top_wires]
+
+    return fixture_data._replace(bottom_wires=bottom_wires, top_wires=top_wires)
+
 
 def get_transforms():
     """
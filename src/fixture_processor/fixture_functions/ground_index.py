@@ -0,0 +1,108 @@
+"""
+This module contains the ground index of a fixture, the
+fixture (hybrid / asru) ground pins, which are soldered
+together by a ground plane.
+
+The index is built once for each target (see
+get_target_ground_index), then passed to the ground wire
+removal, the ground BRC list and the plot. The transforms
+never change which inserts are ground pins (the inserts
+keep their keys and fix_id, only transfers are added), so
+the index stays valid for the whole target.
+"""
+
+import logging
+import operator as op
+
+from typing import NamedTuple
+
+
+fp_logger = logging.getLogger('fixture_processing.ground_index')
+
+
+class GroundIndex(NamedTuple):
+    # the ground pins, keyed by their (lookup) coordinate
+    # in module, then row, then column order (see sort_pins).
+    pins: dict
+
+    # the ground PinIDs and coordinates, for quick lookups.
+    brcs: frozenset
+    coords: frozenset
+
+    # the ground PinIDs, in bank, row and column order.
+    sorted_brcs: tuple
+
+
+def sort_pins(inserts_dict):
+    """
+    Given an inserts object (dictionary),
+    filter everything but the pins out,
+
+    then sorts it in the following order
+    module 0, module 1, module 2, module 3
+    Then within each module:
+    top to bottom,
+    left to right.
+
+    Has the option to reverse the module order.
+    """
+
+
+    sorted_inserts_dict = {key: value for
+                           key, value in inserts_dict.items()
+                           if value._is_pin}
+
+    # when sortting accross multiple domains,
+    # (in this case by module, then row, then column)
+    # The column sorting must be done first.
+    sorted_by_columns = sorted(sorted_inserts_dict.items(), key=lambda pair: pair[0][0], reverse=True)
+
+    # then the rows are sorted.
+    sorted_by_rows = sorted(sorted_by_columns, key=lambda pair: pair[0][1])
+
+    # then sorted by modules
+    sorted_by_modules = sorted(sorted_by_rows,key=lambda pair: pair[1].fix_id.brc.module)
+
+
+    return {key: value for
+            key, value in sorted_by_modules}
+
+
+def build_ground_index(inserts, include_asru=False, include_ctrl=False):
+    """
+    scans the (bottom) inserts for fixture ground pins.
+    """
+
+    ground_pins = {coord: insert for coord, insert in inserts.items()
+                   if insert._is_pin and insert.fix_id.brc.is_fixture_ground(
+                       include_asru=include_asru, include_ctrl=include_ctrl)}
+
+    pins = sort_pins(ground_pins)
+
+    brcs = [insert.fix_id.brc for insert in pins.values()]
+
+    fp_logger.debug("%d ground pins found.", len(pins))
+
+    return GroundIndex(
+        pins=pins,
+        brcs=frozenset(brcs),
+        coords=frozenset(pins),
+        sorted_brcs=tuple(sorted(brcs, key=op.attrgetter("bank", "row_and_half", "column"))))
+
+
+# used when not in ground plane mode.
+EMPTY_GROUND_INDEX = build_ground_index({})
+
+
+def get_target_ground_index(fixture_data, flags):
+    """
+    returns the ground index of the target's (bottom) inserts,
+    which is empty when not in ground plane mode.
+    """
+
+    if not flags.fixture_gplane:
+        return EMPTY_GROUND_INDEX
+
+    # are asru switched grounds considerered grounds?
+    return build_ground_index(fixture_data.bottom_inserts,
+                              include_asru=flags.gplane_include_asru)
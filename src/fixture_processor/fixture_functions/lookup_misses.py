@@ -0,0 +1,87 @@
+"""
+This module collects the lookup misses of a parse stage (pins
+not found in the fixture.o, probes not matched etc.).
+
+A bad fixture can have thousands of misses, logging a line for
+each makes a huge log and slows the parse down. Instead, the
+misses are counted (by kind, and by their worst offenders, e.g.
+the node), a few of each kind are kept as samples, and one
+summary is logged at the end of the stage.
+"""
+
+import logging
+
+from collections import Counter
+
+
+fp_logger = logging.getLogger('fixture_processing.lookup_misses')
+
+# the number of misses of each kind kept (and logged) as samples.
+SAMPLE_SIZE = 10
+
+# the number of worst offenders logged for each kind.
+TOP_OFFENDERS = 5
+
+# the offenders are only counted for this many different offenders.
+MAX_OFFENDERS = 10000
+
+
+class LookupMisses:
+    """
+    counts the lookup misses of a stage (e.g. "inserts"),
+    see add and log_summary.
+    """
+
+    def __init__(self, stage, sample_size=SAMPLE_SIZE):
+        self.stage = stage
+        self.sample_size = sample_size
+
+        # {kind: count}
+        self.counts = Counter()
+
+        # {kind: Counter({offender: count})}
+        self.offenders = {}
+
+        # {kind: [(message, args)]}, formatted when logged.
+        self.samples = {}
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def add(self, kind, offender, message, *args):
+        """
+        records a miss. offender groups the misses (e.g. the node name),
+        message % args describes the miss, it is only formatted if the
+        miss is kept as a sample, and is logged.
+        """
+
+        self.counts[kind] += 1
+
+        offenders = self.offenders.setdefault(kind, Counter())
+        if offender in offenders or len(offenders) < MAX_OFFENDERS:
+            offenders[offender] += 1
+
+        samples = self.samples.setdefault(kind, [])
+        if len(samples) < self.sample_size:
+            samples.append((message, args))
+
+    def log_summary(self, logger=fp_logger, level=logging.INFO):
+        """
+        logs the number of misses of each kind, the worst offenders
+        and the samples, nothing is logged if there were no misses.
+        """
+
+        if not self.counts or not logger.isEnabledFor(level):
+            return
+
+        logger.log(level, "'%s' lookup misses: %d (%s)", self.stage, len(self),
+                   ", ".join(f"{kind}: {count}" for kind, count in self.counts.most_common()))
+
+        for kind, _ in self.counts.most_common():
+            worst_offenders = self.offenders[kind].most_common(TOP_OFFENDERS)
+
+            logger.log(level, "    %s, worst offenders: %s", kind,
+                       ", ".join(f"{offender} ({count})" for offender, count in worst_offenders))
+
+            for message, args in self.samples[kind]:
+                logger.log(level, "        " + message, *args)
@@ -7,15 +7,14 @@ It will also output BRC lists.
 
 import logging
 
-from tkinter import messagebox as mb
+from src.fixture_processor.helper_functions import message_box as mb
 
-import operator as op
-
-from dxfwrite import DXFEngine as dxf
 from turtle import Vec2D
 from itertools import product
 
 from src.fixture_processor.fixture_functions import fixture_maths as fm
+from src.fixture_processor.fixture_functions import dxf_writer as dw
+from src.fixture_processor.fixture_functions import ground_index as gi
 # from fixture_processor.fixture_functions import fixture_processing as fp
 
 fp_logger = logging.getLogger('fixture_processing.output_data')
@@ -30,41 +29,29 @@ def scaled_circle(radius, center):
     scaled_radius = radius * PLOT_SCALE
     scaled_centre = center.to_mm_dxf_point()
 
-    return dxf.circle(scaled_radius, scaled_centre)
+    return dw.DXFCircle(scaled_radius, scaled_centre)
 
 
 def scaled_line(point1, point2):
-    return dxf.line(point1.to_mm_dxf_point(), point2.to_mm_dxf_point())
+    return dw.DXFLine(point1.to_mm_dxf_point(), point2.to_mm_dxf_point())
 
 
 def scaled_text(text, insert, height):
-    return dxf.text(text, insert.to_mm_dxf_point(), height * PLOT_SCALE)
+    return dw.DXFText(text, insert.to_mm_dxf_point(), height * PLOT_SCALE)
 
 
 def output_ground_pins_list(fixture_data, flags):
     """
-    This function generates a list of interface pins
-    within the fixture which are ground BRCs.
+    This function returns the ground index of the
+    interface pins within the fixture which are ground BRCs.
     """
 
-    # get the bottom wires and inserts
-    wires, inserts = fixture_data._bottom
-
     # are asru switched grounds considerered grounds?
     include_asru = flags.gplane_include_asru
 
-    # store ground pins in a set.
-    ground_inserts = set()
-
     # assume that only ground BRCs with a wire
     # will be included in this list.
-
-    for coord, insert_data in inserts.items():
-
-        if insert_data._is_fixture_ground(include_asru=include_asru):
-            ground_inserts.add(insert_data)
-
-    return ground_inserts
+    return gi.build_ground_index(fixture_data.bottom_inserts, include_asru=include_asru)
 
 
 def circle_cross(radius, center, *, cross_overlap=1, initial_angle=45):
@@ -154,9 +141,7 @@ def add_plot_essentials(drawing, fixture_settings, fixture_data, flags):
     origin = fm.CoordTuple(0, 0)
     # first, add the tooling origin.
     for element in circle_cross(1000, origin):
-        element["layer"] = "FIXTURE_OUTLINE"
-
-        drawing.add(element)
+        drawing.add(element, "FIXTURE_OUTLINE")
 
     # Then add the fixture outline.
     # starting by defining the origin
@@ -171,8 +156,7 @@ def add_plot_essentials(drawing, fixture_settings, fixture_data, flags):
                              fm.PHY_FIXTURE_MAXIMUM_Y - fm.Y_TOOLING_OFFSET)
 
     for element in rectangle(top_left, fixture_width, fixture_height):
-        element["layer"] = "FIXTURE_OUTLINE"
-        drawing.add(element)
+        drawing.add(element, "FIXTURE_OUTLINE")
 
     # module outline skipped for now
     # vacuum port skipped for now.
@@ -208,16 +192,14 @@ def add_plot_essentials(drawing, fixture_settings, fixture_data, flags):
 
         coord = brc_name.to_xy(fixture_size)
         pin_circle = scaled_circle(90, coord)
-        pin_circle["layer"] = "TESTER_INTERFACE_PIN"
-        drawing.add(pin_circle)
+        drawing.add(pin_circle, "TESTER_INTERFACE_PIN")
 
         height = 100
         text = scaled_text(brc_name, coord + (150, (-height) / 2), height)
-        text["layer"] = "TESTER_INTERFACE_PIN_LABEL"
-        drawing.add(text)
+        drawing.add(text, "TESTER_INTERFACE_PIN_LABEL")
 
 
-def add_pins(drawing, fixture_settings, fixture_data, ground_inserts, flags):
+def add_pins(drawing, fixture_settings, fixture_data, ground_index, flags):
     """
     This function draws in all of the inserted pins of the fixture.
 
@@ -241,8 +223,6 @@ def add_pins(drawing, fixture_settings, fixture_data, ground_inserts, flags):
     # get a set of corrected pins, bottom only
     bottom_inserts = fixture_data.bottom_inserts
 
-    gnd_brcs = [insert.fix_id.brc for insert in ground_inserts]
-
     for lookup_coord, data in bottom_inserts.items():
 
         coord = data.coord.flip_coord()
@@ -263,8 +243,7 @@ def add_pins(drawing, fixture_settings, fixture_data, ground_inserts, flags):
                 drawing.add_layer("PIN_OFFSET_ARROW", color=144)
 
             line = scaled_line(coord, ideal_coord)
-            line["layer"] = "PIN_OFFSET_ARROW"
-            drawing.add(line)
+            drawing.add(line, "PIN_OFFSET_ARROW")
 
         if coord != lookup_coord and lookup_coord != ideal_coord:
             # ensure the layer has been added.
@@ -274,31 +253,27 @@ def add_pins(drawing, fixture_settings, fixture_data, ground_inserts, flags):
 
             # add circle to indicate location
             pin_circle = scaled_circle(circle_size, lookup_coord)
-            pin_circle["layer"] = f"OLD_FIXTURE_INTERFACE_PIN"
-            drawing.add(pin_circle)
+            drawing.add(pin_circle, f"OLD_FIXTURE_INTERFACE_PIN")
 
             height = circle_size
             x_offset = x_offset = height * 1.5
 
             text = scaled_text(data.fix_id.brc + "_OLD",
                                lookup_coord + (x_offset, (-height) / 2), height)
-            text["layer"] = f"OLD_FIXTURE_INTERFACE_PIN"
-            drawing.add(text)
+            drawing.add(text, f"OLD_FIXTURE_INTERFACE_PIN")
 
             # add line to indicate its origin.
             line = scaled_line(lookup_coord, coord)
-            line["layer"] = f"OLD_FIXTURE_INTERFACE_PIN"
-            drawing.add(line)
+            drawing.add(line, f"OLD_FIXTURE_INTERFACE_PIN")
 
-        if brc in gnd_brcs:
+        if brc in ground_index.brcs:
             layer = "GROUND_INTERFACE_PIN"
         else:
             layer = "FIXTURE_INTERFACE_PIN"
 
         # pin_circle = scaled_circle(442.913385827, Vec2D(x, -y))
         pin_circle = scaled_circle(circle_size, coord)
-        pin_circle["layer"] = layer
-        drawing.add(pin_circle)
+        drawing.add(pin_circle, layer)
 
 
 def add_probes(drawing, fixture_settings, fixture_data, flags):
@@ -347,8 +322,7 @@ def add_probes(drawing, fixture_settings, fixture_data, flags):
                     if not custom_transfer_flag:
                         drawing.add_layer(transfer_layer, color=2)
                         drawing.add_layer(transfer_label_layer, color=50)
-                        layer_object =  drawing.add_layer(transfer_label_brc, color=50)
-                        layer_object.off()
+                        drawing.add_layer(transfer_label_brc, color=50, off=True)
                         custom_transfer_flag = True
 
                 else:
@@ -359,8 +333,7 @@ def add_probes(drawing, fixture_settings, fixture_data, flags):
                     if not transfers_flag:
                         drawing.add_layer(transfer_layer, color=2)
                         drawing.add_layer(transfer_label_layer, color=50)
-                        layer_object = drawing.add_layer(transfer_label_brc, color=50)
-                        layer_object.off()
+                        drawing.add_layer(transfer_label_brc, color=50, off=True)
                         transfers_flag = True
 
                 if side == "BOTTOM":
@@ -373,19 +346,16 @@ def add_probes(drawing, fixture_settings, fixture_data, flags):
                     x_offset = height * 1.5
 
                 pin_circle = scaled_circle(probe_size, coord)
-                pin_circle["layer"] = transfer_layer
-                drawing.add(pin_circle)
+                drawing.add(pin_circle, transfer_layer)
 
                 text = scaled_text(data.fix_id, coord +
                                    (x_offset, (-height) / 2), height)
-                text["layer"] = transfer_label_layer
-                drawing.add(text)
+                drawing.add(text, transfer_label_layer)
                 
                 # add the brc location.
                 text = scaled_text(data.brc, coord +
                                    (x_offset, (-height) / 2), height * 0.8)
-                text["layer"] = transfer_label_brc
-                drawing.add(text)
+                drawing.add(text, transfer_label_brc)
 
                 # draw old transfer on the plot.
 
@@ -399,18 +369,15 @@ def add_probes(drawing, fixture_settings, fixture_data, flags):
 
                     # add circle to indicate location
                     pin_circle = scaled_circle(probe_size, lookup_coord)
-                    pin_circle["layer"] = transfer_layer
-                    drawing.add(pin_circle)
+                    drawing.add(pin_circle, transfer_layer)
 
                     text = scaled_text(
                         data.fix_id + "_OLD", lookup_coord + (x_offset, (-height) / 2), height)
-                    text["layer"] = transfer_layer
-                    drawing.add(text)
+                    drawing.add(text, transfer_layer)
 
                     # add line to indicate its origin.
                     line = scaled_line(lookup_coord, coord)
-                    line["layer"] = transfer_layer
-                    drawing.add(line)
+                    drawing.add(line, transfer_layer)
 
             elif type.endswith("mil"):
                 if not probes_flag:
@@ -426,9 +393,8 @@ def add_probes(drawing, fixture_settings, fixture_data, flags):
                     drawing.add_layer(
                         f"{side}_PROBES_LABEL", color=label_colour)
                         
-                    layer_object = drawing.add_layer(
-                        f"{side}_PROBES_B_R_C", color=label_colour)
-                    layer_object.off()    
+                    drawing.add_layer(
+                        f"{side}_PROBES_B_R_C", color=label_colour, off=True)
                         
                         
                     probes_flag = True
@@ -440,20 +406,17 @@ def add_probes(drawing, fixture_settings, fixture_data, flags):
                     probe_size = 100
 
                 pin_circle = scaled_circle(probe_size, coord)
-                pin_circle["layer"] = f"{side}_PROBES"
-                drawing.add(pin_circle)
+                drawing.add(pin_circle, f"{side}_PROBES")
 
                 height = probe_size
                 x_offset = height * 1.5
                 text = scaled_text(data.fix_id, coord +
                                    (x_offset, (-height) / 2), height)
-                text["layer"] = f"{side}_PROBES_LABEL"
-                drawing.add(text)
+                drawing.add(text, f"{side}_PROBES_LABEL")
                 
                 text = scaled_text(data.brc, coord +
                                    (x_offset, (-height) / 2), height * 0.8)
-                text["layer"] = f"{side}_PROBES_B_R_C"
-                drawing.add(text)
+                drawing.add(text, f"{side}_PROBES_B_R_C")
 
                 if lookup_coord != coord:
                     # ensure the layer has been added.
@@ -463,23 +426,24 @@ def add_probes(drawing, fixture_settings, fixture_data, flags):
 
                     # add circle to indicate location
                     pin_circle = scaled_circle(probe_size, lookup_coord)
-                    pin_circle["layer"] = f"old_{side}_PROBES"
-                    drawing.add(pin_circle)
+                    drawing.add(pin_circle, f"old_{side}_PROBES")
 
                     text = scaled_text(
                         data.fix_id + "_OLD", lookup_coord + (x_offset, (-height) / 2), height)
-                    text["layer"] = f"old_{side}_PROBES"
-                    drawing.add(text)
+                    drawing.add(text, f"old_{side}_PROBES")
 
                     # add line to indicate its origin.
                     line = scaled_line(lookup_coord, coord)
-                    line["layer"] = f"old_{side}_PROBES"
-                    drawing.add(line)
+                    drawing.add(line, f"old_{side}_PROBES")
                     
 
 
 
 def add_wire(inserts, from_xy, to_xy, side):
+    """
+    creates the line for a (finalised) wire, inserts is
+    keyed by the final coordinate of each insert.
+    """
 
     if side == "TOP":
         flip = 1
@@ -551,6 +515,10 @@ def add_wires(drawing, fixture_settings, fixture_data, flags):
 
     for wires, inserts, side in loop_var:
 
+        # the wires have been finalised, so they
+        # refer to the final coordinate of each insert.
+        inserts = {insert.coord: insert for insert in inserts.values()}
+
         layer_flags = {"BLACK": (False, 250),
                        "BLUE": (False, 5),
                        "RED": (False, 10),
@@ -588,13 +556,10 @@ def add_wires(drawing, fixture_settings, fixture_data, flags):
                 layer_flags[flag] = (True, colour_index)
 
             line = add_wire(inserts, from_xy, to_xy, side)
-            line["layer"] = layer_name
-            line["color"] = line_colour
-
-            drawing.add(line)
+            drawing.add(line, layer_name, line_colour)
 
 
-def generate_dxf_elements(f_output_path, fixture_settings, fixture_data, ground_inserts, flags):
+def generate_dxf_elements(f_output_path, fixture_settings, fixture_data, ground_index, flags):
     """
     This function will take the fixure data,
     and plot the contents of it.
@@ -612,29 +577,26 @@ def generate_dxf_elements(f_output_path, fixture_settings, fixture_data, ground_
 
     """
 
-    drawing = dxf.drawing(f_output_path.as_posix())
-    
-    # remove default layers
-    drawing.layers.clear()
+    # the entities are streamed to disk as they are generated,
+    # rather than held in memory until the drawing is saved.
+    with dw.DXFStreamWriter(f_output_path.as_posix()) as drawing:
 
-    # add the fixture essentials ie outlines
-    # tooling origin etc. Also adds pin locations and
-    # names for (suspected) used tester cards.
-    add_plot_essentials(drawing, fixture_settings, fixture_data, flags)
+        # add the fixture essentials ie outlines
+        # tooling origin etc. Also adds pin locations and
+        # names for (suspected) used tester cards.
+        add_plot_essentials(drawing, fixture_settings, fixture_data, flags)
 
-    # add the pins and ground pins of the fixture
-    add_pins(drawing, fixture_settings, fixture_data, ground_inserts, flags)
+        # add the pins and ground pins of the fixture
+        add_pins(drawing, fixture_settings, fixture_data, ground_index, flags)
 
-    # add the probes when in
-    if flags.output_plot:
-        add_probes(drawing, fixture_settings, fixture_data, flags)
-        add_wires(drawing, fixture_settings, fixture_data, flags)
+        # add the probes when in
+        if flags.output_plot:
+            add_probes(drawing, fixture_settings, fixture_data, flags)
+            add_wires(drawing, fixture_settings, fixture_data, flags)
 
+        drawing.header['$CLAYER'] = "FIXTURE_OUTLINE"
 
-
-    drawing.header['$CLAYER'] = "FIXTURE_OUTLINE"
-
-    drawing.save()
+        drawing.save()
 
 
 
@@ -644,16 +606,21 @@ def output_fixture_plot(output_dir,
                         fixture_data,
                         generation_flags,
                         module_list,
-                        flags):
+                        flags,
+                        ground_index=None):
     """
     This function ensures the
     output files can be written to
     before calling the functions to create
     the the ground list and plot.
+
+    ground_index is the target's ground index (see process_fixture_info),
+    it is built from the inserts if not provided.
     """
 
     if flags.fixture_gplane:
-        gnd_inserts = output_ground_pins_list(fixture_data, flags)
+        if ground_index is None:
+            ground_index = output_ground_pins_list(fixture_data, flags)
 
         # create ground plane list in ground
         # plane mode.
@@ -674,8 +641,6 @@ def output_fixture_plot(output_dir,
                 return False
             else:
 
-                brc_list = (gnd_ins.fix_id.brc for gnd_ins in gnd_inserts)
-
                 if flags.throughput_multiplier:
                     f_output_path.write(\
                         "This fixture has throughput multiplier\n"\
@@ -686,12 +651,12 @@ def output_fixture_plot(output_dir,
                     f_output_path.write(
                         "Please ensure the ground plane links all modules.\n")
 
-                for brc in sorted(brc_list, key=op.attrgetter("bank", "row_and_half", "column")):
+                for brc in ground_index.sorted_brcs:
 
                     f_output_path.write("{0}\n".format(brc))
 
     else:
-        gnd_inserts = []
+        ground_index = gi.EMPTY_GROUND_INDEX
 
     # define the output path.
     output_path = output_dir / plot_filename
@@ -712,7 +677,7 @@ def output_fixture_plot(output_dir,
             output_path,
             fixture_settings,
             fixture_data,
-            gnd_inserts,
+            ground_index,
             flags)
 
     return True
@@ -0,0 +1,176 @@
+"""
+This module contains the code used to decide whether a
+target needs to be regenerated.
+
+After a target has been output, a manifest is saved next
+to its outputs. The manifest records the hashes of the
+files the target was generated from ('fixture.o', 'wires',
+'inserts' and any user rule files (.csv) which were used),
+the processing options which affect the output, and the
+hashes of the outputs themselves.
+
+On the next run, if the manifest still matches, the
+target is up to date and does not need to be processed.
+Editing or deleting an output also makes the target stale.
+"""
+
+import json
+import hashlib
+import logging
+
+from pathlib import Path
+from typing import NamedTuple, List
+
+from src.fixture_processor.options_lib import fixture_processing_options as fpo
+
+
+fp_logger = logging.getLogger('fixture_processing.output_manifest')
+
+# increment this when a change to the processing
+# means old outputs should be regenerated.
+MANIFEST_VERSION = 1
+
+# the manifest saved in each of the target folders.
+MANIFEST_FILENAME = ".fixture_manifest"
+
+INPUT_FILENAMES = ["fixture.o", "wires", "inserts"]
+
+# each user rule file is only an input when the option
+# which enables it is selected.
+RULE_FILES = {
+    "remove_custom_wires": fpo.WIRE_REMOVAL_OPTIONS["filename"],
+    "modify_inserts": fpo.INSERTS_MODIFIER_OPTIONS["filename"],
+    "add_custom_wires": fpo.NEW_WIRE_OPTIONS["filename"],
+}
+
+# these options do not change what is output. The target options
+# only choose which targets are processed, and the throughput
+# multiplier is found from 'fixture.o' (which is already hashed)
+IGNORED_OPTIONS = set(["log_level", "disable_checkboxes"]
+                      + list(fpo.EXTRA_VARIABLES)
+                      + fpo.FIXTURE_TARGETS)
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class TargetManifest(NamedTuple):
+    path: Path
+    manifest: dict
+    output_files: List[Path]
+
+
+def hash_file(file_path: Path):
+    """
+    returns the sha256 of the file, or None if it does not exist.
+    """
+
+    file_hash = hashlib.sha256()
+
+    try:
+        with file_path.open("rb") as f_file:
+            for chunk in iter(lambda: f_file.read(HASH_CHUNK_SIZE), b""):
+                file_hash.update(chunk)
+    except FileNotFoundError:
+        return None
+
+    return file_hash.hexdigest()
+
+
+def get_output_files(fixture_dir, target_folder, flags, generation_flags):
+    """
+    returns the files which will be written for this target.
+    """
+
+    if target_folder != ".":
+        output_dir = fixture_dir / target_folder
+        return [output_dir / "wires", output_dir / "inserts"]
+
+    if generation_flags.gplane_plot:
+        output_files = [fixture_dir / "ground_brc_plot.dxf"]
+
+        if flags.fixture_gplane:
+            output_files.append(fixture_dir / "ground_brc_list.txt")
+
+        return output_files
+
+    return [fixture_dir / "full_fixture_plot.dxf"]
+
+
+def get_target_manifest(fixture_dir, target_folder, flags, generation_flags):
+    """
+    creates the manifest describing the current inputs
+    and options for this target.
+    """
+
+    output_files = get_output_files(fixture_dir, target_folder, flags, generation_flags)
+
+    # the plots share the fixture folder, so each
+    # has its own manifest.
+    if target_folder == ".":
+        manifest_path = fixture_dir / f"{MANIFEST_FILENAME}_{output_files[0].stem}"
+    else:
+        manifest_path = fixture_dir / target_folder / MANIFEST_FILENAME
+
+    input_filenames = INPUT_FILENAMES + [filename for option, filename in RULE_FILES.items()
+                                         if getattr(flags, option, False)]
+
+    options = {name: value for name, value in flags._asdict().items()
+               if name not in IGNORED_OPTIONS}
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "target": target_folder,
+        "mode": "gplane_plot" if generation_flags.gplane_plot else "processing",
+        "options": options,
+        "inputs": {filename: hash_file(fixture_dir / filename)
+                   for filename in input_filenames},
+    }
+
+    return TargetManifest(manifest_path, manifest, output_files)
+
+
+def is_up_to_date(target_manifest: TargetManifest):
+    """
+    returns True if the saved manifest matches the current
+    inputs and options, and the outputs are unchanged.
+    """
+
+    try:
+        with target_manifest.path.open() as f_manifest:
+            saved_manifest = json.load(f_manifest)
+    except (OSError, ValueError):
+        return False
+
+    saved_outputs = saved_manifest.pop("outputs", None)
+
+    if saved_manifest != target_manifest.manifest:
+        fp_logger.debug("'%s' inputs or options have changed", target_manifest.path)
+        return False
+
+    current_outputs = {output_file.name: hash_file(output_file)
+                       for output_file in target_manifest.output_files}
+
+    if None in current_outputs.values() or saved_outputs != current_outputs:
+        fp_logger.debug("'%s' outputs are missing or have changed", target_manifest.path)
+        return False
+
+    return True
+
+
+def save_manifest(target_manifest: TargetManifest):
+    """
+    saves the manifest, along with the hashes of the newly
+    written outputs. A manifest which cannot be saved
+    only means the target is regenerated next time.
+    """
+
+    manifest = dict(target_manifest.manifest)
+
+    manifest["outputs"] = {output_file.name: hash_file(output_file)
+                           for output_file in target_manifest.output_files}
+
+    try:
+        with target_manifest.path.open("w") as f_manifest:
+            json.dump(manifest, f_manifest, indent=2)
+    except OSError as err:
+        fp_logger.warning("unable to save manifest '%s': %s", target_manifest.path, err)
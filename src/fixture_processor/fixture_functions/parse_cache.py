@@ -0,0 +1,85 @@
+"""
+This module contains a small cache used to avoid re-parsing
+fixture files which have not changed between runs.
+
+The fixture is parsed in stages, each stage depending on the
+files used by the stages before it:
+
+    fixture.o -> inserts -> wires
+
+Each stage is stored along with the signatures (size,
+modification time) of the files it depends on, so a change
+to 'wires' only re-parses the wires, while a change to
+'fixture.o' re-parses everything.
+
+The cached data is shared between runs, so it must not be
+modified (the transforms already work on copies).
+"""
+
+import logging
+
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+
+fp_logger = logging.getLogger('fixture_processing.parse_cache')
+
+
+class FileSignature(NamedTuple):
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+def get_signature(file_path: Path) -> Optional[FileSignature]:
+    """
+    returns a signature which changes when the file
+    is modified or replaced (None if it does not exist).
+    """
+
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+
+    return FileSignature(stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+class ParseCache:
+    """
+    Holds the most recent result of each parse stage.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, stage, fixture_dir, filenames, parse_function):
+        """
+        returns the cached result of 'stage' if none of 'filenames'
+        (in fixture_dir) have changed, otherwise 'parse_function'
+        is called and its result is cached.
+        """
+
+        key = (Path(fixture_dir).resolve(),
+               tuple(get_signature(fixture_dir / filename) for filename in filenames))
+
+        cached = self.stages.get(stage)
+
+        if cached is not None and cached[0] == key:
+            fp_logger.debug("'%s' parse cache hit", stage)
+            self.hits += 1
+            return cached[1]
+
+        fp_logger.debug("'%s' parse cache miss", stage)
+        self.misses += 1
+
+        result = parse_function()
+        self.stages[stage] = (key, result)
+
+        return result
+
+    def clear(self):
+        "removes all of the cached results."
+        self.stages.clear()
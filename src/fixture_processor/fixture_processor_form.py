@@ -5,7 +5,6 @@ create the options form.
 
 import tkinter as tk
 from tkinter import messagebox as mb
-from collections import namedtuple
 from typing import NamedTuple
 from pathlib import Path
 
@@ -15,8 +14,8 @@ from src.fixture_processor.options_lib.options_functions import OptionsForm
 from src.fixture_processor.options_lib.fixture_processing_options import WIDGET_LIST
 
 from src.fixture_processor import file_operations as fo
-from src.fixture_processor.fixture_functions import fixture_modifications as fm
-from src.fixture_processor.fixture_functions import extract_wires as ew
+from src.fixture_processor.background_task import BackgroundTask
+from src.fixture_processor.helper_functions import flush_logs
 
 
 # ====== TS: Extract from __init__ ==========
@@ -30,6 +29,49 @@ fp_options = generate_option_functions(get_section_comments(), get_options())
 USER_OPTIONS_FILE = "user_options.ini"
 
 
+def import_extract_wires():
+    """
+    the processing pipeline (and dxfwrite) is slow to import,
+    so it is imported the first time it is used, not at startup.
+    """
+    from src.fixture_processor.fixture_functions import extract_wires
+    return extract_wires
+
+
+def import_fixture_modifications():
+    "see import_extract_wires."
+    from src.fixture_processor.fixture_functions import fixture_modifications
+    return fixture_modifications
+
+
+def run_fixture_processing(fixture_path, processing_options, generation_flags,
+                           parse_cache=None, profile_options=None, progress=None):
+    """
+    processes the fixture (see extract_wires.process_fixture_info),
+    returns the ProcessingResult.
+
+    if profile_options is given, each stage is profiled,
+    see performance_lib.stage_profiler.
+    """
+
+    ew = import_extract_wires()
+
+    if profile_options is None:
+        return ew.process_fixture_info(fixture_path, processing_options,
+                                       generation_flags, parse_cache, progress)
+
+    from src.fixture_processor.performance_lib.stage_profiler import StageProfiler
+
+    profiler = StageProfiler.for_fixture(profile_options, fixture_path)
+
+    try:
+        return ew.process_fixture_info(fixture_path, processing_options,
+                                       generation_flags, parse_cache, progress,
+                                       profiler)
+    finally:
+        profiler.write()
+
+
 class GenerationTuple(NamedTuple):
     processing: bool
     gplane_plot: bool
@@ -41,16 +83,10 @@ class WidgetDict(dict):
     @property
     def encode_settings(self):
 
-        extra_variables = fixture_processing_options.EXTRA_VARIABLES
-
-        field_names = list(self) + list(extra_variables)
-
-        encode_tuple = namedtuple("processing_options", field_names)
-
         variable_data = {name: widget.variable.get()
                          for name, widget in self.items()}
 
-        return encode_tuple(**variable_data, **extra_variables)
+        return fixture_processing_options.encode_options(variable_data)
 
 
 class FixtureProcessingForm(OptionsForm):
@@ -61,25 +97,15 @@ class FixtureProcessingForm(OptionsForm):
 
     def __init__(self, engineering_flag, window, master=None):
 
-        # ensure the master / root is applied properly.
-        if master:
-            tk.Frame.__init__(self, master)
+        OptionsForm.__init__(self, fp_options, master)
 
         self.window = window
         self.engineering_flag = engineering_flag
 
-        # add the user config buttons
-        self.open_remove_wires_config = lambda: self.create_and_open_file(
-            "remove_wires.csv",
-            fm.get_wire_removal_instructions())
-
-        self.open_modify_inserts_config = lambda: self.create_and_open_file(
-            "modify_inserts.csv",
-            fm.get_inserts_modifier_instructions())
-
-        self.open_add_wires_config = lambda: self.create_and_open_file(
-            "add_wires.csv",
-            fm.get_wire_addition_instructions())
+        # the latest background processing run (if any),
+        # and the callback for when it is done.
+        self.processing_task = None
+        self.processing_done = None
 
         # keep a list of checkboxes, which can be disabled
         # when required.
@@ -90,8 +116,6 @@ class FixtureProcessingForm(OptionsForm):
 
         self.add_widgets()
 
-        self.options_functions = fp_options
-
     @property
     def fixture_path(self):
         return self.window.fixture_path
@@ -114,35 +138,107 @@ class FixtureProcessingForm(OptionsForm):
         fo.create_file_stub(file_path, stub_text)
         fo.open_file_for_editing(file_path)
 
+    # the user config buttons.
+    def open_remove_wires_config(self):
+        fm = import_fixture_modifications()
+        self.create_and_open_file("remove_wires.csv",
+                                  fm.get_wire_removal_instructions())
+
+    def open_modify_inserts_config(self):
+        fm = import_fixture_modifications()
+        self.create_and_open_file("modify_inserts.csv",
+                                  fm.get_inserts_modifier_instructions())
+
+    def open_add_wires_config(self):
+        fm = import_fixture_modifications()
+        self.create_and_open_file("add_wires.csv",
+                                  fm.get_wire_addition_instructions())
+
     def open_folder(self):
         fo.open_folder(self.fixture_path)
 
     def clean_targets(self):
+        ew = import_extract_wires()
 
         if ew.clean_targets(self.fixture_path):
             mb.showinfo("cleanup complete",
                         "    Target output files removed successfully.")
 
-    def process_wi(self):
+    def start_processing(self, generation_flags, on_done=None, on_message=None):
+        """
+        processes the fixture in the background, showing the
+        progress (and a cancel button) in the main window.
+
+        on_done (if given) is called with the ProcessingResult,
+        or None if the processing failed. on_message (if given)
+        is passed the message boxes shown while processing.
+        """
+
+        # only one run at a time.
+        if self.is_processing:
+            return self.processing_task
 
+        # the options are read here, as tk is not thread safe.
         processing_options = self.user_data_widgets.encode_settings
 
+        self.processing_task = BackgroundTask(run_fixture_processing,
+                                              self.fixture_path, processing_options,
+                                              generation_flags, self.window.parse_cache,
+                                              self.window.profile_options,
+                                              on_progress=self.window.show_progress,
+                                              on_done=self.processing_finished,
+                                              on_error=self.processing_failed,
+                                              on_message=on_message)
+
+        self.processing_done = on_done
+
+        self.window.start_progress(self.cancel_processing)
+
+        return self.processing_task.start(self)
+
+    @property
+    def is_processing(self):
+        """
+        is True until the worker has stopped, a cancelled
+        run may still be cleaning the targets.
+        """
+        return self.processing_task is not None and self.processing_task.thread.is_alive()
+
+    def cancel_processing(self):
+        if self.processing_task is not None:
+            self.processing_task.cancel()
+
+        self.window.stop_progress()
+
+    def processing_finished(self, processing_result):
+        self.window.stop_progress()
+
+        if self.processing_done is not None:
+            self.processing_done(processing_result)
+
+    def processing_failed(self, error):
+        self.window.stop_progress()
+
+        flush_logs()
+        mb.showerror("ERROR", f"    Unable to process the fixture:\n    {error}")
+
+        if self.processing_done is not None:
+            self.processing_done(None)
+
+    def process_wi(self):
+
         generation_flags = GenerationTuple(processing=True,
                                            gplane_plot=False,
                                            wires_plot=False)
 
-        ew.process_fixture_info(self.fixture_path, processing_options,
-                                generation_flags)
+        return self.start_processing(generation_flags)
 
     def generate_gplane_data(self):
         """
         """
 
-        processing_options = self.user_data_widgets.encode_settings
-
         generation_flags = GenerationTuple(processing=False,
                                            gplane_plot=True,
                                            wires_plot=False)
 
-        ew.process_fixture_info(self.fixture_path, processing_options,
-                                generation_flags)
+        return self.start_processing(generation_flags)
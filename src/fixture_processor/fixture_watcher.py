@@ -0,0 +1,82 @@
+"""
+This module contains the code used to watch a fixture
+directory for changes to the files used when processing.
+
+The watcher simply polls the files (no external services
+are needed), and waits for the changes to settle
+(debouncing) before reporting them. Editors often save
+a file in several steps, and designers often save several
+files in quick succession.
+"""
+
+import time
+
+from pathlib import Path
+
+from src.fixture_processor.fixture_functions.parse_cache import get_signature
+from src.fixture_processor.options_lib import fixture_processing_options as fpo
+
+
+# the files which affect the processing outputs.
+WATCHED_FILES = ["fixture.o", "wires", "inserts",
+                 fpo.WIRE_REMOVAL_OPTIONS["filename"],
+                 fpo.INSERTS_MODIFIER_OPTIONS["filename"],
+                 fpo.NEW_WIRE_OPTIONS["filename"]]
+
+# how often the files are checked (by the window), and how long they
+# must be unchanged before the changes are reported.
+POLL_INTERVAL = 0.1
+DEBOUNCE_TIME = 0.25
+
+
+class FixtureWatcher:
+    """
+    Call 'poll' regularly (the window polls it every
+    POLL_INTERVAL), it returns the set of files which
+    have changed, once the changes have settled.
+    """
+
+    def __init__(self, fixture_dir: Path, debounce_time=DEBOUNCE_TIME,
+                 filenames=None):
+
+        self.fixture_dir = Path(fixture_dir)
+        self.debounce_time = debounce_time
+        self.filenames = WATCHED_FILES if filenames is None else filenames
+
+        self.signatures = self.get_signatures()
+        self.changed_files = set()
+        self.last_change = None
+
+    def get_signatures(self):
+        "returns the current signature of each watched file"
+        return {filename: get_signature(self.fixture_dir / filename)
+                for filename in self.filenames}
+
+    def poll(self, now=None):
+        """
+        checks the watched files for changes.
+
+        returns the set of changed filenames once no further
+        changes have been seen for 'debounce_time' seconds,
+        otherwise an empty set is returned.
+        """
+
+        if now is None:
+            now = time.monotonic()
+
+        signatures = self.get_signatures()
+
+        changed_files = {filename for filename, signature in signatures.items()
+                         if signature != self.signatures[filename]}
+
+        if changed_files:
+            self.signatures = signatures
+            self.changed_files |= changed_files
+            self.last_change = now
+            return set()
+
+        if self.changed_files and now - self.last_change >= self.debounce_time:
+            changed_files, self.changed_files = self.changed_files, set()
+            return changed_files
+
+        return set()
@@ -1,8 +1,16 @@
-
 """
 The aim of this module is to store helper functions,
 not specific to fixture processing.
 """
+import os
+import queue
+import atexit
+import logging
+import threading
+
+from contextlib import contextmanager
+from tkinter import messagebox
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
 def error_message_header(filename, parsing=False):
@@ -28,3 +36,156 @@ def error_message_header(filename, parsing=False):
                f"    {line_number}: '{raw_line}'\n"
         
     return inner
+
+
+class TaskCancelled(Exception):
+    """
+    raised (by a progress callback) to stop a long
+    task, once it has been cancelled by the user.
+    """
+
+
+class MessageBox(threading.local):
+    """
+    A drop in replacement for tkinter's messagebox,
+    used by the processing code.
+
+    By default the message is shown in a dialog, but
+    a thread can redirect its messages elsewhere
+    (for instance when processing without a window).
+    """
+
+    handler = None
+
+    def _show(self, kind, title, message):
+
+        # the log is written before an error is shown,
+        # in case the program is closed from the dialog.
+        if kind == "error":
+            flush_logs()
+
+        if self.handler is not None:
+            return self.handler(kind, title, message)
+
+        return getattr(messagebox, f"show{kind}")(title, message)
+
+    def showerror(self, title, message):
+        return self._show("error", title, message)
+
+    def showwarning(self, title, message):
+        return self._show("warning", title, message)
+
+    def showinfo(self, title, message):
+        return self._show("info", title, message)
+
+    @contextmanager
+    def redirect(self, handler):
+        """
+        while active, messages shown from this thread
+        are passed to handler(kind, title, message)
+        instead of being displayed.
+        """
+
+        old_handler = self.handler
+        self.handler = handler
+        try:
+            yield
+        finally:
+            self.handler = old_handler
+
+
+message_box = MessageBox()
+
+
+class QueueLogging:
+    """
+    Routes the log records (of every logger) through a queue,
+    to a size rotating log file, written by a listener thread.
+    So logging never waits on the file (which may be on a
+    network drive).
+
+    The log is written (and closed) at exit, see flush and stop.
+    """
+
+    # the QueueLogging which has been started (if any), see flush_logs.
+    active = None
+
+    def __init__(self, log_path, level=logging.DEBUG, max_bytes=5_000_000,
+                 backup_count=3, log_queue=None):
+
+        self.level = level
+
+        # the file is only opened once the first record is written.
+        self.file_handler = RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding="utf-8", delay=True)
+        self.file_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+        # a multiprocessing queue can be given, for worker processes.
+        self.queue = queue.SimpleQueue() if log_queue is None else log_queue
+
+        self.queue_handler = QueueHandler(self.queue)
+        self.listener = QueueListener(self.queue, self.file_handler)
+
+        self.lock = threading.Lock()
+        self.started = False
+
+    def rollover(self):
+        """
+        starts a new log file, the previous log is kept as a backup.
+        raises PermissionError if the log is open in another program
+        (on windows).
+        """
+        if os.path.isfile(self.file_handler.baseFilename):
+            self.file_handler.doRollover()
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+
+            root_logger = logging.getLogger()
+            root_logger.setLevel(self.level)
+            root_logger.addHandler(self.queue_handler)
+
+            self.listener.start()
+            self.started = True
+
+        QueueLogging.active = self
+        atexit.register(self.stop)
+
+    def flush(self):
+        "waits for the queued records to be written to the log file."
+
+        with self.lock:
+            if not self.started:
+                return
+
+            # stopping the listener writes every queued record.
+            self.listener.stop()
+            self.file_handler.flush()
+            self.listener.start()
+
+    def stop(self):
+        "writes the queued records, then closes the log file."
+
+        with self.lock:
+            if not self.started:
+                return
+
+            logging.getLogger().removeHandler(self.queue_handler)
+
+            self.listener.stop()
+            self.file_handler.close()
+            self.started = False
+
+        if QueueLogging.active is self:
+            QueueLogging.active = None
+
+
+def flush_logs():
+    "writes the queued log records (if QueueLogging has been started)."
+
+    queue_logging = QueueLogging.active
+    if queue_logging is not None:
+        queue_logging.flush()
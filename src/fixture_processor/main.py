@@ -1,10 +1,9 @@
 # Admin /stdlib library imports.
 import os
 import sys
-import base64
 import argparse
-import tempfile
 import logging
+import time
 
 
 
@@ -23,8 +22,11 @@ from typing import NamedTuple
 # from src.fixture_processor.options_lib import fixture_processing_options as fp_options
 # from src.fixture_processor.fixture_functions.fixture_input import get_outline_info
 
-from src.fixture_processor.fixture_processor_form import FixtureProcessingForm
+from src.fixture_processor.fixture_processor_form import FixtureProcessingForm, GenerationTuple
 from src.fixture_processor.fixture_canvas_form import FixtureCanvas
+from src.fixture_processor.helper_functions import QueueLogging, flush_logs
+from src.fixture_processor.fixture_watcher import FixtureWatcher, POLL_INTERVAL
+from src.fixture_processor.fixture_functions.parse_cache import ParseCache
 
 # from src.fixture_processor.fixture_functions import extract_wires as ew
 # from src.fixture_processor.fixture_functions import fixture_processing as fp
@@ -33,6 +35,7 @@ from src.fixture_processor.fixture_canvas_form import FixtureCanvas
 
 # ========= TS: Extract from __init__ ==========
 from src.fixture_processor.options_lib.options_functions import generate_option_functions
+from src.fixture_processor.options_lib.options_functions import CachedOptions
 from src.fixture_processor.options_lib.program_options import get_section_comments
 from src.fixture_processor.options_lib.program_options import get_options
 
@@ -52,23 +55,39 @@ PROGRAM_LOGGING_FILE = "ffp.log"
 
 USER_OPTIONS_FILE = "user_options.ini"
 
-# ensure the program folder exists.
-PROGRAM_CONFIG_FOLDER.mkdir(parents=True, exist_ok=True)
+# the processing profiles (see the --Profile argument) are written here.
+PROGRAM_PROFILE_FOLDER = "profiles"
 
 FULL_LOGGING_PATH = Path(f"{PROGRAM_CONFIG_FOLDER}/{PROGRAM_LOGGING_FILE}")
 
+# the log is rotated once it reaches this size (in bytes),
+# the previous logs are kept as 'ffp.log.1' etc.
+LOGGING_MAX_BYTES = 5_000_000
+LOGGING_BACKUP_COUNT = 3
 
-try:
-    if FULL_LOGGING_PATH.is_file():
-        FULL_LOGGING_PATH.unlink()
-        
-except PermissionError:
-    root = tk.Tk()
-    root.withdraw()
-    mb.showerror(
-        "program error",
-        "    This program is already running.\n\n    Closing...")
-    sys.exit()
+
+def prepare_program_folder(queue_logging):
+    """
+    ensures the program folder exists, and starts a new log (the
+    previous log is kept as a backup). The log can not be rotated
+    while another instance of the program is running (and logging
+    to it), so the program closes.
+
+    called at startup (not on import).
+    """
+
+    PROGRAM_CONFIG_FOLDER.mkdir(parents=True, exist_ok=True)
+
+    try:
+        queue_logging.rollover()
+
+    except PermissionError:
+        root = tk.Tk()
+        root.withdraw()
+        mb.showerror(
+            "program error",
+            "    This program is already running.\n\n    Closing...")
+        sys.exit()
 
 
 icon = "".join([
@@ -92,6 +111,23 @@ icon = "".join([
     ])
 
 
+def set_window_icon(root):
+    """
+    sets the window icon. tk decodes the (base64 png) icon from
+    memory, once for each root, the image is kept on the root.
+    """
+
+    icon_image = getattr(root, "icon_image", None)
+
+    if icon_image is None:
+        icon_image = tk.PhotoImage(master=root, data=icon)
+        root.icon_image = icon_image
+
+    root.call('wm', 'iconphoto', root._w, icon_image)
+
+    return icon_image
+
+
 class ModeTuple(NamedTuple):
     design: bool = False
     debug: bool = False
@@ -103,7 +139,8 @@ class Window(tk.Frame):
     The main window of the fixture processing software.
     """
 
-    def __init__(self, fixture_path, engineering_flag, master=None):
+    def __init__(self, fixture_path, engineering_flag, watch_flag=False, master=None,
+                 profile_options=None):
 
         if master:
             tk.Frame.__init__(self, master)
@@ -118,6 +155,23 @@ class Window(tk.Frame):
         # is True if the engineering flag is passed into the program.
         self.engineering_flag = engineering_flag
 
+        # the parsed fixture is kept between runs, so only
+        # the changed files are parsed again.
+        self.parse_cache = ParseCache()
+
+        # the program options, shared by the window and the canvas.
+        self.program_options_cache = CachedOptions(
+            p_options.load, PROGRAM_CONFIG_FOLDER / PROGRAM_CONFIG_FILE)
+
+        # is not None when the fixture directory is being watched.
+        self.fixture_watcher = None
+
+        # is not None when each processing run is profiled.
+        self.profile_options = profile_options
+
+        # the status bar text, when nothing is in progress.
+        self.idle_status = ""
+
         self.pack()
 
         self.width_ratio = 1.6
@@ -128,13 +182,24 @@ class Window(tk.Frame):
         self.load_fixture(fixture_path)
         self.add_job_widgets()
 
+        if watch_flag:
+            self.watch_variable.set(True)
+            self.toggle_watch()
+
     def get_program_options(self):
         """
         The following function will:
         create the 'forwessun_fixtures' folder in roaming,
         and will the 'config.ini' config file (if it doesn't exist)
         if they do exist, then the config is loaded and stored to self.
+
+        the loaded options are a read only snapshot, which is
+        only loaded again once 'config.ini' has changed.
         """
+        program_options = self.program_options_cache.get()
+        if program_options is not None:
+            return program_options
+
         write_error = False
 
         if not PROGRAM_CONFIG_FOLDER.exists():
@@ -147,14 +212,13 @@ class Window(tk.Frame):
             # config location.
             sys.exit()
 
-        config_path = Path(f"{PROGRAM_CONFIG_FOLDER}/{PROGRAM_CONFIG_FILE}")
+        config_path = self.program_options_cache.path
 
         if not config_path.exists():
             with config_path.open("w") as f_config:
                 p_options.save({}, f_config)
 
-        with config_path.open() as f_config:
-            return p_options.load(f_config)
+        return self.program_options_cache.get()
 
     def create_widgets(self):
         """Creates window widgets"""
@@ -169,6 +233,11 @@ class Window(tk.Frame):
 
         self.menubar.add_command(label="Redraw", command=self.redraw_fixture)
 
+        self.watch_variable = tk.BooleanVar(value=False)
+        self.menubar.add_checkbutton(label="Watch",
+                                     variable=self.watch_variable,
+                                     command=self.toggle_watch)
+
         self.master.config(menu=self.menubar)
 
         # The Header for the window
@@ -199,6 +268,54 @@ class Window(tk.Frame):
 
         self.ntbk_tabs.add(self.fixture_canvas, text="Fixture Layout Plot.")
 
+        # shows the state of the watch mode, and loading progress.
+        self.lbl_status = tk.Label(self, anchor=tk.W)
+        self.lbl_status.grid(row=4, column=1, columnspan=6,
+                             sticky=tk.W, padx=5)
+
+        # shows the processing progress, hidden when idle.
+        self.prg_processing = ttk.Progressbar(self, mode="determinate")
+        self.prg_processing.grid(row=5, column=1, columnspan=5,
+                                 sticky=tk.EW, padx=5, pady=[0, 5])
+        self.prg_processing.grid_remove()
+
+        self.cmd_cancel = tk.Button(self, text="Cancel")
+        self.cmd_cancel.grid(row=5, column=6, padx=5, pady=[0, 5])
+        self.cmd_cancel.grid_remove()
+
+    def show_status(self, text=None):
+        """
+        shows text in the status bar, or the idle
+        status (ie watching) if no text is given.
+        """
+        self.lbl_status["text"] = self.idle_status if text is None else text
+
+    def start_progress(self, cancel_command):
+        "shows the progress bar, and the cancel button."
+
+        self.prg_processing["value"] = 0
+        self.cmd_cancel["command"] = cancel_command
+
+        self.prg_processing.grid()
+        self.cmd_cancel.grid()
+
+        self.show_status("Processing...")
+
+    def show_progress(self, stage, target, step, total_steps):
+        self.prg_processing["maximum"] = total_steps
+        self.prg_processing["value"] = step
+
+        target_text = f" ({target})" if target else ""
+        self.show_status(f"Processing... {stage}{target_text}, step {step} of {total_steps}")
+
+    def stop_progress(self):
+        "hides the progress bar, once processing has finished (or was cancelled)."
+
+        self.prg_processing.grid_remove()
+        self.cmd_cancel.grid_remove()
+
+        self.show_status()
+
     def add_job_widgets(self):
         """
         These contain the widgets to be added after the job has been loaded,
@@ -277,6 +394,7 @@ class Window(tk.Frame):
                     if not_present:
                         logging.info(f"{file.name} in {file.parent} is not a valid file")
 
+                    flush_logs()
                     mb.showerror("ERROR", error_message)
                     fixture_path = None
 
@@ -314,9 +432,98 @@ class Window(tk.Frame):
         self.program_options = self.get_program_options()
         self.fixture_path = self.validate_fixture_path(fixture_path)
 
+        # a new cache (rather than clearing it), as a background
+        # run may still be reading the previous fixture's cache.
+        self.parse_cache = ParseCache()
+
         # draw the outline of the fixture to the fixture canvas.
         self.fixture_canvas.load_fixture_and_draw()
 
+        # watch the newly loaded fixture instead.
+        if self.fixture_watcher is not None:
+            self.fixture_watcher = FixtureWatcher(self.fixture_path)
+
+    def toggle_watch(self):
+        """
+        starts (or stops) watching the fixture directory. while
+        watching, the fixture is re-processed each time one
+        of its files changes.
+        """
+
+        if self.watch_variable.get():
+            logging.info("watching %s for changes", self.fixture_path)
+            self.fixture_watcher = FixtureWatcher(self.fixture_path)
+            self.idle_status = "Watching for changes..."
+            self.show_status()
+            self.poll_watcher()
+        else:
+            logging.info("stopped watching %s", self.fixture_path)
+            self.fixture_watcher = None
+            self.idle_status = ""
+            self.show_status()
+
+    def poll_watcher(self):
+        """
+        checks for changed files, then schedules the next check.
+        """
+
+        if self.fixture_watcher is None:
+            return
+
+        # the changes are picked up (together) by the first
+        # poll after the current run has finished.
+        if self.fp_form.is_processing:
+            self.after(int(POLL_INTERVAL * 1000), self.poll_watcher)
+            return
+
+        changed_files = self.fixture_watcher.poll()
+
+        if changed_files:
+            self.process_changes(changed_files)
+
+        self.after(int(POLL_INTERVAL * 1000), self.poll_watcher)
+
+    def process_changes(self, changed_files):
+        """
+        redraws the canvas (if the fixture has changed) and
+        re-processes the fixture (in the background). Only errors
+        and warnings are shown as message boxes, other messages
+        are shown in the status bar.
+        """
+
+        logging.info("watched files changed: %s", ", ".join(sorted(changed_files)))
+
+        start = time.perf_counter()
+
+        if "fixture.o" in changed_files:
+            self.fixture_canvas.load_fixture_and_draw()
+
+        def show_message(kind, title, message):
+            if kind == "info":
+                return
+            getattr(mb, f"show{kind}")(title, message)
+
+        def processing_done(processing_result):
+            if processing_result is None or not processing_result.success:
+                status = "FAILED"
+            elif not processing_result.processed:
+                status = "up to date"
+            else:
+                status = "processed"
+
+            self.idle_status = "Watching for changes... {} ({}) at {} in {:.2f}s".format(
+                ", ".join(sorted(changed_files)), status,
+                time.strftime("%H:%M:%S"), time.perf_counter() - start)
+
+            # the canvas may still be loading.
+            if self.fixture_canvas.load_task is None:
+                self.show_status()
+
+        self.fp_form.start_processing(
+            GenerationTuple(processing=True, gplane_plot=False, wires_plot=False),
+            on_done=processing_done, on_message=show_message)
+
+
 
 
 
@@ -347,7 +554,92 @@ def main():
         default=None
         )
 
+    help_text = ("Processes each fixture directory (or glob of directories) "
+                 "without opening the window, using each fixtures saved user options.")
+    parser.add_argument('-B', '--Batch',
+        type=str,
+        nargs="+",
+        metavar="FIXTURE_DIR",
+        help=help_text,
+        default=None
+        )
+
+    help_text = "The number of worker processes used in batch mode (defaults to the cpu count)."
+    parser.add_argument('-W', '--Workers',
+        type=int,
+        help=help_text,
+        default=None
+        )
+
+    help_text = "Watches the fixture directory, re-processing the fixture when its files change."
+    parser.add_argument('--Watch',
+        help=help_text,
+        action='store_true',
+        default=False
+        )
+
+    help_text = ("Profiles each stage of the processing, writing the profiles to "
+                 f"the '{PROGRAM_PROFILE_FOLDER}' folder of the program folder.")
+    parser.add_argument('--Profile', '--profile',
+        dest='Profile',
+        help=help_text,
+        action='store_true',
+        default=False
+        )
+
+    help_text = "The number of functions listed for each stage in the profile summary."
+    parser.add_argument('--Profile-Top',
+        dest='Profile_Top',
+        type=int,
+        help=help_text,
+        default=30
+        )
+
+    help_text = "Also writes a collapsed stack file (for flame graphs) when profiling."
+    parser.add_argument('--Collapsed',
+        help=help_text,
+        action='store_true',
+        default=False
+        )
+
     args = parser.parse_args()
+
+    # the log file is written by a listener thread, so logging
+    # never waits on the (possibly network) program folder.
+    if args.Batch is not None:
+        import multiprocessing
+
+        # the worker processes log through the same queue.
+        log_queue = multiprocessing.Queue()
+        log_level = logging.INFO
+    else:
+        log_queue = None
+        log_level = logging.DEBUG
+
+    queue_logging = QueueLogging(FULL_LOGGING_PATH, log_level, LOGGING_MAX_BYTES,
+                                 LOGGING_BACKUP_COUNT, log_queue)
+
+    prepare_program_folder(queue_logging)
+    queue_logging.start()
+
+    if args.Profile:
+        from src.fixture_processor.performance_lib.stage_profiler import ProfileOptions
+
+        profile_options = ProfileOptions(PROGRAM_CONFIG_FOLDER / PROGRAM_PROFILE_FOLDER,
+                                         top=args.Profile_Top,
+                                         collapsed=args.Collapsed)
+    else:
+        profile_options = None
+
+    if args.Batch is not None:
+        # the processing pipeline is only imported when it is needed.
+        from src.fixture_processor import batch_processor
+
+        success = batch_processor.batch_main(args.Batch, workers=args.Workers,
+                                             profile_options=profile_options,
+                                             log_queue=log_queue)
+        sys.exit(0 if success else 1)
+
     str_fixture_path = args.Path
     engineering_flag = args.Engineering
 
@@ -367,29 +659,21 @@ def main():
     root = tk.Tk()
     root.resizable(False, False)
 
-    with tempfile.NamedTemporaryFile('w+b',delete=False) as outputfile:
-        outputfile.write(base64.b64decode(icon))
-        
-    img = tk.PhotoImage(file=outputfile.name)
-    root.call('wm', 'iconphoto', root._w, img)
-    
-    try:
-        os.unlink(outputfile.name)
-    except:
-        pass
+    set_window_icon(root)
     
     # create root object for tkinter
 
 
-    logging.basicConfig(filename=FULL_LOGGING_PATH,
-                        level=logging.DEBUG)
-
     app = Window(fixture_path,
                  engineering_flag,
-                 master=root)
+                 watch_flag=args.Watch,
+                 master=root,
+                 profile_options=profile_options)
 
     app.mainloop()
 
+    queue_logging.stop()
+
 
 # # begin the main program.
 # if __name__ == "__main__":
@@ -26,7 +26,7 @@ The current settings will be:
 
 """
 
-from collections import OrderedDict # ,  namedtuple
+from collections import OrderedDict, namedtuple
 # from pathlib import Path
 # from string import hexdigits
 # from dataclasses import dataclass
@@ -164,6 +164,21 @@ WIDGET_LIST.append(HELPER_COMMANDS)
 EXTRA_VARIABLES = {'throughput_multiplier': False}
 
 
+def encode_options(option_values):
+    """
+    converts a flat dict of {option name: value}
+    (from the form, or from a user options file)
+    into the processing options tuple passed
+    to the transforms.
+    """
+
+    field_names = list(option_values) + list(EXTRA_VARIABLES)
+
+    encode_tuple = namedtuple("processing_options", field_names)
+
+    return encode_tuple(**option_values, **EXTRA_VARIABLES)
+
+
 # todo - Modifiy the get section comments to it uses the
 # option dictionary data above.
 def get_section_comments():
@@ -17,6 +17,7 @@ This file is intended to perform 2 actions.
 import configparser
 from collections import OrderedDict
 from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Optional, List, NamedTuple, Callable, Any
 from contextlib import contextmanager
 
@@ -277,8 +278,72 @@ def generate_option_functions(section_comments_dict, options_dict):
     return ReturnTuple(save_options, load_options)
 
 
+def freeze_options(user_options):
+    """
+    returns a read only view of the loaded options,
+    so a shared snapshot can not be changed by mistake.
+    """
+
+    return MappingProxyType(OrderedDict(
+        (section, MappingProxyType(OrderedDict(section_data)))
+        for section, section_data in user_options.items()))
+
+
+class CachedOptions:
+    """
+    Loads an options (ini) file with 'load_options' (see
+    generate_option_functions) into a read only snapshot.
+
+    The file is only loaded (and validated) again when its
+    path, modification time or size changes, so the snapshot
+    can be looked up each time it is needed.
+    """
+
+    def __init__(self, load_options, path=None):
+        self.load_options = load_options
+        self.path = path
+
+        # (path, mtime, size) of the loaded file.
+        self.file_key = None
+        self.snapshot = None
+
+    def get(self, path=None):
+        """
+        returns the options snapshot, or None
+        if the options file does not exist.
+        """
+
+        path = self.path if path is None else path
+
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        file_key = (str(path), stat.st_mtime_ns, stat.st_size)
+
+        if file_key != self.file_key:
+            with path.open() as f_options:
+                self.snapshot = freeze_options(self.load_options(f_options))
+            self.file_key = file_key
+
+        return self.snapshot
+
+
 class OptionsForm(tk.Frame):
 
+    def __init__(self, options_functions, master=None):
+
+        # ensure the master / root is applied properly.
+        if master:
+            tk.Frame.__init__(self, master)
+
+        # see generate_option_functions.
+        self.options_functions = options_functions
+
+        # the user options file is only read again once it changes.
+        self.user_options_cache = CachedOptions(options_functions.load)
+
     @staticmethod
     def on_update(self):
         """
@@ -604,8 +669,7 @@ class OptionsForm(tk.Frame):
         if not user_options_path.is_file():
             return
 
-        with user_options_path.open() as f_user_options:
-            user_options_layout = self.options_functions.load(f_user_options)
+        user_options_layout = self.user_options_cache.get(user_options_path)
 
         # go through each section, updating the varibles
         for section_name, section_data in user_options_layout.items():
@@ -0,0 +1,409 @@
+"""
+This module benchmarks the processing pipeline on synthetic
+fixtures (see synthetic_fixture) of increasing size.
+
+Each stage of the pipeline is timed separately:
+
+    - get_fixture_info (parsing the fixture.o, inserts and wires)
+    - each transform (see fixture_processing.get_transforms)
+    - finalise_fixture_data
+    - output_wires_inserts
+    - output_fixture_plot
+
+The transforms are chained on each target, as they are when
+processing, a transform's time is the total over the targets.
+
+The peak memory of each stage is measured (with tracemalloc) by
+running the stage a second time, as tracemalloc slows the stage
+down.
+
+The report (json and markdown) includes a complexity fit of each
+stage, the 'exponent' k of time ~ wires ** k, so a stage which
+scales badly shows up as k ~ 2, rather than as a slow fixture.
+
+    python -m src.fixture_processor.performance_lib.benchmark --sizes 1000 10000
+"""
+
+import io
+import json
+import math
+import time
+import functools
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+from pathlib import Path
+from datetime import datetime
+from typing import NamedTuple
+
+from src.fixture_processor.helper_functions import message_box as mb
+from src.fixture_processor.performance_lib import synthetic_fixture as sf
+
+
+fp_logger = logging.getLogger('fixture_processing.benchmark')
+
+# the (approximate) number of wires in each benchmark fixture.
+BENCHMARK_SIZES = (1000, 10000, 100000, 500000)
+
+REPORT_FILENAME = "benchmark_report"
+
+# the processing options used, every transform is selected.
+BENCHMARK_OPTIONS = dict(remove_custom_wires=True,
+                         remove_terminal_wires=True,
+                         remove_tj_transfers=True,
+                         fixture_gplane=True,
+                         modify_inserts=True,
+                         pin_offset_fix=True,
+                         add_custom_wires=True,
+                         output_plot=True,
+                         wiring_machine=True,
+                         verifier=True)
+
+# the targets processed, "." is the fixture plot.
+BENCHMARK_TARGETS = ("wiring_machine", "verifier", ".")
+
+
+class StageResult(NamedTuple):
+    stage: str
+    seconds: float
+    # bytes, 0 if not measured.
+    peak_memory: int = 0
+    error: str = ""
+
+
+def spec_for_wires(wires):
+    """
+    returns the FixtureSpec of a fixture with (about) the given
+    number of wires. There are a limited number of pins (BRCs),
+    so large fixtures have more probes per node.
+    """
+
+    boards = 4
+    probes_per_node = max(4, math.ceil(wires / 2000) - 1)
+
+    # each node has a wire for each probe, and one between its pins.
+    nodes = max(4, math.ceil(wires / (boards * (probes_per_node + 1))))
+
+    return sf.FixtureSpec(boards=boards,
+                          nodes=nodes,
+                          ground_nodes=2,
+                          pins_per_node=2,
+                          probes_per_node=probes_per_node,
+                          top_probes=2,
+                          user_modifications=10)
+
+
+class StageTimer:
+    """
+    runs the stages of a benchmark, recording their results.
+    Messages boxes shown by a stage are recorded as errors.
+    """
+
+    def __init__(self, measure_memory=True):
+        self.measure_memory = measure_memory
+        self.results = {}
+        self.messages = []
+
+    def collect_message(self, kind, title, message):
+        if kind == "error":
+            self.messages.append(" ".join(message.split()))
+
+    def run(self, stage, function, *args):
+        """
+        returns the result of function(*args), the time
+        is added to the stage (a stage may be run more than once).
+        """
+
+        self.messages = []
+
+        with mb.redirect(self.collect_message):
+            start = time.perf_counter()
+            result = function(*args)
+            seconds = time.perf_counter() - start
+
+            peak_memory = 0
+            if self.measure_memory:
+                tracemalloc.start()
+                try:
+                    function(*args)
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+        error = "; ".join(self.messages)
+        if not error and (result is None or result is False):
+            error = "failed"
+
+        previous = self.results.get(stage)
+        if previous is not None:
+            seconds += previous.seconds
+            peak_memory = max(peak_memory, previous.peak_memory)
+            error = previous.error or error
+
+        self.results[stage] = StageResult(stage, seconds, peak_memory, error)
+
+        if error:
+            raise RuntimeError(f"the '{stage}' stage failed: {error}")
+
+        return result
+
+
+def benchmark_fixture(fixture_dir, measure_memory=True):
+    """
+    processes the fixture stage by stage (in the same order as
+    process_fixture_info), returns the StageResults in order.
+    """
+
+    # the pipeline is imported here, so it is not
+    # imported when the module is imported.
+    from src.fixture_processor.batch_processor import load_processing_options
+    from src.fixture_processor.fixture_processor_form import GenerationTuple
+    from src.fixture_processor.fixture_functions import extract_wires as ew
+    from src.fixture_processor.fixture_functions import fixture_processing as fp
+    from src.fixture_processor.fixture_functions import output_data as od
+    from src.fixture_processor.fixture_functions import ground_index as gi
+    from src.fixture_processor.fixture_functions.fixture_output import output_wires_inserts
+
+    timer = StageTimer(measure_memory)
+
+    flags = load_processing_options(fixture_dir)._replace(**BENCHMARK_OPTIONS)
+    generation_flags = GenerationTuple(processing=True, gplane_plot=False, wires_plot=False)
+
+    original_fixture_data, _, module_list = timer.run(
+        "get_fixture_info", ew.get_fixture_info, fixture_dir)
+
+    wires_settings = ew.get_settings(fixture_dir / "wires")
+    inserts_settings = ew.get_settings(fixture_dir / "inserts")
+
+    original_fixture_data = original_fixture_data._replace(
+        fixture_size=inserts_settings["fixture_size"])
+
+    transforms_dict = fp.get_transforms()
+
+    for target_folder in BENCHMARK_TARGETS:
+        output_dir = fixture_dir / target_folder
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        fixture_data = original_fixture_data
+        fixture_target = ew.get_fixture_target(target_folder)
+
+        ground_index = gi.get_target_ground_index(fixture_data, flags)
+
+        for name, transform in ew.get_target_transforms(transforms_dict, flags, target_folder):
+            if name in fp.GROUND_INDEX_TRANSFORMS:
+                transform = functools.partial(transform, ground_index=ground_index)
+
+            fixture_data = timer.run(name, transform, fixture_dir, fixture_data,
+                                     flags, fixture_target)
+
+        fixture_data = timer.run("finalise_fixture_data", fp.finalise_fixture_data, fixture_data)
+
+        if target_folder == ".":
+            timer.run("output_fixture_plot", od.output_fixture_plot,
+                      output_dir, "full_fixture_plot.dxf", inserts_settings,
+                      fixture_data, generation_flags, module_list, flags, ground_index)
+            continue
+
+        for name, settings in (("wires", wires_settings), ("inserts", inserts_settings)):
+            timer.run("output_wires_inserts", output_wires_inserts,
+                      output_dir, fixture_dir, settings, fixture_data, name)
+
+    return list(timer.results.values())
+
+
+def fit_complexity(points):
+    """
+    fits time = c * size ** exponent (a straight line on a
+    log-log plot) to the (size, seconds) points.
+
+    returns (exponent, r_squared), or None if there are
+    not enough points.
+    """
+
+    points = [(math.log(size), math.log(seconds))
+              for size, seconds in points if size > 0 and seconds > 0]
+
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    syy = sum((y - mean_y) ** 2 for _, y in points)
+
+    if not sxx:
+        return None
+
+    exponent = sxy / sxx
+    r_squared = (sxy * sxy) / (sxx * syy) if syy else 1.0
+
+    return exponent, r_squared
+
+
+def calibrate(repeat=10, size=20000):
+    """
+    times a fixed workload, similar to parsing (formatting, splitting
+    and looking up BRC like strings). The stage times are divided by
+    this, so reports from different machines can be compared.
+
+    returns the fastest time (in seconds).
+    """
+
+    best = math.inf
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+
+        lookup = {}
+        for number in range(size):
+            brc = f"({number % 2 + 1} {number % 23:02}.00 {number % 78:>5}.0)"
+            lookup[brc] = brc.strip("()").split()
+
+        sorted(lookup.items())
+
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def run_benchmarks(sizes=BENCHMARK_SIZES, work_dir=None, measure_memory=True):
+    """
+    writes a synthetic fixture of each size (into work_dir, or a
+    temporary directory) and benchmarks it. returns the report.
+    """
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir if work_dir is None else work_dir)
+
+        runs = []
+
+        for wires in sizes:
+            fixture_dir = work_dir / f"synthetic_{wires}"
+
+            fp_logger.info("benchmarking a fixture with %d wires", wires)
+            synthetic = sf.write_synthetic_fixture(fixture_dir, spec_for_wires(wires))
+
+            stages = benchmark_fixture(fixture_dir, measure_memory)
+
+            runs.append({
+                "target_wires": wires,
+                "wires": synthetic.bottom_wires + synthetic.top_wires,
+                "inserts": synthetic.bottom_inserts + synthetic.top_inserts,
+                "stages": [stage._asdict() for stage in stages]})
+
+    fits = {}
+    for stage in get_stage_names(runs):
+        fit = fit_complexity(
+            [(run["wires"], stage_result["seconds"])
+             for run in runs for stage_result in run["stages"]
+             if stage_result["stage"] == stage])
+
+        if fit is not None:
+            exponent, r_squared = fit
+            fits[stage] = {"exponent": round(exponent, 3), "r_squared": round(r_squared, 3)}
+
+    return {"created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "calibration": calibrate(),
+            "measure_memory": measure_memory,
+            "runs": runs,
+            "fits": fits}
+
+
+def get_stage_names(runs):
+    "the stage names, in the order they are run."
+
+    names = {}
+    for run in runs:
+        for stage_result in run["stages"]:
+            names.setdefault(stage_result["stage"], None)
+
+    return list(names)
+
+
+def format_report(report):
+    "returns the report as a markdown table, a row for each stage."
+
+    runs = report["runs"]
+
+    f_report = io.StringIO()
+
+    f_report.write(f"# Benchmark report ({report['created']})\n\n")
+    f_report.write(f"Python {report['python']} on {report['platform']}, "
+                   f"calibration {report['calibration']:.4f}s\n\n")
+
+    header = ["Stage"] + [f"{run['wires']} wires" for run in runs] + ["Exponent", "R²"]
+    f_report.write("| " + " | ".join(header) + " |\n")
+    f_report.write("|" + "|".join("---" for _ in header) + "|\n")
+
+    for stage in get_stage_names(runs):
+        row = [stage]
+
+        for run in runs:
+            stage_results = {result["stage"]: result for result in run["stages"]}
+            result = stage_results.get(stage)
+
+            if result is None:
+                row.append("-")
+            elif report["measure_memory"]:
+                row.append(f"{result['seconds']:.3f}s / {result['peak_memory'] / 1e6:.1f}MB")
+            else:
+                row.append(f"{result['seconds']:.3f}s")
+
+        fit = report["fits"].get(stage)
+        if fit is None:
+            row.extend(["-", "-"])
+        else:
+            row.extend([f"{fit['exponent']:.2f}", f"{fit['r_squared']:.2f}"])
+
+        f_report.write("| " + " | ".join(row) + " |\n")
+
+    return f_report.getvalue()
+
+
+def write_report(report, output_dir):
+    """
+    writes the report to 'benchmark_report.json' and
+    'benchmark_report.md' in output_dir.
+    """
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    json_path = output_dir / f"{REPORT_FILENAME}.json"
+    json_path.write_text(json.dumps(report, indent=2))
+
+    (output_dir / f"{REPORT_FILENAME}.md").write_text(format_report(report), encoding="utf-8")
+
+    return json_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the processing pipeline on synthetic fixtures.")
+
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_SIZES,
+                        help="the number of wires in each fixture.")
+    parser.add_argument("--output", type=Path, default=Path("."),
+                        help="the directory the report is written to.")
+    parser.add_argument("--work-dir", type=Path, default=None,
+                        help="the directory the fixtures are written to (kept).")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skips measuring the peak memory of each stage.")
+
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.work_dir, measure_memory=not args.no_memory)
+    write_report(report, args.output)
+
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
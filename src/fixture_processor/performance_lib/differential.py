@@ -0,0 +1,640 @@
+"""
+This module checks a candidate version of the processing pipeline
+(by default the working tree) against a legacy version (by default
+the first commit), so a fast path can be shown to give the same
+results as the code it replaced.
+
+Each version is run (see differential_driver) on a copy of each
+fixture, real fixtures and synthetic ones (see synthetic_fixture),
+and the results are compared:
+
+    - the parsed fixture data, and the fixture data of each target
+      (after the transforms), as json.
+    - the output files, byte for byte, ignoring the date line.
+    - the error (if any), and the messages shown.
+
+The time of each stage is reported with the speedup over the
+legacy version. When a fixture differs, it can be shrunk (--shrink)
+to a smaller fixture which still differs: a synthetic fixture is
+regenerated with a smaller FixtureSpec, then lines are removed
+from the wires and inserts files while the difference remains.
+
+    python -m src.fixture_processor.performance_lib.differential path/to/fixture
+    python -m src.fixture_processor.performance_lib.differential --synthetic 1000 --shrink
+
+The exit code is 1 if any fixture differs.
+
+There are no known differences from the first commit. If the
+outputs are changed on purpose later, --ignore skips the outputs
+and checkpoints which are expected to differ, or a later
+--legacy-ref (from after the change) can be given.
+"""
+
+import io
+import sys
+import json
+import shutil
+import fnmatch
+import logging
+import tarfile
+import argparse
+import tempfile
+import subprocess
+
+from pathlib import Path
+from typing import NamedTuple
+
+from src.fixture_processor.performance_lib import benchmark
+from src.fixture_processor.performance_lib import synthetic_fixture as sf
+from src.fixture_processor.performance_lib import differential_driver as dd
+from src.fixture_processor.fixture_functions.fixture_output import DATE_LINE_PREFIX
+
+
+fp_logger = logging.getLogger('fixture_processing.differential')
+
+REPOSITORY_DIR = Path(__file__).resolve().parents[3]
+DRIVER_PATH = Path(dd.__file__).resolve()
+
+# the synthetic fixtures are processed with every transform selected,
+# and both ground plane outputs.
+SYNTHETIC_OPTIONS = dict(benchmark.BENCHMARK_OPTIONS,
+                         fixture_gplane=True,
+                         gplane_include_asru=True)
+
+# the number of differences listed for each structure.
+MAX_STRUCTURE_DIFFERENCES = 5
+
+# the number of runs (of both versions) allowed when shrinking a fixture.
+MAX_SHRINK_TESTS = 200
+
+# the files shrunk, line by line.
+SHRINK_FILES = ("wires", "inserts")
+
+REPORT_FILENAME = "differential_report.md"
+
+
+class Difference(NamedTuple):
+    # "error", "messages", "checkpoints", "structure" or "output".
+    kind: str
+    name: str
+    detail: str
+
+    def __str__(self):
+        return f"{self.kind} '{self.name}': {self.detail}"
+
+
+class RunResult(NamedTuple):
+    stages: dict
+    checkpoints: list
+    messages: list
+    error: str
+    traceback: str
+
+    structures_dir: Path
+    outputs_dir: Path
+
+
+class FixtureResult(NamedTuple):
+    name: str
+    legacy: RunResult
+    candidate: RunResult
+    differences: list
+
+    # the shrunk fixture (if the fixture differs, and was shrunk).
+    shrunk_dir: Path = None
+
+    @property
+    def matched(self):
+        return not self.differences
+
+
+def get_root_commit(repository_dir=REPOSITORY_DIR):
+    "the first commit of the repository, the default legacy version."
+
+    return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"],
+                          cwd=repository_dir, capture_output=True, text=True,
+                          check=True).stdout.split()[0]
+
+
+def export_tree(ref, tree_dir, repository_dir=REPOSITORY_DIR):
+    "writes the 'src' folder of the git ref into tree_dir, returns tree_dir."
+
+    archive = subprocess.run(["git", "archive", "--format=tar", ref, "src"],
+                             cwd=repository_dir, capture_output=True, check=True).stdout
+
+    tree_dir = Path(tree_dir)
+    tree_dir.mkdir(parents=True, exist_ok=True)
+
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(tree_dir, filter="data")
+
+    return tree_dir
+
+
+def get_output_files(fixture_dir, input_files):
+    """
+    the (relative paths of the) files written by the processing,
+    the files which are new, or have changed, since input_files
+    (a dict of relative path to content). Hidden files are skipped.
+    """
+
+    output_files = {}
+
+    for path in sorted(Path(fixture_dir).rglob("*")):
+        relative_path = path.relative_to(fixture_dir).as_posix()
+
+        if not path.is_file() or any(part.startswith(".") for part in Path(relative_path).parts):
+            continue
+
+        content = path.read_bytes()
+        if input_files.get(relative_path) != content:
+            output_files[relative_path] = content
+
+    return output_files
+
+
+def run_implementation(tree, fixture_dir, run_dir, options):
+    """
+    runs the pipeline of tree on a copy of fixture_dir, returns the
+    RunResult. The copy is made at the same path (run_dir.parent /
+    'fixture') for every version, as the path is in the output.
+    """
+
+    run_dir = Path(run_dir)
+    if run_dir.exists():
+        shutil.rmtree(run_dir)
+    run_dir.mkdir(parents=True)
+
+    fixture_copy = run_dir.parent / "fixture"
+    if fixture_copy.exists():
+        shutil.rmtree(fixture_copy)
+    shutil.copytree(fixture_dir, fixture_copy)
+
+    input_files = {path.relative_to(fixture_copy).as_posix(): path.read_bytes()
+                   for path in fixture_copy.rglob("*") if path.is_file()}
+
+    completed = subprocess.run(
+        [sys.executable, str(DRIVER_PATH), str(tree), str(fixture_copy),
+         str(run_dir), json.dumps(options)],
+        cwd=tree, capture_output=True, text=True)
+
+    result_path = run_dir / dd.RESULT_FILENAME
+
+    if result_path.is_file():
+        result = json.loads(result_path.read_text())
+    else:
+        # the driver itself failed.
+        stderr_lines = completed.stderr.strip().splitlines()
+        result = {"stages": {}, "checkpoints": [], "messages": [],
+                  "error": stderr_lines[-1] if stderr_lines else f"exit code {completed.returncode}",
+                  "traceback": completed.stderr}
+
+    outputs_dir = run_dir / "outputs"
+    for relative_path, content in get_output_files(fixture_copy, input_files).items():
+        output_path = outputs_dir / relative_path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(content)
+
+    shutil.rmtree(fixture_copy)
+
+    return RunResult(result["stages"], result["checkpoints"], result["messages"],
+                     result["error"], result["traceback"],
+                     run_dir / dd.STRUCTURES_FOLDER, outputs_dir)
+
+
+def compare_output(legacy, candidate):
+    """
+    compares the contents of two output files, the date lines are
+    ignored. returns a description of the first difference, or "".
+    """
+
+    legacy_lines = legacy.splitlines(keepends=True)
+    candidate_lines = candidate.splitlines(keepends=True)
+
+    for line_number, (legacy_line, candidate_line) in enumerate(
+            zip(legacy_lines, candidate_lines), start=1):
+
+        if legacy_line == candidate_line:
+            continue
+
+        legacy_text = legacy_line.rstrip(b"\r\n")
+        candidate_text = candidate_line.rstrip(b"\r\n")
+
+        if legacy_text == candidate_text:
+            return f"line {line_number}: the line endings differ"
+
+        if (legacy_text.startswith(DATE_LINE_PREFIX.encode())
+                and candidate_text.startswith(DATE_LINE_PREFIX.encode())
+                and legacy_line[len(legacy_text):] == candidate_line[len(candidate_text):]):
+            continue
+
+        return f"line {line_number}: {legacy_text!r} != {candidate_text!r}"
+
+    if len(legacy_lines) != len(candidate_lines):
+        return f"{len(legacy_lines)} lines != {len(candidate_lines)} lines"
+
+    return ""
+
+
+def diff_structures(legacy, candidate, path="$"):
+    "yields (path, description) for each difference between two json structures."
+
+    if type(legacy) is not type(candidate):
+        yield path, f"{type(legacy).__name__} != {type(candidate).__name__}"
+
+    elif isinstance(legacy, dict):
+        for key in legacy.keys() | candidate.keys():
+            if key not in candidate:
+                yield f"{path}.{key}", "missing from the candidate"
+            elif key not in legacy:
+                yield f"{path}.{key}", "missing from the legacy"
+            else:
+                yield from diff_structures(legacy[key], candidate[key], f"{path}.{key}")
+
+    elif isinstance(legacy, list):
+        if len(legacy) != len(candidate):
+            yield path, f"{len(legacy)} items != {len(candidate)} items"
+
+        for index, (legacy_item, candidate_item) in enumerate(zip(legacy, candidate)):
+            yield from diff_structures(legacy_item, candidate_item, f"{path}[{index}]")
+
+    elif legacy != candidate:
+        yield path, f"{legacy!r} != {candidate!r}"
+
+
+def is_ignored(name, ignore):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in ignore)
+
+
+def compare_runs(legacy, candidate, ignore=()):
+    """
+    returns the differences (a list of Difference) between the
+    results of the legacy and candidate versions. ignore is a
+    list of patterns, of the output files and checkpoints skipped.
+    """
+
+    differences = []
+
+    if legacy.error != candidate.error:
+        differences.append(Difference("error", "processing",
+                                      f"{legacy.error or 'no error'} != {candidate.error or 'no error'}"))
+
+    if legacy.messages != candidate.messages:
+        differences.append(Difference("messages", "message boxes",
+                                      f"{legacy.messages} != {candidate.messages}"))
+
+    checkpoints = [checkpoint for checkpoint in legacy.checkpoints
+                   if not is_ignored(checkpoint, ignore)]
+
+    if checkpoints != [checkpoint for checkpoint in candidate.checkpoints
+                       if not is_ignored(checkpoint, ignore)]:
+        differences.append(Difference("checkpoints", "structures",
+                                      f"{legacy.checkpoints} != {candidate.checkpoints}"))
+
+    for checkpoint in checkpoints:
+        if checkpoint not in candidate.checkpoints:
+            continue
+
+        filename = checkpoint.replace("/", "__") + ".json"
+        structure_differences = list(diff_structures(
+            json.loads((legacy.structures_dir / filename).read_text()),
+            json.loads((candidate.structures_dir / filename).read_text())))
+
+        if structure_differences:
+            details = [f"{path}: {description}"
+                       for path, description in structure_differences[:MAX_STRUCTURE_DIFFERENCES]]
+            if len(structure_differences) > MAX_STRUCTURE_DIFFERENCES:
+                details.append(f"({len(structure_differences)} differences)")
+
+            differences.append(Difference("structure", checkpoint, "; ".join(details)))
+
+    legacy_outputs = {path.relative_to(legacy.outputs_dir).as_posix(): path
+                      for path in legacy.outputs_dir.rglob("*") if path.is_file()}
+    candidate_outputs = {path.relative_to(candidate.outputs_dir).as_posix(): path
+                         for path in candidate.outputs_dir.rglob("*") if path.is_file()}
+
+    for relative_path in sorted(legacy_outputs.keys() | candidate_outputs.keys()):
+        if is_ignored(relative_path, ignore):
+            continue
+
+        if relative_path not in candidate_outputs:
+            differences.append(Difference("output", relative_path, "not written by the candidate"))
+        elif relative_path not in legacy_outputs:
+            differences.append(Difference("output", relative_path, "not written by the legacy"))
+        else:
+            detail = compare_output(legacy_outputs[relative_path].read_bytes(),
+                                    candidate_outputs[relative_path].read_bytes())
+            if detail:
+                differences.append(Difference("output", relative_path, detail))
+
+    return differences
+
+
+def check_fixture(fixture_dir, legacy_tree, candidate_tree, work_dir, options, ignore=(), name=None):
+    "runs both versions on the fixture, and returns the FixtureResult."
+
+    work_dir = Path(work_dir)
+
+    legacy = run_implementation(legacy_tree, fixture_dir, work_dir / "legacy", options)
+    candidate = run_implementation(candidate_tree, fixture_dir, work_dir / "candidate", options)
+
+    return FixtureResult(name or Path(fixture_dir).name, legacy, candidate,
+                         compare_runs(legacy, candidate, ignore))
+
+
+def get_failure(differences):
+    """
+    the kinds of difference, which a shrunk fixture has to keep.
+    an error (of either version) is only kept if it was the only
+    difference, so a fixture isn't shrunk into one that can't be parsed.
+    """
+
+    kinds = {difference.kind for difference in differences}
+    return kinds - {"error"} or kinds
+
+
+def shrink_spec(spec, still_fails):
+    """
+    returns the smallest FixtureSpec (found by reducing each field in
+    turn) for which still_fails(spec) is True. The fields which default
+    to a positive number are kept positive, and a spec which can't be
+    written (ValueError) doesn't fail.
+    """
+
+    def fails(new_spec):
+        try:
+            return still_fails(new_spec)
+        except ValueError:
+            return False
+
+    changed = True
+    while changed:
+        changed = False
+
+        for field, value in spec._asdict().items():
+            if isinstance(value, bool):
+                candidates = [False] if value else []
+            elif isinstance(value, int):
+                lowest = 0 if sf.FixtureSpec._field_defaults[field] == 0 else 1
+                candidates = sorted({lowest, value // 2} - {value})
+                candidates = [candidate for candidate in candidates if lowest <= candidate < value]
+            elif isinstance(value, float):
+                candidates = [0.0] if value else []
+            else:
+                candidates = []
+
+            for candidate in candidates:
+                new_spec = spec._replace(**{field: candidate})
+
+                if fails(new_spec):
+                    spec = new_spec
+                    changed = True
+                    break
+
+    return spec
+
+
+def shrink_lines(fixture_dir, filename, still_fails, max_tests=MAX_SHRINK_TESTS):
+    """
+    removes lines from fixture_dir / filename while still_fails()
+    is True, removing large chunks of lines first (as delta debugging
+    does). The file is left with the smallest failing content.
+
+    returns the number of tests (calls to still_fails) used.
+    """
+
+    file_path = Path(fixture_dir) / filename
+    lines = file_path.read_text().splitlines(keepends=True)
+
+    tests = 0
+    chunks = 2
+
+    while len(lines) >= 2 and tests < max_tests:
+        chunk_size = max(1, len(lines) // chunks)
+        removed = False
+
+        for start in range(0, len(lines), chunk_size):
+            if tests >= max_tests:
+                break
+
+            new_lines = lines[:start] + lines[start + chunk_size:]
+            file_path.write_text("".join(new_lines))
+            tests += 1
+
+            if still_fails():
+                lines = new_lines
+                chunks = max(chunks - 1, 2)
+                removed = True
+                break
+
+        if not removed:
+            if chunk_size == 1:
+                break
+            chunks = min(chunks * 2, len(lines))
+
+    file_path.write_text("".join(lines))
+
+    return tests
+
+
+def shrink_fixture(fixture_dir, result, legacy_tree, candidate_tree, work_dir, options,
+                   ignore=(), spec=None, max_tests=MAX_SHRINK_TESTS):
+    """
+    writes a smaller fixture (than fixture_dir) with the same kind of
+    differences as result, returns its directory. A synthetic fixture
+    (with spec) is regenerated from a smaller spec first.
+    """
+
+    work_dir = Path(work_dir)
+    failure = get_failure(result.differences)
+
+    shrunk_dir = work_dir / "shrunk"
+    test_dir = work_dir / "test_fixture"
+
+    def fixture_fails(test_fixture_dir):
+        test_result = check_fixture(test_fixture_dir, legacy_tree, candidate_tree,
+                                    work_dir / "shrinking", options, ignore)
+        return bool(failure & get_failure(test_result.differences))
+
+    if shrunk_dir.exists():
+        shutil.rmtree(shrunk_dir)
+
+    if spec is not None:
+        def spec_fails(new_spec):
+            if test_dir.exists():
+                shutil.rmtree(test_dir)
+            sf.write_synthetic_fixture(test_dir, new_spec)
+            return fixture_fails(test_dir)
+
+        spec = shrink_spec(spec, spec_fails)
+        fp_logger.info("shrunk the synthetic fixture to %s", spec)
+
+        sf.write_synthetic_fixture(shrunk_dir, spec)
+    else:
+        shutil.copytree(fixture_dir, shrunk_dir)
+
+    for filename in SHRINK_FILES:
+        if (shrunk_dir / filename).is_file():
+            tests = shrink_lines(shrunk_dir, filename, lambda: fixture_fails(shrunk_dir), max_tests)
+            fp_logger.info("shrunk '%s' in %d tests", filename, tests)
+
+    if test_dir.exists():
+        shutil.rmtree(test_dir)
+
+    return shrunk_dir
+
+
+def format_speedup(legacy_seconds, candidate_seconds):
+    if legacy_seconds is None or candidate_seconds is None:
+        return "-"
+    if candidate_seconds == 0:
+        return "inf"
+    return f"{legacy_seconds / candidate_seconds:.2f}x"
+
+
+def format_seconds(seconds):
+    return "-" if seconds is None else f"{seconds:.3f}s"
+
+
+def format_report(results):
+    "returns the report as markdown, the differences and stage times of each fixture."
+
+    f_report = io.StringIO()
+    f_report.write("# Differential report\n\n")
+
+    for result in results:
+        status = "MATCH" if result.matched else "DIFF"
+        f_report.write(f"## {result.name}: {status}\n\n")
+
+        for difference in result.differences:
+            f_report.write(f"- {difference}\n")
+
+        if result.shrunk_dir is not None:
+            f_report.write(f"- shrunk fixture: {result.shrunk_dir}\n")
+
+        if result.differences or result.shrunk_dir is not None:
+            f_report.write("\n")
+
+        # the stages in the order they are run, the candidate may have new stages.
+        stages = list(dict.fromkeys(list(result.legacy.stages) + list(result.candidate.stages)))
+
+        f_report.write("| Stage | Legacy | Candidate | Speedup |\n")
+        f_report.write("|---|---|---|---|\n")
+
+        for stage in stages:
+            legacy_seconds = result.legacy.stages.get(stage)
+            candidate_seconds = result.candidate.stages.get(stage)
+
+            f_report.write(f"| {stage} | {format_seconds(legacy_seconds)} | "
+                           f"{format_seconds(candidate_seconds)} | "
+                           f"{format_speedup(legacy_seconds, candidate_seconds)} |\n")
+
+        legacy_total = sum(result.legacy.stages.values())
+        candidate_total = sum(result.candidate.stages.values())
+
+        f_report.write(f"| total | {format_seconds(legacy_total)} | "
+                       f"{format_seconds(candidate_total)} | "
+                       f"{format_speedup(legacy_total, candidate_total)} |\n\n")
+
+    return f_report.getvalue()
+
+
+def run_differential(fixture_dirs=(), synthetic_sizes=(), legacy_tree=None, candidate_tree=REPOSITORY_DIR,
+                     work_dir=None, options=None, ignore=(), shrink=False, max_tests=MAX_SHRINK_TESTS):
+    """
+    checks each fixture (and a synthetic fixture of each size), returns
+    a list of FixtureResult. The fixtures are processed with options
+    (by default the option defaults, SYNTHETIC_OPTIONS for the synthetic
+    fixtures). By default the legacy version is the first commit.
+    """
+
+    work_dir = Path(tempfile.mkdtemp(prefix="differential_") if work_dir is None else work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    if legacy_tree is None:
+        legacy_tree = export_tree(get_root_commit(), work_dir / "legacy_tree")
+
+    fixtures = [(Path(fixture_dir).resolve().name, Path(fixture_dir), None, {})
+                for fixture_dir in fixture_dirs]
+
+    for wires in synthetic_sizes:
+        spec = benchmark.spec_for_wires(wires)
+        fixture_dir = work_dir / "synthetic" / f"synthetic_{wires}"
+        sf.write_synthetic_fixture(fixture_dir, spec)
+
+        fixtures.append((fixture_dir.name, fixture_dir, spec, SYNTHETIC_OPTIONS))
+
+    results = []
+
+    for index, (name, fixture_dir, spec, default_options) in enumerate(fixtures):
+        fixture_work_dir = work_dir / f"{index:02d}_{name}"
+        fixture_options = default_options if options is None else options
+
+        fp_logger.info("checking '%s'", fixture_dir)
+        result = check_fixture(fixture_dir, legacy_tree, candidate_tree,
+                               fixture_work_dir, fixture_options, ignore, name)
+
+        if shrink and not result.matched:
+            shrunk_dir = shrink_fixture(fixture_dir, result, legacy_tree, candidate_tree,
+                                        fixture_work_dir, fixture_options, ignore, spec, max_tests)
+            result = result._replace(shrunk_dir=shrunk_dir)
+
+        results.append(result)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares the processing of a candidate version against a legacy version.")
+
+    parser.add_argument("fixture_dirs", type=Path, nargs="*")
+    parser.add_argument("--synthetic", type=int, nargs="+", default=[],
+                        help="the number of wires of each synthetic fixture checked.")
+    parser.add_argument("--legacy-ref", default=None,
+                        help="the git ref of the legacy version (default the first commit).")
+    parser.add_argument("--legacy-tree", type=Path, default=None,
+                        help="the directory of the legacy version (instead of --legacy-ref).")
+    parser.add_argument("--candidate", type=Path, default=REPOSITORY_DIR,
+                        help="the directory of the candidate version (default this tree).")
+    parser.add_argument("--options", type=json.loads, default=None,
+                        help="the processing options (json), updating the defaults.")
+    parser.add_argument("--ignore", action="append", default=[],
+                        help="a pattern of output files or checkpoints not compared.")
+    parser.add_argument("--shrink", action="store_true",
+                        help="shrinks each fixture which differs.")
+    parser.add_argument("--max-shrink-tests", type=int, default=MAX_SHRINK_TESTS)
+    parser.add_argument("--work-dir", type=Path, default=None,
+                        help="the directory the fixture copies and results are written to (kept).")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="the directory the report is written to.")
+
+    args = parser.parse_args()
+
+    if not args.fixture_dirs and not args.synthetic:
+        parser.error("no fixtures given, see --synthetic")
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="differential_"))
+
+    legacy_tree = args.legacy_tree
+    if legacy_tree is None and args.legacy_ref is not None:
+        legacy_tree = export_tree(args.legacy_ref, work_dir / "legacy_tree")
+
+    results = run_differential(args.fixture_dirs, args.synthetic, legacy_tree, args.candidate,
+                               work_dir, args.options, args.ignore, args.shrink,
+                               args.max_shrink_tests)
+
+    report = format_report(results)
+
+    if args.output is not None:
+        args.output.mkdir(parents=True, exist_ok=True)
+        (args.output / REPORT_FILENAME).write_text(report, encoding="utf-8")
+
+    print(report)
+    print(f"results written to {work_dir}")
+
+    return 0 if all(result.matched for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
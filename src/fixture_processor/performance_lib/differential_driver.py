@@ -0,0 +1,271 @@
+"""
+This script runs the processing pipeline of a source tree (the
+current tree, or an older version exported by the differential
+harness) on a fixture, stage by stage, saving the parsed and
+transformed structures and the stage times. See differential.
+
+    python differential_driver.py <tree> <fixture_dir> <output_dir> <options json>
+
+It is run (in its own interpreter) against older versions of the
+code, so only the standard library is imported at the top. The
+fixture is processed by the tree's own process_fixture_info, the
+driver is its profiler (see Driver.run). The versions without a
+profiler have the functions it calls (get_fixture_info, the
+transforms, output_fixture_plot and output_wires_inserts) hooked
+instead, see Driver.hook_stages.
+"""
+
+import sys
+import json
+import time
+import inspect
+import decimal
+import contextlib
+import traceback
+
+from pathlib import Path
+from collections import namedtuple
+
+
+RESULT_FILENAME = "result.json"
+STRUCTURES_FOLDER = "structures"
+
+GenerationTuple = namedtuple("GenerationTuple", ["processing", "gplane_plot", "wires_plot"])
+
+
+def normalise(value):
+    """
+    converts a parsed structure into plain json data, so structures
+    from different versions of the code can be compared. Named tuples
+    become dicts, dicts become lists of [key, value] (in order, as
+    the order is output) and sets are sorted.
+    """
+
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return {field: normalise(item) for field, item in zip(value._fields, value)}
+
+    if isinstance(value, dict):
+        return [[normalise(key), normalise(item)] for key, item in value.items()]
+
+    if isinstance(value, (list, tuple)):
+        return [normalise(item) for item in value]
+
+    if isinstance(value, (set, frozenset)):
+        return sorted((normalise(item) for item in value), key=json.dumps)
+
+    if isinstance(value, str):
+        return str(value)
+
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+
+    if hasattr(value, "__dict__"):
+        return normalise(vars(value))
+
+    return repr(value)
+
+
+def get_flags(fixture_processing_options, options):
+    "the processing options, the defaults updated with options."
+
+    option_values = {option.name: option.default
+                     for section in fixture_processing_options.get_options().values()
+                     for option in section}
+    option_values.update(options)
+
+    extra_variables = fixture_processing_options.EXTRA_VARIABLES
+
+    flags_tuple = namedtuple("processing_options", list(option_values) + list(extra_variables))
+
+    return flags_tuple(**option_values, **extra_variables)
+
+
+class Driver:
+    """
+    runs process_fixture_info of the tree, timing each stage and
+    saving the checkpoints: the parsed fixture, and the fixture data
+    of each target after its transforms (before it is finalised, as
+    the first version has no finalise stage).
+
+    The stage times are kept without the target, so a transform
+    run for several targets is added together.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.stages = {}
+        self.checkpoints = []
+
+        # "processing" or "gplane", see process.
+        self.mode = ""
+
+    def time_stage(self, stage, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+
+        return result
+
+    def run(self, stage, function, *args):
+        """
+        the profiler of process_fixture_info, the stages of each
+        target are named "<target>: <stage>".
+        """
+
+        target, _, stage = stage.rpartition(": ")
+
+        if stage == "finalising":
+            self.save_target(target, args[0])
+
+        result = self.time_stage(stage, function, *args)
+
+        if stage == "parsing":
+            self.save_parsed(result)
+
+        return result
+
+    def save(self, checkpoint, structure):
+        "saves the (normalised) structure, to be compared."
+
+        structures_dir = self.output_dir / STRUCTURES_FOLDER
+        structures_dir.mkdir(parents=True, exist_ok=True)
+
+        filename = checkpoint.replace("/", "__") + ".json"
+        (structures_dir / filename).write_text(json.dumps(normalise(structure), indent=1))
+
+        self.checkpoints.append(checkpoint)
+
+    def save_parsed(self, parsed):
+        # the fixture is parsed again in ground plane mode.
+        if self.mode == "processing":
+            self.save("parsed", parsed)
+
+    def save_target(self, target, fixture_data):
+        target = "fixture_plot" if target in (".", "fixture plot") else target
+        self.save(f"{self.mode}/{target}", fixture_data)
+
+    def process(self, fixture_dir, flags, mode):
+        """
+        processes the fixture with process_fixture_info. mode is
+        "processing" (the targets and the plot) or "gplane".
+        """
+
+        from src.fixture_processor.fixture_functions import extract_wires as ew
+
+        self.mode = mode
+
+        generation_flags = GenerationTuple(processing=mode == "processing",
+                                           gplane_plot=mode == "gplane",
+                                           wires_plot=False)
+
+        if "profiler" in inspect.signature(ew.process_fixture_info).parameters:
+            ew.process_fixture_info(fixture_dir, flags, generation_flags, profiler=self)
+        else:
+            with self.hook_stages(ew, fixture_dir):
+                ew.process_fixture_info(fixture_dir, flags, generation_flags)
+
+    @contextlib.contextmanager
+    def hook_stages(self, ew, fixture_dir):
+        """
+        for the versions without a profiler, the stage functions
+        used by process_fixture_info are replaced (while processing)
+        by ones which are timed, and save the checkpoints. These
+        versions have no finalise stage, the fixture data of a
+        target is saved when it is first output.
+        """
+
+        fp = ew.fp
+        od = ew.od
+
+        get_fixture_info = ew.get_fixture_info
+        get_transforms = fp.get_transforms
+        output_fixture_plot = od.output_fixture_plot
+        output_wires_inserts = ew.output_wires_inserts
+
+        saved_targets = set()
+
+        def output_stage(stage, function):
+            def run_output(output_dir, *args):
+                target = Path(output_dir).relative_to(fixture_dir).as_posix()
+                fixture_data = args[2]
+
+                if target not in saved_targets:
+                    saved_targets.add(target)
+                    self.save_target(target, fixture_data)
+
+                return self.time_stage(stage(args), function, output_dir, *args)
+
+            return run_output
+
+        def timed(stage, function):
+            return lambda *args: self.time_stage(stage, function, *args)
+
+        ew.get_fixture_info = lambda *args: self.run("parsing", get_fixture_info, *args)
+
+        fp.get_transforms = lambda: {key: timed(key[0], transform)
+                                     for key, transform in get_transforms().items()}
+
+        od.output_fixture_plot = output_stage(lambda args: "output_fixture_plot",
+                                              output_fixture_plot)
+
+        # output_wires_inserts(output_dir, fixture_dir, settings, fixture_data, name)
+        ew.output_wires_inserts = output_stage(lambda args: f"output_{args[3]}",
+                                               output_wires_inserts)
+
+        try:
+            yield
+        finally:
+            ew.get_fixture_info = get_fixture_info
+            fp.get_transforms = get_transforms
+            od.output_fixture_plot = output_fixture_plot
+            ew.output_wires_inserts = output_wires_inserts
+
+
+def main(argv):
+    tree, fixture_dir, output_dir, options = argv[1:5]
+
+    # the pipeline is imported from the tree.
+    sys.path.insert(0, str(Path(tree).resolve()))
+
+    # the message boxes are collected (instead of shown).
+    from tkinter import messagebox
+
+    messages = []
+
+    def collect(kind):
+        return lambda title, message, **kwargs: messages.append(
+            [kind, title, " ".join(str(message).split())])
+
+    for kind in ("info", "warning", "error"):
+        setattr(messagebox, f"show{kind}", collect(kind))
+
+    driver = Driver(output_dir)
+    error = ""
+    error_traceback = ""
+
+    try:
+        from src.fixture_processor.options_lib import fixture_processing_options
+
+        flags = get_flags(fixture_processing_options, json.loads(options))
+
+        for mode in ("processing", "gplane"):
+            driver.process(Path(fixture_dir), flags, mode)
+
+    except Exception as err:  # pylint: disable=broad-except
+        error = f"{type(err).__name__}: {err}"
+        error_traceback = traceback.format_exc()
+
+    result = {"stages": driver.stages,
+              "checkpoints": driver.checkpoints,
+              "messages": messages,
+              "error": error,
+              "traceback": error_traceback}
+
+    (Path(output_dir) / RESULT_FILENAME).write_text(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,414 @@
+"""
+This module reports the memory used by a parsed fixture:
+
+    - the deep size of each parsed structure (pins_lookup,
+      probes_dict, the inserts OrderedDicts, the wire lists etc.)
+    - the number (and size) of the objects in them, by type.
+    - the memory retained by each parse stage (see
+      extract_wires.get_fixture_info), and the top allocation
+      sites of each stage (with tracemalloc).
+
+    python -m src.fixture_processor.performance_lib.memory_report <fixture_dir>
+    python -m src.fixture_processor.performance_lib.memory_report --wires 100000
+
+A structure's deep size includes everything it refers to,
+its exclusive size leaves out the objects already counted in
+an earlier structure (e.g. the inserts lookups share their
+InsertTuples with the inserts), so the exclusive sizes add up.
+
+To compare two versions of the code, save a report (--output)
+with each version (on the same fixture), then compare them:
+
+    python -m src.fixture_processor.performance_lib.memory_report --compare old.json new.json
+"""
+
+import io
+import sys
+import json
+import time
+import types
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+from pathlib import Path
+from datetime import datetime
+from collections import deque
+from typing import NamedTuple
+
+from src.fixture_processor.performance_lib import synthetic_fixture as sf
+from src.fixture_processor.performance_lib.benchmark import spec_for_wires
+
+
+fp_logger = logging.getLogger('fixture_processing.memory_report')
+
+# the number of allocation sites (and types) listed.
+DEFAULT_TOP = 10
+
+# these are shared by everything, so are never counted.
+IGNORED_TYPES = (type, types.ModuleType, types.FunctionType,
+                 types.BuiltinFunctionType, types.MethodType)
+
+IGNORED_OBJECTS = (None, True, False, Ellipsis, NotImplemented)
+
+
+class StructureSize(NamedTuple):
+    name: str
+    # the len() of the structure.
+    items: int
+    # bytes, everything the structure refers to.
+    deep_size: int
+    # bytes, leaving out the objects counted in earlier structures.
+    exclusive_size: int
+
+
+def get_referents(obj):
+    "the objects obj refers to (and which are counted in its deep size)."
+
+    if isinstance(obj, dict):
+        yield from obj.keys()
+        yield from obj.values()
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        yield from obj
+
+    if hasattr(obj, "__dict__"):
+        yield vars(obj)
+
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if slot in ("__dict__", "__weakref__"):
+                continue
+            try:
+                yield getattr(obj, slot)
+            except AttributeError:
+                pass
+
+
+def walk_objects(obj, seen):
+    """
+    yields each object reachable from obj (including obj), which
+    is not in seen (a set of ids), adding the objects to seen.
+    """
+
+    pending = [obj]
+
+    while pending:
+        obj = pending.pop()
+
+        if id(obj) in seen or isinstance(obj, IGNORED_TYPES):
+            continue
+        if any(obj is ignored for ignored in IGNORED_OBJECTS):
+            continue
+
+        seen.add(id(obj))
+        yield obj
+
+        pending.extend(get_referents(obj))
+
+
+def deep_sizeof(obj, seen=None):
+    "returns the size (in bytes) of obj and everything it refers to."
+
+    if seen is None:
+        seen = set()
+
+    return sum(sys.getsizeof(item) for item in walk_objects(obj, seen))
+
+
+def get_structure_sizes(structures):
+    """
+    returns the StructureSize of each structure ({name: structure}),
+    and the object counts ({type name: [count, size]}) of them all.
+    """
+
+    structure_sizes = []
+    object_counts = {}
+    counted = set()
+
+    for name, structure in structures.items():
+        deep_size = deep_sizeof(structure)
+
+        exclusive_size = 0
+        for item in walk_objects(structure, counted):
+            size = sys.getsizeof(item)
+            exclusive_size += size
+
+            type_counts = object_counts.setdefault(type(item).__name__, [0, 0])
+            type_counts[0] += 1
+            type_counts[1] += size
+
+        structure_sizes.append(StructureSize(name, len(structure), deep_size, exclusive_size))
+
+    return structure_sizes, object_counts
+
+
+def get_top_sites(snapshot, previous_snapshot, top=DEFAULT_TOP):
+    "the allocation sites which grew the most since the previous snapshot."
+
+    # the report's own allocations are left out.
+    filters = [tracemalloc.Filter(False, __file__),
+               tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    snapshot = snapshot.filter_traces(filters)
+    previous_snapshot = previous_snapshot.filter_traces(filters)
+
+    sites = []
+
+    for statistic in snapshot.compare_to(previous_snapshot, "lineno")[:top]:
+        frame = statistic.traceback[0]
+
+        sites.append({"site": f"{Path(frame.filename).name}:{frame.lineno}",
+                      "size": statistic.size_diff,
+                      "count": statistic.count_diff})
+
+    return sites
+
+
+def measure_fixture(fixture_dir, top=DEFAULT_TOP):
+    """
+    parses the fixture stage by stage (as get_fixture_info does), under
+    tracemalloc. returns the report (a dict, which can be saved as json).
+    """
+
+    # the pipeline is imported here, so it is not
+    # imported when the module is imported.
+    from src.fixture_processor.fixture_functions import extract_wires as ew
+    from src.fixture_processor.fixture_functions import fixture_input as fi
+    from src.fixture_processor.fixture_functions import fixture_maths as fm
+
+    fixture_dir = Path(fixture_dir)
+
+    def parse_wires(inserts_lookup, top_inserts_lookup):
+        wires, top_wires = ew.get_wires(fixture_dir, (inserts_lookup, top_inserts_lookup))
+
+        fixture_data = ew.FixtureTuple(wires, top_wires, inserts, top_inserts,
+                                       ground_nodes=ground_nodes)
+
+        return fixture_data, fm.throughput_multiplier(fixture_data)
+
+    stages = []
+
+    tracemalloc.start()
+    try:
+        snapshot = tracemalloc.take_snapshot()
+
+        def run_stage(stage, function, *args):
+            nonlocal snapshot
+
+            tracemalloc.reset_peak()
+            start_memory, _ = tracemalloc.get_traced_memory()
+
+            start = time.perf_counter()
+            result = function(*args)
+            seconds = time.perf_counter() - start
+
+            memory, peak_memory = tracemalloc.get_traced_memory()
+
+            previous_snapshot, snapshot = snapshot, tracemalloc.take_snapshot()
+
+            stages.append({"stage": stage,
+                           "seconds": seconds,
+                           "retained_memory": memory - start_memory,
+                           "peak_memory": peak_memory - start_memory,
+                           "top_sites": get_top_sites(snapshot, previous_snapshot, top)})
+
+            return result
+
+        pins_lookup, probes_dict, ground_nodes = run_stage(
+            "fixture.o", fi.parse_fix_file, fixture_dir)
+
+        inserts, top_inserts, inserts_lookup, top_inserts_lookup = run_stage(
+            "inserts", ew.get_inserts, fixture_dir, pins_lookup, probes_dict)
+
+        fixture_data, _ = run_stage(
+            "wires", parse_wires, inserts_lookup, top_inserts_lookup)
+
+    finally:
+        tracemalloc.stop()
+
+    structures = {"pins_lookup": pins_lookup,
+                  "probes_dict": probes_dict,
+                  "ground_nodes": ground_nodes,
+                  "bottom_inserts": fixture_data.bottom_inserts,
+                  "top_inserts": fixture_data.top_inserts,
+                  "inserts_lookup": inserts_lookup,
+                  "top_inserts_lookup": top_inserts_lookup,
+                  "bottom_wires": fixture_data.bottom_wires,
+                  "top_wires": fixture_data.top_wires}
+
+    structure_sizes, object_counts = get_structure_sizes(structures)
+
+    return {"created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixture": str(fixture_dir),
+            "stages": stages,
+            "structures": [structure_size._asdict() for structure_size in structure_sizes],
+            "object_counts": {name: {"count": count, "size": size}
+                              for name, (count, size) in sorted(
+                                  object_counts.items(), key=lambda item: -item[1][1])}}
+
+
+def format_size(size):
+    "the size (in bytes) in human units, e.g. 12.3MB."
+
+    for unit in ("B", "kB", "MB"):
+        if abs(size) < 1000:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1000
+
+    return f"{size:.1f}GB"
+
+
+def format_table(rows):
+    "the rows (the first is the header) as a text table."
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+
+    lines = []
+    for index, row in enumerate(rows):
+        lines.append(" | ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+        if index == 0:
+            lines.append("-+-".join("-" * width for width in widths))
+
+    return "\n".join(lines) + "\n"
+
+
+def format_report(report, top=DEFAULT_TOP):
+    "returns the report as text tables."
+
+    f_report = io.StringIO()
+
+    f_report.write(f"Memory report for {report['fixture']} ({report['created']})\n")
+    f_report.write(f"Python {report['python']} on {report['platform']}\n\n")
+
+    rows = [("Structure", "Items", "Deep size", "Exclusive size")]
+    rows.extend((structure["name"], str(structure["items"]),
+                 format_size(structure["deep_size"]),
+                 format_size(structure["exclusive_size"]))
+                for structure in report["structures"])
+
+    total_size = sum(structure["exclusive_size"] for structure in report["structures"])
+    rows.append(("total", "", "", format_size(total_size)))
+
+    f_report.write(format_table(rows) + "\n")
+
+    rows = [("Type", "Count", "Size")]
+    rows.extend((name, str(counts["count"]), format_size(counts["size"]))
+                for name, counts in list(report["object_counts"].items())[:top])
+
+    f_report.write(format_table(rows) + "\n")
+
+    for stage in report["stages"]:
+        f_report.write(f"'{stage['stage']}' stage: {stage['seconds']:.3f}s, "
+                       f"retained {format_size(stage['retained_memory'])}, "
+                       f"peak {format_size(stage['peak_memory'])}\n")
+
+        rows = [("Allocation site", "Size", "Count")]
+        rows.extend((site["site"], format_size(site["size"]), str(site["count"]))
+                    for site in stage["top_sites"][:top])
+
+        f_report.write(format_table(rows) + "\n")
+
+    return f_report.getvalue()
+
+
+def format_change(old, new):
+    if not old:
+        return "-"
+    return f"{new / old - 1:+.1%}"
+
+
+def compare_reports(old_report, new_report, top=DEFAULT_TOP):
+    """
+    returns the differences between two reports (e.g. of two versions
+    of the code, on the same fixture) as text tables.
+    """
+
+    f_comparison = io.StringIO()
+
+    f_comparison.write(f"old: {old_report['fixture']} ({old_report['created']})\n")
+    f_comparison.write(f"new: {new_report['fixture']} ({new_report['created']})\n\n")
+
+    def compare(title, old_values, new_values, names=None):
+        rows = [(title, "Old", "New", "Change")]
+
+        for name in names or dict.fromkeys(list(old_values) + list(new_values)):
+            old_value = old_values.get(name, 0)
+            new_value = new_values.get(name, 0)
+
+            rows.append((name, format_size(old_value), format_size(new_value),
+                         format_change(old_value, new_value)))
+
+        f_comparison.write(format_table(rows) + "\n")
+
+    compare("Structure (exclusive size)",
+            {structure["name"]: structure["exclusive_size"] for structure in old_report["structures"]},
+            {structure["name"]: structure["exclusive_size"] for structure in new_report["structures"]})
+
+    compare("Stage (retained memory)",
+            {stage["stage"]: stage["retained_memory"] for stage in old_report["stages"]},
+            {stage["stage"]: stage["retained_memory"] for stage in new_report["stages"]})
+
+    old_counts = {name: counts["size"] for name, counts in old_report["object_counts"].items()}
+    new_counts = {name: counts["size"] for name, counts in new_report["object_counts"].items()}
+
+    # the types which changed the most.
+    names = sorted(set(old_counts) | set(new_counts),
+                   key=lambda name: -abs(new_counts.get(name, 0) - old_counts.get(name, 0)))
+
+    compare("Type (size)", old_counts, new_counts, names[:top])
+
+    return f_comparison.getvalue()
+
+
+def load_report(report_path):
+    with Path(report_path).open() as f_report:
+        return json.load(f_report)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reports the memory used by a parsed fixture.")
+
+    parser.add_argument("fixture_dir", type=Path, nargs="?", default=None)
+    parser.add_argument("--wires", type=int, default=None,
+                        help="measures a synthetic fixture with (about) this many wires.")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="saves the report (json), for comparing later.")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("OLD", "NEW"), default=None,
+                        help="compares two saved reports.")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP,
+                        help="the number of allocation sites (and types) listed.")
+
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        old_path, new_path = args.compare
+        print(compare_reports(load_report(old_path), load_report(new_path), args.top))
+        return
+
+    if args.wires is not None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fixture_dir = Path(temp_dir) / f"synthetic_{args.wires}"
+            sf.write_synthetic_fixture(fixture_dir, spec_for_wires(args.wires))
+
+            report = measure_fixture(fixture_dir, args.top)
+
+    elif args.fixture_dir is not None:
+        report = measure_fixture(args.fixture_dir, args.top)
+
+    else:
+        parser.error("a fixture_dir, --wires or --compare is required.")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    print(format_report(report, args.top))
+
+
+if __name__ == "__main__":
+    main()
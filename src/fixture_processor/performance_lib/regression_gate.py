@@ -0,0 +1,239 @@
+"""
+This module compares a fresh benchmark report (see benchmark)
+against the committed baseline report, and fails if any stage
+has become slower than the tolerance allows.
+
+The benchmark is run several times, keeping the fastest time of
+each stage. The stage times are divided by each report's calibration time
+(see benchmark.calibrate), so a baseline recorded on a faster
+or slower machine can still be used. Stages faster than
+MIN_SECONDS (in the baseline) are too noisy to compare.
+
+    python -m src.fixture_processor.performance_lib.regression_gate
+    python -m src.fixture_processor.performance_lib.regression_gate --update
+
+The exit code is 1 if any stage is too slow.
+"""
+
+import io
+import sys
+import copy
+import json
+import logging
+import argparse
+
+from pathlib import Path
+from typing import NamedTuple
+
+from src.fixture_processor.performance_lib import benchmark
+
+
+fp_logger = logging.getLogger('fixture_processing.regression_gate')
+
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+
+# the sizes benchmarked by the gate, kept small so it is quick to run.
+GATE_SIZES = (1000, 10000)
+
+# the benchmark is run this many times, the fastest time of each stage is used.
+GATE_REPEAT = 3
+
+# a stage may be this much slower (as a fraction) before the gate fails,
+# timings on a shared machine vary by ~30% between runs.
+DEFAULT_TOLERANCE = 0.5
+
+# the stages (in the baseline) faster than this are not compared.
+MIN_SECONDS = 0.05
+
+
+class StageComparison(NamedTuple):
+    stage: str
+    wires: int
+    # the calibrated times (stage time / calibration time).
+    baseline: float
+    current: float
+    # baseline / current peak memory (bytes), 0 if not measured.
+    baseline_memory: int = 0
+    current_memory: int = 0
+    status: str = "OK"
+
+    @property
+    def ratio(self):
+        return self.current / self.baseline if self.baseline else 1.0
+
+    @property
+    def memory_ratio(self):
+        if not (self.baseline_memory and self.current_memory):
+            return 1.0
+        return self.current_memory / self.baseline_memory
+
+
+def load_report(report_path):
+    with Path(report_path).open() as f_report:
+        return json.load(f_report)
+
+
+def get_stage_results(report):
+    "returns {(target_wires, stage): stage result}."
+
+    return {(run["target_wires"], stage_result["stage"]): stage_result
+            for run in report["runs"]
+            for stage_result in run["stages"]}
+
+
+def merge_reports(reports):
+    """
+    merges the reports of the same benchmark (run several times),
+    keeping the fastest time of each stage, and the fastest
+    calibration, as the slower runs are mostly noise.
+    """
+
+    merged = copy.deepcopy(reports[0])
+    merged_results = get_stage_results(merged)
+
+    for report in reports[1:]:
+        merged["calibration"] = min(merged["calibration"], report["calibration"])
+
+        for key, stage_result in get_stage_results(report).items():
+            merged_result = merged_results.get(key)
+            if merged_result is None:
+                continue
+
+            merged_result["seconds"] = min(merged_result["seconds"], stage_result["seconds"])
+            merged_result["peak_memory"] = max(merged_result["peak_memory"],
+                                               stage_result["peak_memory"])
+
+    return merged
+
+
+def run_gate_benchmark(sizes=GATE_SIZES, repeat=GATE_REPEAT):
+    """
+    runs the benchmark repeat times, returns the merged report.
+    The memory is only measured on the first run.
+    """
+
+    return merge_reports([benchmark.run_benchmarks(sizes, measure_memory=not index)
+                          for index in range(repeat)])
+
+
+def compare_reports(baseline, current, tolerance=DEFAULT_TOLERANCE, min_seconds=MIN_SECONDS):
+    """
+    compares each stage (of each size) in both reports, returns
+    the StageComparisons, in the order of the current report.
+
+    a stage FAILS if its calibrated time (or peak memory) has
+    grown by more than the tolerance, it is SKIPPED if it is
+    too quick to compare, or is missing from the baseline.
+    """
+
+    baseline_results = get_stage_results(baseline)
+    current_results = get_stage_results(current)
+
+    comparisons = []
+
+    for key, current_result in current_results.items():
+        wires, stage = key
+        baseline_result = baseline_results.get(key)
+
+        if baseline_result is None:
+            comparisons.append(StageComparison(
+                stage, wires, 0.0, current_result["seconds"] / current["calibration"],
+                status="NEW"))
+            continue
+
+        comparison = StageComparison(
+            stage, wires,
+            baseline_result["seconds"] / baseline["calibration"],
+            current_result["seconds"] / current["calibration"],
+            baseline_result["peak_memory"], current_result["peak_memory"])
+
+        if baseline_result["seconds"] < min_seconds:
+            status = "SKIPPED"
+        elif comparison.ratio > 1 + tolerance or comparison.memory_ratio > 1 + tolerance:
+            status = "FAILED"
+        else:
+            status = "OK"
+
+        comparisons.append(comparison._replace(status=status))
+
+    return comparisons
+
+
+def gate_passed(comparisons):
+    return all(comparison.status != "FAILED" for comparison in comparisons)
+
+
+def format_comparisons(comparisons):
+    "returns a table of the comparisons, a row for each stage of each size."
+
+    f_table = io.StringIO()
+
+    header = ("Stage", "Wires", "Baseline", "Current", "Change", "Memory", "Status")
+    rows = [header]
+
+    for comparison in comparisons:
+        memory = "-"
+        if comparison.baseline_memory and comparison.current_memory:
+            memory = f"{comparison.memory_ratio - 1:+.0%}"
+
+        rows.append((comparison.stage,
+                     str(comparison.wires),
+                     f"{comparison.baseline:.2f}",
+                     f"{comparison.current:.2f}",
+                     f"{comparison.ratio - 1:+.0%}" if comparison.baseline else "-",
+                     memory,
+                     comparison.status))
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+
+    for index, row in enumerate(rows):
+        f_table.write(" | ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+        f_table.write("\n")
+
+        if index == 0:
+            f_table.write("-+-".join("-" * width for width in widths) + "\n")
+
+    return f_table.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares a benchmark against the baseline, failing on slowdowns.")
+
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--report", type=Path, default=None,
+                        help="an existing benchmark report (by default a new one is run).")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="the allowed slowdown, as a fraction (default %(default)s).")
+    parser.add_argument("--repeat", type=int, default=GATE_REPEAT,
+                        help="the number of times the benchmark is run (default %(default)s).")
+    parser.add_argument("--update", action="store_true",
+                        help="saves the new benchmark report as the baseline.")
+
+    args = parser.parse_args()
+
+    if args.report is not None:
+        current = load_report(args.report)
+    else:
+        current = run_gate_benchmark(GATE_SIZES, args.repeat)
+
+    if args.update:
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    comparisons = compare_reports(load_report(args.baseline), current, args.tolerance)
+
+    print(format_comparisons(comparisons))
+
+    if not gate_passed(comparisons):
+        failed = [comparison.stage for comparison in comparisons if comparison.status == "FAILED"]
+        print(f"FAILED, slower than the baseline: {', '.join(sorted(set(failed)))}")
+        return 1
+
+    print("OK, no stage is slower than the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
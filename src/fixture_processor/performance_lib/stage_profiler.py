@@ -0,0 +1,225 @@
+"""
+This module profiles the processing pipeline stage by stage
+(parsing, each transform and each output) with cProfile, so a
+slow customer fixture can be profiled from the frozen program:
+
+    fixture_processor --Profile --Path <fixture_dir>
+    fixture_processor --Profile --Collapsed --Batch <fixture_dir>
+
+Each run writes a folder (in the profile folder) containing:
+
+    - a '.pstats' file for each stage (see pstats, snakeviz etc.)
+    - 'profile_summary.txt', the stage times, followed by the
+      top functions (by cumulative time) of each stage.
+    - 'profile.collapsed' (if selected), the collapsed stacks
+      of every stage, for flamegraph.pl or speedscope.
+
+cProfile only records who called each function (not the whole
+stack), so the collapsed stacks are rebuilt from the call graph,
+sharing a function's time between its callers in proportion.
+
+Nothing is profiled (or imported) unless profiling is selected.
+"""
+
+import io
+import re
+import time
+import pstats
+import logging
+import cProfile
+
+from pathlib import Path
+from datetime import datetime
+from typing import NamedTuple
+
+
+fp_logger = logging.getLogger('fixture_processing.stage_profiler')
+
+SUMMARY_FILENAME = "profile_summary.txt"
+COLLAPSED_FILENAME = "profile.collapsed"
+
+# the number of functions listed for each stage in the summary.
+DEFAULT_TOP = 30
+
+# the collapsed stacks are rebuilt to this depth, and the
+# stacks shorter than this (in microseconds) are dropped.
+MAX_STACK_DEPTH = 64
+MIN_STACK_MICROSECONDS = 1
+
+
+class ProfileOptions(NamedTuple):
+    # the folder each run's folder is written to.
+    output_dir: Path
+    top: int = DEFAULT_TOP
+    collapsed: bool = False
+
+
+class StageProfiler:
+    """
+    runs each stage under its own cProfile.Profile. A stage run
+    more than once (e.g. for each target) is added to its profile.
+    """
+
+    def __init__(self, output_dir, top=DEFAULT_TOP, collapsed=False):
+        self.output_dir = Path(output_dir)
+        self.top = top
+        self.collapsed = collapsed
+
+        self.profiles = {}
+        self.stage_seconds = {}
+
+    @classmethod
+    def for_fixture(cls, profile_options, fixture_dir):
+        """
+        returns a StageProfiler writing to a new folder (named after
+        the fixture and the time) in the profile options folder.
+        """
+
+        run_name = f"{Path(fixture_dir).name}_{datetime.now():%Y%m%d_%H%M%S}"
+
+        return cls(Path(profile_options.output_dir) / run_name,
+                   profile_options.top, profile_options.collapsed)
+
+    def run(self, stage, function, *args):
+        "returns function(*args), profiled as part of the stage."
+
+        profile = self.profiles.setdefault(stage, cProfile.Profile())
+
+        start = time.perf_counter()
+        try:
+            return profile.runcall(function, *args)
+        finally:
+            self.stage_seconds[stage] = (self.stage_seconds.get(stage, 0.0)
+                                         + time.perf_counter() - start)
+
+    def get_stats(self, stage):
+        return pstats.Stats(self.profiles[stage])
+
+    def format_summary(self):
+        "returns the stage times, then the top functions of each stage."
+
+        f_summary = io.StringIO()
+
+        total_seconds = sum(self.stage_seconds.values())
+        width = max([len("Stage")] + [len(stage) for stage in self.stage_seconds])
+
+        f_summary.write(f"{'Stage':<{width}} | Time (s) | Share\n")
+        f_summary.write(f"{'-' * width}-+----------+------\n")
+
+        for stage, seconds in self.stage_seconds.items():
+            share = seconds / total_seconds if total_seconds else 0
+            f_summary.write(f"{stage:<{width}} | {seconds:8.3f} | {share:5.1%}\n")
+
+        f_summary.write(f"\n{'total':<{width}} | {total_seconds:8.3f}\n")
+
+        for stage in self.profiles:
+            f_summary.write(f"\n\n===== {stage} =====\n")
+
+            stats = self.get_stats(stage)
+            stats.stream = f_summary
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+
+        return f_summary.getvalue()
+
+    def write(self):
+        """
+        writes the pstats file of each stage, the summary and
+        (if selected) the collapsed stacks. returns the summary path.
+        """
+
+        if not self.profiles:
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        for index, (stage, profile) in enumerate(self.profiles.items(), 1):
+            profile.dump_stats(str(self.output_dir / f"{index:02}_{get_file_stem(stage)}.pstats"))
+
+        summary_path = self.output_dir / SUMMARY_FILENAME
+        summary_path.write_text(self.format_summary(), encoding="utf-8")
+
+        if self.collapsed:
+            with (self.output_dir / COLLAPSED_FILENAME).open("w", encoding="utf-8") as f_collapsed:
+                for stage in self.profiles:
+                    stacks = get_collapsed_stacks(self.get_stats(stage), get_frame_name(stage))
+
+                    for stack, microseconds in stacks.items():
+                        f_collapsed.write(f"{stack} {microseconds}\n")
+
+        fp_logger.info("the processing profile was written to %s", self.output_dir)
+
+        return summary_path
+
+
+def get_file_stem(stage):
+    "the stage name, made safe for a filename."
+    return re.sub(r"[^\w.-]+", "_", stage).strip("_")
+
+
+def get_frame_name(name):
+    "the separator (;) can not be used in a collapsed stack frame."
+    return name.replace(";", ",")
+
+
+def format_function(function):
+    filename, line_number, function_name = function
+
+    if filename == "~":
+        # a built in function.
+        return get_frame_name(function_name)
+
+    return get_frame_name(f"{function_name} ({Path(filename).name}:{line_number})")
+
+
+def get_collapsed_stacks(stats, root_name):
+    """
+    rebuilds the collapsed stacks ("root;caller;...;function"
+    -> microseconds of own time) from the profile's call graph.
+
+    A function's time is shared between its callers in proportion
+    to the time spent in it for each caller. Recursive calls are
+    not followed, their time stays with the outer call.
+    """
+
+    callees = {}
+    roots = []
+
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        known_callers = [caller for caller in callers if caller in stats.stats]
+
+        if not known_callers:
+            roots.append(function)
+
+        for caller in known_callers:
+            # the cumulative time spent in function, when called by caller.
+            callees.setdefault(caller, []).append((function, callers[caller][3]))
+
+    stacks = {}
+
+    def add_stacks(function, frames, path, share):
+        own_time = stats.stats[function][2]
+
+        frames = frames + [format_function(function)]
+
+        microseconds = round(own_time * share * 1e6)
+        if microseconds >= MIN_STACK_MICROSECONDS:
+            stack = ";".join(frames)
+            stacks[stack] = stacks.get(stack, 0) + microseconds
+
+        if len(frames) > MAX_STACK_DEPTH:
+            return
+
+        for callee, callee_time in callees.get(function, []):
+            callee_cumulative_time = stats.stats[callee][3]
+
+            # too quick to matter, or recursive.
+            if share * callee_time * 1e6 < MIN_STACK_MICROSECONDS or callee in path:
+                continue
+
+            add_stacks(callee, frames, path | {callee},
+                       share * callee_time / callee_cumulative_time)
+
+    for root in roots:
+        add_stacks(root, [root_name], {root}, 1.0)
+
+    return stacks
@@ -0,0 +1,594 @@
+"""
+This module writes synthetic fixtures (a 'fixture.o', 'inserts'
+and 'wires' file), so the processing can be benchmarked without
+using customer fixtures.
+
+The fixture is described by a FixtureSpec, every board on the
+panel has the same number of nodes, each node has its pins (BRCs)
+and probes, which are wired together:
+
+    - every probe is wired to one of the node's pins.
+    - the node's pins are daisy chained.
+    - (optionally) the first pin is wired to a transfer, which
+      is wired to a top probe (on the top side).
+
+The files are written in the same format as the Agilent reports,
+so they can be read by parse_fix_file, get_inserts and get_wires.
+
+    python -m src.fixture_processor.performance_lib.synthetic_fixture DIR --boards 4
+"""
+
+import math
+import logging
+import argparse
+
+from pathlib import Path
+from typing import NamedTuple
+
+from src.fixture_processor.fixture_functions import fixture_maths as fm
+from src.fixture_processor.fixture_functions.fixture_maths import CoordTuple, PinID
+
+
+fp_logger = logging.getLogger('fixture_processing.synthetic_fixture')
+
+FIXTURE_SIZE = "Full"
+
+# the area the boards are placed in (mils).
+PANEL_WIDTH = 280000
+PANEL_HEIGHT = 160000
+PANEL_ORIGIN = CoordTuple(5000, -75000)
+
+# the gap between the boards, and the probe spacing.
+BOARD_GAP = 2000
+PROBE_PITCH = CoordTuple(300, 150)
+
+# the offset applied to offset pins.
+PIN_OFFSET = (300, 150)
+
+# the reports are dated, a fixed date keeps the files the same.
+REPORT_DATE = "Tue Mar 20 11:33:07 2018"
+
+REPORT_RULE = "-" * 78
+
+SETTINGS = """\
+Fixture Type : Express
+Fixture Size : {fixture_size}
+Fixture Part Number : 12345
+Top Probes Allowed : {top_probes}
+Autofile : fixture
+Units : Mils
+Wiring Method : {wiring_method}
+"""
+
+INSERTS_HEADER = """\
+(b   r      c )     X       Y     Type   Spring Node Name  On Device
+---------------|---------------|--------|------|----------|---------------------
+"""
+
+WIRES_HEADER = """
+    ( Pin )   [ Probe ]    Length = in.
+
+                |     From      |     To        |     From      |      To
+Length|Ga|Color |(b   r      c )|(b   r      c )|    X       Y  |    X       Y
+------|--|------|---------------|---------------|-------|-------|-------|-------
+"""
+
+TOP_SECTION = "\n                                *+*+* Top *+*+*\n\n"
+
+
+class FixtureSpec(NamedTuple):
+    boards: int = 2
+
+    # per board.
+    nodes: int = 20
+    ground_nodes: int = 1
+
+    pins_per_node: int = 2
+    probes_per_node: int = 4
+
+    # the ratio of (non ground) pins which are offset.
+    offset_ratio: float = 0.1
+
+    # the number of nodes (per board) with a top probe.
+    top_probes: int = 0
+
+    wiring_method: str = "Automatic"
+
+    # if True, the ground pins of each board are in a single
+    # module (a throughput multiplier fixture).
+    throughput_multiplier: bool = False
+
+    # the number of wires removed, pins offset and wires added
+    # (to new transfers) by the user modification files.
+    user_modifications: int = 0
+
+
+class SyntheticInsert(NamedTuple):
+    brc: str
+    coord: CoordTuple
+    insert_type: str
+    spring: str
+    node: str
+    device: str
+
+    @property
+    def _wire_coord(self):
+        "pins are inserted from the other side of the fixture (see InsertTuple)."
+        if self.insert_type in ("Pin", "Offset"):
+            coord_x, coord_y = self.coord
+            return CoordTuple(coord_x, -coord_y)
+        return self.coord
+
+
+class SyntheticFixture(NamedTuple):
+    fixture_dir: Path
+    spec: FixtureSpec
+
+    bottom_inserts: int
+    top_inserts: int
+    bottom_wires: int
+    top_wires: int
+
+    ground_nodes: tuple
+
+
+def get_pin_ids(ground):
+    """
+    yields the PinIDs of the hybrid cards, either
+    the ground pins, or the signal pins.
+    """
+
+    for bank in (2, 1):
+        for row in range(PinID._min_row, PinID._max_row + 1):
+            for half in (False, True):
+                for column in range(PinID._min_column, PinID._max_column + 1):
+                    pin_id = PinID.from_elements(bank, row, column, half)
+
+                    if pin_id.is_asru or pin_id.is_ctrl:
+                        continue
+
+                    if pin_id.is_hybrid_ground == ground:
+                        yield pin_id
+
+
+def take(iterator, description):
+    "returns the next item, the fixture is too big if there are none left."
+
+    try:
+        return next(iterator)
+    except StopIteration:
+        raise ValueError(f"the synthetic fixture has run out of {description}") from None
+
+
+class FixtureBuilder:
+    """
+    builds up the lines of the 'fixture.o' file,
+    along with the inserts and wires, board by board.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+
+        self.fixture_lines = []
+        self.inserts = ([], [])
+        self.wires = ([], [])
+        self.ground_nodes = []
+
+        # (pin_ids, pin inserts, probe names) of each signal
+        # node, used to write the user modification files.
+        self.signal_nodes = []
+
+        self.signal_pins = get_pin_ids(ground=False)
+
+        # the ground pins, by module.
+        self.module_ground_pins = {}
+        for pin_id in get_pin_ids(ground=True):
+            self.module_ground_pins.setdefault(pin_id.module, []).append(pin_id)
+
+        self.all_ground_pins = iter(
+            [pin_id for pins in self.module_ground_pins.values() for pin_id in pins])
+
+        self.module_ground_pins = {module: iter(pins) for module, pins
+                                   in self.module_ground_pins.items()}
+
+        # every insert coordinate on each side is unique.
+        self.used_coords = (set(), set())
+
+        self.signal_pin_count = 0
+        self.probe_count = 0
+
+        self.columns = math.ceil(math.sqrt(spec.boards))
+        self.rows = math.ceil(spec.boards / self.columns)
+
+        self.board_size = CoordTuple(PANEL_WIDTH // self.columns,
+                                     PANEL_HEIGHT // self.rows)
+
+    def add_insert(self, insert, top=False):
+        side = int(top)
+
+        if insert.coord in self.used_coords[side]:
+            raise ValueError(f"the synthetic fixture has two inserts at {insert.coord}")
+
+        self.used_coords[side].add(insert.coord)
+        self.inserts[side].append(insert)
+
+        return insert
+
+    def add_wire(self, colour, from_insert, to_insert, top=False):
+        self.wires[int(top)].append((colour, from_insert, to_insert))
+
+    def probe_locations(self, board_origin):
+        "yields the free probe locations on the board."
+
+        width, height = self.board_size - CoordTuple(BOARD_GAP, BOARD_GAP)
+
+        pitch_x, pitch_y = PROBE_PITCH
+        origin_x, origin_y = board_origin
+
+        for row in range(1, height // pitch_y):
+            for column in range(1, width // pitch_x):
+                location = CoordTuple(origin_x + 151 + pitch_x * (column - 1),
+                                      origin_y + 77 + pitch_y * (row - 1))
+
+                # the top inserts are flipped (see add_probe).
+                flipped = CoordTuple(location.x_coord, -location.y_coord)
+
+                if location not in self.used_coords[0] and flipped not in self.used_coords[1]:
+                    yield location
+
+    def add_pin(self, pin_id, node_name, ground):
+        # ground pins are never offset.
+        offset = False
+
+        if not ground and self.spec.offset_ratio:
+            self.signal_pin_count += 1
+            offset = self.signal_pin_count % round(1 / self.spec.offset_ratio) == 0
+
+        x, y = pin_id.to_xy(FIXTURE_SIZE)
+
+        if offset:
+            x_offset, y_offset = PIN_OFFSET
+            self.fixture_lines.append(f"                    {pin_id} {y_offset} {x_offset};")
+
+            brc = "*" + fm.create_brc_loc(pin_id, PIN_OFFSET)[1:-1] + "*"
+            insert = SyntheticInsert(brc, CoordTuple(x + x_offset, -y - y_offset),
+                                     "Offset", "", node_name, "")
+        else:
+            self.fixture_lines.append(f"                    {pin_id};")
+
+            insert = SyntheticInsert(fm.create_brc_loc(pin_id), CoordTuple(x, -y),
+                                     "Pin", "", node_name, "")
+
+        return self.add_insert(insert)
+
+    def add_probe(self, location, board_origin, node_name, device, top=False):
+        self.probe_count += 1
+
+        relative_x, relative_y = location - board_origin
+        location_x, location_y = location
+
+        if top:
+            # top probes are inserted into the top
+            # plate, so the coordinate is flipped.
+            self.fixture_lines.append(
+                f"                    P{self.probe_count} {relative_x}, {relative_y} TOP;")
+
+            coord = CoordTuple(location_x, -location_y)
+            return self.add_insert(SyntheticInsert(
+                coord.to_brc_str(FIXTURE_SIZE), coord, "75 mil", "8", node_name, device), top=True)
+
+        self.fixture_lines.append(
+            f"                    P{self.probe_count} {relative_x}, {relative_y};")
+
+        return self.add_insert(SyntheticInsert(
+            location.to_brc_str(FIXTURE_SIZE), location, "100 mil", "8", node_name, device))
+
+    def add_transfer(self, location, board_origin, node_name):
+        "a transfer has an insert on each side of the fixture."
+
+        self.probe_count += 1
+
+        relative_x, relative_y = location - board_origin
+        location_x, location_y = location
+
+        self.fixture_lines.append(
+            f"                    T{self.probe_count} {relative_x}, {relative_y};")
+
+        bottom = self.add_insert(SyntheticInsert(
+            location.to_brc_str(FIXTURE_SIZE), location, "Transfer", "", node_name, ""))
+
+        top_coord = CoordTuple(location_x, -location_y)
+        top = self.add_insert(SyntheticInsert(
+            top_coord.to_brc_str(FIXTURE_SIZE, True), top_coord,
+            "Transfer", "", node_name, ""), top=True)
+
+        return bottom, top
+
+    def add_node(self, board, node, board_origin, probe_locations, ground_pins):
+        spec = self.spec
+
+        ground = node < spec.ground_nodes
+
+        node_name = f"{board}%{'GND' if ground else 'N'}{node}"
+        device = f"U{node}"
+        colour = "BLACK" if ground else "BLUE"
+
+        if ground:
+            self.ground_nodes.append(node_name)
+            self.fixture_lines.append(f'            NODE "{node_name}" GROUND')
+        else:
+            self.fixture_lines.append(f'            NODE "{node_name}"')
+
+        self.fixture_lines.append("                PINS")
+
+        pin_ids = [take(ground_pins if ground else self.signal_pins,
+                        "ground pins" if ground else "signal pins")
+                   for _ in range(spec.pins_per_node)]
+
+        pins = [self.add_pin(pin_id, node_name, ground) for pin_id in pin_ids]
+
+        self.fixture_lines.append("                PROBES")
+
+        first_probe = self.probe_count + 1
+
+        probes = [self.add_probe(take(probe_locations, "probe locations"),
+                                 board_origin, node_name, device)
+                  for _ in range(spec.probes_per_node)]
+
+        if not ground:
+            probe_names = [f"P{number}" for number in range(first_probe, self.probe_count + 1)]
+            self.signal_nodes.append((pin_ids, pins, probe_names))
+
+        if node < spec.top_probes:
+            transfer, top_transfer = self.add_transfer(
+                take(probe_locations, "probe locations"), board_origin, node_name)
+
+            top_probe = self.add_probe(take(probe_locations, "probe locations"),
+                                       board_origin, node_name, "", top=True)
+
+            self.add_wire("BLUE", pins[0], transfer)
+            self.add_wire("BLUE", top_transfer, top_probe, top=True)
+
+        for index, probe in enumerate(probes):
+            self.add_wire(colour, pins[index % len(pins)], probe)
+
+        for from_pin, to_pin in zip(pins, pins[1:]):
+            self.add_wire(colour, from_pin, to_pin)
+
+    def add_board(self, board):
+        spec = self.spec
+
+        column, row = (board - 1) % self.columns, (board - 1) // self.columns
+        board_width, board_height = self.board_size
+        board_origin = PANEL_ORIGIN + CoordTuple(column * board_width, row * board_height)
+
+        width, height = self.board_size - CoordTuple(BOARD_GAP, BOARD_GAP)
+
+        self.fixture_lines.extend([
+            f'        BOARD "{board}"',
+            f"            PLACEMENT {board_origin.x_coord}, {board_origin.y_coord} 0.0; ! board",
+            "            OUTLINE",
+            "                0, 0",
+            f"                {width}, 0",
+            f"                {width}, {height}",
+            f"                0, {height};",
+            "            TOOLING",
+            "                1250 500, 500;",
+            "            ! end tooling"])
+
+        # a throughput multiplier fixture keeps the
+        # grounds of each board in a single module.
+        if spec.throughput_multiplier:
+            modules = sorted(self.module_ground_pins)
+            ground_pins = self.module_ground_pins[modules[(board - 1) % len(modules)]]
+        else:
+            ground_pins = self.all_ground_pins
+
+        probe_locations = self.probe_locations(board_origin)
+
+        for node in range(spec.nodes):
+            self.add_node(board, node, board_origin, probe_locations, ground_pins)
+
+        self.fixture_lines.append("        END BOARD")
+
+    def build(self):
+        self.fixture_lines.extend([
+            "FIXTURE",
+            '    PANEL "1"',
+            "        PLACEMENT 0, 0 0.0; ! panel",
+            "        OUTLINE",
+            "            -1000, -80000",
+            "            300000, -80000",
+            "            300000, 90000",
+            "            -1000, 90000;",
+            "        TOOLING",
+            "            1250 0, 0;",
+            "            1250 290000, 0;",
+            "        ! end tooling"])
+
+        for board in range(1, self.spec.boards + 1):
+            self.add_board(board)
+
+        self.fixture_lines.extend(["    END PANEL", "END FIXTURE", ""])
+
+        return self
+
+
+def write_report_header(f_report, report_name, report_path, spec):
+    top_probes = "Yes" if spec.top_probes else "No"
+
+    f_report.write(f"{REPORT_RULE}\n"
+                   f"AGILENT ICT FIXTURE {report_name} REPORT          {REPORT_DATE}\n\n"
+                   f"{report_path}\n"
+                   f"{REPORT_RULE}\n\n")
+
+    f_report.write(SETTINGS.format(fixture_size=FIXTURE_SIZE,
+                                   top_probes=top_probes,
+                                   wiring_method=spec.wiring_method))
+    f_report.write(f"{REPORT_RULE}\n")
+
+
+def write_inserts(inserts_path, builder):
+    with inserts_path.open("w") as f_inserts:
+        write_report_header(f_inserts, "INSERTION", inserts_path, builder.spec)
+        f_inserts.write(INSERTS_HEADER)
+
+        bottom_inserts, top_inserts = builder.inserts
+
+        for top, inserts in ((False, bottom_inserts), (True, top_inserts)):
+            if top:
+                if not inserts:
+                    break
+                f_inserts.write(TOP_SECTION)
+
+            for insert in inserts:
+                spring = f"{insert.spring} oz" if insert.spring else ""
+
+                coord_x, coord_y = insert.coord
+
+                f_inserts.write(f"{insert.brc} {coord_x:>7} {coord_y:>7} "
+                                f"{insert.insert_type:^8} {spring:^6} "
+                                f"{insert.node:^10} {insert.device}\n")
+
+
+def format_wire(colour, from_insert, to_insert, wiring_method):
+    """
+    returns the line of the wires file, the manual format
+    has the insert types and wrap numbers instead of the
+    coordinates.
+    """
+
+    length = fm.get_wire_length(from_insert, to_insert)
+
+    if wiring_method == "Manual":
+        to_type = "Pin" if to_insert.insert_type in ("Pin", "Offset") else "Prob"
+
+        return (f"{length:>6} 30 {colour:^6} Pin {from_insert.brc} 1 "
+                f"{to_type} {to_insert.brc} 2\n")
+
+    from_x, from_y = from_insert._wire_coord
+    to_x, to_y = to_insert._wire_coord
+
+    return (f"{length:>6} 30 {colour:^6} {from_insert.brc} {to_insert.brc:<15} "
+            f"{from_x:>7} {from_y:>7} {to_x:>7} {to_y:>7}\n")
+
+
+def write_wires(wires_path, builder):
+    wiring_method = builder.spec.wiring_method
+
+    with wires_path.open("w") as f_wires:
+        write_report_header(f_wires, "WIRING", wires_path, builder.spec)
+        f_wires.write(WIRES_HEADER)
+
+        bottom_wires, top_wires = builder.wires
+
+        for top, wires in ((False, bottom_wires), (True, top_wires)):
+            if top:
+                if not wires:
+                    break
+                f_wires.write(TOP_SECTION)
+
+            for colour, from_insert, to_insert in wires:
+                f_wires.write(format_wire(colour, from_insert, to_insert, wiring_method))
+
+
+def write_user_modifications(fixture_dir, builder):
+    """
+    writes the 'remove_wires.csv', 'modify_inserts.csv' and
+    'add_wires.csv' files, each signal node (up to the number
+    of user modifications) has:
+
+        - its first probe wire removed.
+        - its last pin offset (if it is not an offset pin).
+        - a wire added from its first pin to a new transfer.
+    """
+
+    nodes = builder.signal_nodes[:builder.spec.user_modifications]
+
+    if len(nodes) < builder.spec.user_modifications:
+        raise ValueError("the synthetic fixture has run out of nodes to modify")
+
+    free_locations = builder.probe_locations(PANEL_ORIGIN)
+
+    remove_lines, modify_lines, add_lines = [], [], []
+
+    for number, (pin_ids, pins, probe_names) in enumerate(nodes, 1):
+        if probe_names:
+            remove_lines.append(f"brc{pin_ids[0]}, {probe_names[0]}")
+
+        if pins[-1].insert_type == "Pin":
+            modify_lines.append(f"offset, brc{pin_ids[-1]}, mils, 200, 100")
+
+        location_x, location_y = take(free_locations, "probe locations")
+        builder.used_coords[0].add(CoordTuple(location_x, location_y))
+
+        modify_lines.append(f"transfer, gate{number}, mils, {location_x}, {location_y}")
+        add_lines.append(f"brc{pin_ids[0]}, $gate{number}, colour=red")
+
+    for filename, lines in (("remove_wires.csv", remove_lines),
+                            ("modify_inserts.csv", modify_lines),
+                            ("add_wires.csv", add_lines)):
+        (fixture_dir / filename).write_text("\n".join(lines) + "\n")
+
+
+def write_synthetic_fixture(fixture_dir, spec=FixtureSpec()):
+    """
+    writes the 'fixture.o', 'inserts' and 'wires' files of
+    the fixture described by spec into fixture_dir (along
+    with the user modification files, if any).
+
+    returns a SyntheticFixture, with the number of inserts and
+    wires written (which the parsed fixture should match).
+    """
+
+    if spec.wiring_method not in ("Automatic", "Manual"):
+        raise ValueError(f"unknown wiring method '{spec.wiring_method}'")
+
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+
+    builder = FixtureBuilder(spec).build()
+
+    (fixture_dir / "fixture.o").write_text("\n".join(builder.fixture_lines))
+
+    write_inserts(fixture_dir / "inserts", builder)
+    write_wires(fixture_dir / "wires", builder)
+
+    if spec.user_modifications:
+        write_user_modifications(fixture_dir, builder)
+
+    bottom_inserts, top_inserts = builder.inserts
+    bottom_wires, top_wires = builder.wires
+
+    fp_logger.info("synthetic fixture written to %s: %d inserts, %d wires",
+                   fixture_dir, len(bottom_inserts) + len(top_inserts),
+                   len(bottom_wires) + len(top_wires))
+
+    return SyntheticFixture(fixture_dir, spec,
+                            len(bottom_inserts), len(top_inserts),
+                            len(bottom_wires), len(top_wires),
+                            tuple(builder.ground_nodes))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Writes a synthetic fixture, for benchmarking the processing.")
+
+    parser.add_argument("fixture_dir", type=Path)
+
+    for name, default in FixtureSpec._field_defaults.items():
+        option = "--" + name.replace("_", "-")
+
+        if isinstance(default, bool):
+            parser.add_argument(option, dest=name, action="store_true", default=default)
+        else:
+            parser.add_argument(option, dest=name, type=type(default), default=default)
+
+    args = vars(parser.parse_args())
+    fixture_dir = args.pop("fixture_dir")
+
+    print(write_synthetic_fixture(fixture_dir, FixtureSpec(**args)))
+
+
+if __name__ == "__main__":
+    main()
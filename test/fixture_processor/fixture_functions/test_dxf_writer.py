@@ -0,0 +1,53 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from dxfwrite import DXFEngine as dxf
+
+from src.fixture_processor.fixture_functions import dxf_writer as dw
+
+class TestDXFWriter(unittest.TestCase):
+    def test_matches_dxfwrite(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            expected_path = Path(temp_dir) / "expected.dxf"
+            stream_path = Path(temp_dir) / "stream.dxf"
+
+            drawing = dxf.drawing(expected_path.as_posix())
+            drawing.layers.clear()
+            drawing.add_layer("OUTLINE", color=144)
+            drawing.add_layer("WIRES", color=5, linetype="CENTER").off()
+
+            circle = dxf.circle(0.254, (1.5, -2))
+            circle["layer"] = "OUTLINE"
+            drawing.add(circle)
+
+            line = dxf.line((0, 0), (2.54, 0.1))
+            line["layer"] = "WIRES"
+            line["color"] = 256
+            drawing.add(line)
+
+            text = dxf.text("1 01 01", (3, 4), 0.254)
+            text["layer"] = "OUTLINE"
+            drawing.add(text)
+
+            drawing.header['$CLAYER'] = "OUTLINE"
+            drawing.save()
+
+            with dw.DXFStreamWriter(stream_path.as_posix()) as stream:
+                stream.add_layer("OUTLINE", color=144)
+                stream.add_layer("WIRES", color=5, linetype="CENTER", off=True)
+
+                stream.add(dw.DXFCircle(0.254, (1.5, -2)), "OUTLINE")
+                stream.add(dw.DXFLine((0, 0), (2.54, 0.1)), "WIRES", 256)
+                stream.add(dw.DXFText("1 01 01", (3, 4), 0.254), "OUTLINE")
+
+                stream.header['$CLAYER'] = "OUTLINE"
+                stream.save()
+
+            self.assertEqual(stream_path.read_bytes(), expected_path.read_bytes())
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
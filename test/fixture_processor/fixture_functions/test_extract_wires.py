@@ -1,4 +1,7 @@
 import unittest
+from collections import OrderedDict
+from types import SimpleNamespace
+
 from src.fixture_processor.fixture_functions import extract_wires
 
 class TestExtractWires(unittest.TestCase):
@@ -7,6 +10,29 @@ class TestExtractWires(unittest.TestCase):
         self.assertEqual(result,4)
         # extract_wires()
 
+    def test_get_target_transforms(self):
+        def remove_wires(): pass
+        def add_wires(): pass
+        def top_only(): pass
+
+        transforms = OrderedDict()
+        transforms[("remove_wires", lambda flags: flags.remove,
+                    ("wiring_machine", "verifier"))] = remove_wires
+        transforms[("add_wires", lambda flags: True, ("wiring_machine",))] = add_wires
+        transforms[("top_only", lambda flags: True, ("verifier_top",))] = top_only
+
+        flags = SimpleNamespace(remove=True)
+
+        # the fixture root is processed as the wiring machine.
+        self.assertEqual(extract_wires.get_target_transforms(transforms, flags, "."),
+                         [("remove_wires", remove_wires), ("add_wires", add_wires)])
+        self.assertEqual(extract_wires.get_target_transforms(transforms, flags, "verifier"),
+                         [("remove_wires", remove_wires)])
+
+        # unselected transforms are not run.
+        flags = SimpleNamespace(remove=False)
+        self.assertEqual(extract_wires.get_target_transforms(transforms, flags, "verifier"), [])
+
 
 
 
@@ -7,6 +7,15 @@ class TestFixtureOutput(unittest.TestCase):
         self.assertEqual(result,4)
         # fixture_output()
 
+    def test_compile_line_format(self):
+        line_dict = {"brc": "(2 01.00 01.0)", "x": 100, "y": -200, "insert_type": "Pin",
+                     "spring_space": " ", "spring": "8 oz", "node": "GND",
+                     "device_space": " ", "device": "U1"}
+
+        format_row = fixture_output.compile_line_format(fixture_output.INSERTS_LINE)
+
+        self.assertEqual(format_row(*line_dict.values()),
+                         fixture_output.INSERTS_LINE.format(**line_dict))
 
 
 
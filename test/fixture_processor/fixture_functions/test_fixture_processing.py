@@ -1,5 +1,7 @@
 import unittest
 from src.fixture_processor.fixture_functions import fixture_processing
+from src.fixture_processor.fixture_functions import extract_wires as ew
+from src.fixture_processor.fixture_functions.fixture_maths import CoordTuple
 
 class TestFixturepfixtureProcessing(unittest.TestCase):
     def test_fixture_processing(self):
@@ -7,6 +9,23 @@ class TestFixturepfixtureProcessing(unittest.TestCase):
         self.assertEqual(result,4)
         # fixture_processing()
 
+    def test_finalise_fixture_data(self):
+        probe_xy, moved_xy = CoordTuple(0, 10000), CoordTuple(0, 20000)
+        transfer_xy = CoordTuple(0, 40000)
+
+        inserts = {
+            probe_xy: ew.InsertTuple("[P1]", "Probe", "8", "N1", "", "P1", probe_xy),
+            transfer_xy: ew.InsertTuple("[T1]", "Transfer", "", "", "", "T1", moved_xy)}
+
+        wire = ew.WireTuple(ew.WireInfo("3.5", "30", "BLUE"), "[P1]", "[T1]", probe_xy, transfer_xy)
+
+        fixture_data = ew.FixtureTuple([wire], [], inserts, {})
+        finalised_data = fixture_processing.finalise_fixture_data(fixture_data)
+
+        finalised_wire = finalised_data.bottom_wires[0]
+        self.assertEqual(finalised_wire.to_xy, moved_xy)
+        self.assertEqual(finalised_wire.wire_info.length, "1.5")
+
 
 
 
@@ -0,0 +1,53 @@
+import unittest
+from collections import namedtuple
+from src.fixture_processor.fixture_functions import ground_index
+from src.fixture_processor.fixture_functions import extract_wires as ew
+from src.fixture_processor.fixture_functions.fixture_input import PinsTuple
+from src.fixture_processor.fixture_functions.fixture_maths import CoordTuple, PinID
+
+Flags = namedtuple("Flags", ["fixture_gplane", "gplane_include_asru"])
+
+
+def pin_insert(pin_id, coord):
+    fix_id = PinsTuple(PinID(pin_id), "", (0, 0))
+    return ew.InsertTuple(f"({pin_id})", "Pin", "", "GND", "", fix_id, coord)
+
+
+class TestGroundIndex(unittest.TestCase):
+    def test_ground_index(self):
+        ground_xy, other_xy = CoordTuple(0, 100), CoordTuple(0, 200)
+        bank1_xy, probe_xy = CoordTuple(0, 300), CoordTuple(0, 400)
+
+        inserts = {
+            ground_xy: pin_insert("20319", ground_xy),
+            other_xy: pin_insert("20301", other_xy),
+            bank1_xy: pin_insert("10120", bank1_xy),
+            probe_xy: ew.InsertTuple("[P1]", "100 mil", "8", "GND", "", "P1", probe_xy)}
+
+        index = ground_index.build_ground_index(inserts)
+
+        self.assertEqual(index.coords, {ground_xy, bank1_xy})
+        self.assertEqual(index.brcs, {"20319", "10120"})
+        self.assertEqual(index.sorted_brcs, ("10120", "20319"))
+
+        # module order.
+        self.assertEqual(list(index.pins), [bank1_xy, ground_xy])
+
+    def test_target_ground_index(self):
+        ground_xy = CoordTuple(0, 100)
+        fixture_data = ew.FixtureTuple(
+            [], [], {ground_xy: pin_insert("20319", ground_xy)}, {}, "Full")
+        flags = Flags(fixture_gplane=True, gplane_include_asru=False)
+
+        index = ground_index.get_target_ground_index(fixture_data, flags)
+        self.assertEqual(index.coords, {ground_xy})
+
+        # nothing is a ground pin when not in ground plane mode.
+        self.assertIs(ground_index.get_target_ground_index(
+            fixture_data, flags._replace(fixture_gplane=False)), ground_index.EMPTY_GROUND_INDEX)
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
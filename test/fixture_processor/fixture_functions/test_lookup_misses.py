@@ -0,0 +1,51 @@
+import logging
+import unittest
+
+from src.fixture_processor.fixture_functions import extract_wires
+from src.fixture_processor.fixture_functions.lookup_misses import LookupMisses
+
+
+class TestLookupMisses(unittest.TestCase):
+    def test_log_summary(self):
+        misses = LookupMisses("inserts", sample_size=2)
+
+        for number in range(100):
+            misses.add("probe not found", f"node{number % 3}", "probe %d", number)
+        misses.add("pin not found", "node9", "pin %s", "(1 01.00 01.0)")
+
+        self.assertEqual(len(misses), 101)
+
+        with self.assertLogs("fixture_processing.lookup_misses", logging.INFO) as logs:
+            misses.log_summary()
+
+        # a summary line, the worst offenders and
+        # the (limited) samples of each kind.
+        self.assertEqual(len(logs.output), 1 + 2 + 2 + 1)
+        self.assertIn("'inserts' lookup misses: 101 (probe not found: 100, pin not found: 1)",
+                      logs.output[0])
+        self.assertIn("node0 (34), node1 (33), node2 (33)", logs.output[1])
+        self.assertIn("probe 1", logs.output[3])
+
+    def test_no_misses(self):
+        logger = logging.getLogger("fixture_processing.lookup_misses")
+
+        with self.assertLogs(logger, logging.INFO) as logs:
+            LookupMisses("inserts").log_summary()
+            logger.info("nothing else logged")
+
+        self.assertEqual(len(logs.output), 1)
+
+    def test_lookup_pin_id(self):
+        pins_lookup = {"(1 01.00 01.0)": "pin"}
+        misses = LookupMisses("inserts")
+
+        self.assertEqual(extract_wires.lookup_pin_id(pins_lookup, "*1 01.00 01.0*", "n1", misses),
+                         "pin")
+        self.assertEqual(len(misses), 0)
+
+        self.assertEqual(extract_wires.lookup_pin_id({}, "(1 02.00 01.0)", "n1", misses), "")
+        self.assertEqual(misses.counts, {"pin not found": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
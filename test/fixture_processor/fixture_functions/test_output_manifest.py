@@ -0,0 +1,47 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.fixture_processor.fixture_functions import output_manifest as om
+from src.fixture_processor.fixture_processor_form import GenerationTuple
+from src.fixture_processor.options_lib import fixture_processing_options
+
+
+class TestOutputManifest(unittest.TestCase):
+    def test_output_manifest(self):
+        flags = fixture_processing_options.encode_options(
+            {"log_level": "INFO", "wiring_machine": True, "remove_custom_wires": False})
+        generation_flags = GenerationTuple(processing=True, gplane_plot=False, wires_plot=False)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fixture_dir = Path(temp_dir)
+
+            for filename in om.INPUT_FILENAMES:
+                (fixture_dir / filename).write_text(filename)
+
+            output_dir = fixture_dir / "wiring_machine"
+            output_dir.mkdir()
+
+            target_manifest = om.get_target_manifest(
+                fixture_dir, "wiring_machine", flags, generation_flags)
+            self.assertFalse(om.is_up_to_date(target_manifest))
+
+            for output_file in target_manifest.output_files:
+                output_file.write_text("output")
+            om.save_manifest(target_manifest)
+
+            self.assertTrue(om.is_up_to_date(target_manifest))
+
+            # the log level does not change the output.
+            target_manifest = om.get_target_manifest(
+                fixture_dir, "wiring_machine", flags._replace(log_level="DEBUG"), generation_flags)
+            self.assertTrue(om.is_up_to_date(target_manifest))
+
+            (fixture_dir / "wires").write_text("changed")
+            target_manifest = om.get_target_manifest(
+                fixture_dir, "wiring_machine", flags, generation_flags)
+            self.assertFalse(om.is_up_to_date(target_manifest))
+
+
+if __name__ == "__main__":
+    unittest.main()
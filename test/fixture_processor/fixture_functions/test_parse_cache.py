@@ -0,0 +1,28 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.fixture_processor.fixture_functions.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def test_parse_cache(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fixture_dir = Path(temp_dir)
+            (fixture_dir / "wires").write_text("wires")
+
+            parse_cache = ParseCache()
+
+            def parse():
+                return (fixture_dir / "wires").read_text()
+
+            self.assertEqual(parse_cache.get("wires", fixture_dir, ["wires"], parse), "wires")
+            self.assertEqual(parse_cache.get("wires", fixture_dir, ["wires"], parse), "wires")
+            self.assertEqual((parse_cache.hits, parse_cache.misses), (1, 1))
+
+            (fixture_dir / "wires").write_text("changed wires")
+            self.assertEqual(parse_cache.get("wires", fixture_dir, ["wires"], parse), "changed wires")
+
+
+if __name__ == "__main__":
+    unittest.main()
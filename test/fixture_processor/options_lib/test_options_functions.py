@@ -1,5 +1,10 @@
+import os
 import unittest
+import tempfile
+from pathlib import Path
+
 from src.fixture_processor.options_lib import options_functions
+from src.fixture_processor.options_lib import program_options
 
 class TestOptionsFunctions(unittest.TestCase):
     def test_options_functions(self):
@@ -7,6 +12,53 @@ class TestOptionsFunctions(unittest.TestCase):
         self.assertEqual(result,4)
         # options_functions()
 
+    def test_options_form_cache(self):
+        p_options = options_functions.generate_option_functions(
+            program_options.get_section_comments(), program_options.get_options())
+
+        # any options form reads its user options through a cache.
+        form = options_functions.OptionsForm(p_options)
+
+        self.assertIs(form.options_functions, p_options)
+        self.assertIsInstance(form.user_options_cache, options_functions.CachedOptions)
+        self.assertIs(form.user_options_cache.load_options, p_options.load)
+
+    def test_cached_options(self):
+        p_options = options_functions.generate_option_functions(
+            program_options.get_section_comments(), program_options.get_options())
+
+        loads = []
+
+        def load_options(file_handle):
+            loads.append(file_handle.name)
+            return p_options.load(file_handle)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_path = Path(temp_dir) / "config.ini"
+            cache = options_functions.CachedOptions(load_options, config_path)
+
+            # there is no options file yet.
+            self.assertIsNone(cache.get())
+
+            with config_path.open("w") as f_config:
+                p_options.save({}, f_config)
+
+            snapshot = cache.get()
+            self.assertIs(cache.get(), snapshot)
+            self.assertEqual(len(loads), 1)
+
+            # the snapshot is read only.
+            with self.assertRaises(TypeError):
+                snapshot["Plot_Colours"]["text_colour"] = "#000000"
+
+            # changing the file loads it again.
+            with config_path.open("w") as f_config:
+                p_options.save({"Plot_Colours": {"text_colour": "#123456"}}, f_config)
+            os.utime(config_path, ns=(0, 0))
+
+            self.assertEqual(cache.get()["Plot_Colours"]["text_colour"], "#123456")
+            self.assertEqual(len(loads), 2)
+
 
 
 
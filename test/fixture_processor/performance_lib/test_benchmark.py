@@ -0,0 +1,49 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.fixture_processor.fixture_functions import fixture_processing as fp
+from src.fixture_processor.performance_lib import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_fit_complexity(self):
+        exponent, r_squared = benchmark.fit_complexity(
+            [(size, 3e-9 * size ** 2) for size in (1000, 10000, 100000)])
+
+        self.assertAlmostEqual(exponent, 2)
+        self.assertAlmostEqual(r_squared, 1)
+
+        self.assertIsNone(benchmark.fit_complexity([(1000, 0.1)]))
+
+    def test_spec_for_wires(self):
+        for wires in benchmark.BENCHMARK_SIZES:
+            spec = benchmark.spec_for_wires(wires)
+            node_wires = spec.boards * spec.nodes * (spec.probes_per_node + 1)
+
+            self.assertAlmostEqual(node_wires / wires, 1, delta=0.05)
+
+    def test_run_benchmarks(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report = benchmark.run_benchmarks((200, 400), measure_memory=False)
+            json_path = benchmark.write_report(report, Path(temp_dir))
+
+            self.assertEqual(json.loads(json_path.read_text()), report)
+            self.assertTrue(json_path.with_suffix(".md").is_file())
+
+        # every transform is benchmarked.
+        stages = benchmark.get_stage_names(report["runs"])
+        for name, _, _ in fp.get_transforms():
+            self.assertIn(name, stages)
+
+        for stage in ("get_fixture_info", "output_wires_inserts", "output_fixture_plot"):
+            self.assertIn(stage, report["fits"])
+
+        self.assertIn("| get_fixture_info |", benchmark.format_report(report))
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
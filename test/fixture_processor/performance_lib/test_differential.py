@@ -0,0 +1,121 @@
+import decimal
+import unittest
+import tempfile
+from pathlib import Path
+from collections import namedtuple
+
+from src.fixture_processor.performance_lib import differential as df
+from src.fixture_processor.performance_lib import differential_driver as dd
+from src.fixture_processor.performance_lib import synthetic_fixture as sf
+
+
+class TestDifferential(unittest.TestCase):
+    def test_normalise(self):
+        Point = namedtuple("Point", ["x_coord", "y_coord"])
+
+        structure = {"b": [Point(1, 2)], "a": ({"z", "y"}, decimal.Decimal("1.50"))}
+
+        self.assertEqual(dd.normalise(structure),
+                         [["b", [{"x_coord": 1, "y_coord": 2}]],
+                          ["a", [["y", "z"], "1.50"]]])
+
+    def test_driver_checkpoints(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            driver = dd.Driver(temp_dir)
+            driver.mode = "processing"
+
+            self.assertEqual(driver.run("parsing", lambda path: [path], "fixture"), ["fixture"])
+            self.assertEqual(driver.run("fixture plot: finalising", lambda data: data + [1], [0]), [0, 1])
+            driver.run("verifier: finalising", lambda data: data, [2])
+
+            # the stages are timed without the target, the targets are
+            # saved before they are finalised.
+            self.assertEqual(list(driver.stages), ["parsing", "finalising"])
+            self.assertEqual(driver.checkpoints,
+                             ["parsed", "processing/fixture_plot", "processing/verifier"])
+            self.assertEqual((Path(temp_dir) / dd.STRUCTURES_FOLDER /
+                              "processing__fixture_plot.json").read_text(), "[\n 0\n]")
+
+    def test_compare_output_ignores_date_line(self):
+        legacy = b"header\nAGILENT ICT FIXTURE WIRING REPORT   Mon Oct 19 07:22:26 2026\nwire\n"
+        candidate = b"header\nAGILENT ICT FIXTURE WIRING REPORT   Tue Oct 20 08:00:00 2026\nwire\n"
+
+        self.assertEqual(df.compare_output(legacy, candidate), "")
+
+        self.assertEqual(df.compare_output(legacy, candidate.replace(b"wire\n", b"wires\n")),
+                         "line 3: b'wire' != b'wires'")
+        self.assertEqual(df.compare_output(legacy, legacy.replace(b"\n", b"\r\n")),
+                         "line 1: the line endings differ")
+        self.assertEqual(df.compare_output(legacy, legacy + b"extra\n"),
+                         "3 lines != 4 lines")
+
+    def test_diff_structures(self):
+        legacy = {"wires": [{"length": "3.5"}, {"length": "1.0"}], "size": "Full"}
+        candidate = {"wires": [{"length": "3.5"}, {"length": "2.0"}, {}], "size": "Full"}
+
+        self.assertEqual(list(df.diff_structures(legacy, candidate)),
+                         [("$.wires", "2 items != 3 items"),
+                          ("$.wires[1].length", "'1.0' != '2.0'")])
+
+        self.assertEqual(list(df.diff_structures(legacy, legacy)), [])
+
+    def test_shrink_lines(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "wires"
+            file_path.write_text("".join(f"line {number}\n" for number in range(40)))
+
+            # the 'failure' needs lines 7 and 31.
+            def still_fails():
+                lines = file_path.read_text().splitlines()
+                return "line 7" in lines and "line 31" in lines
+
+            df.shrink_lines(temp_dir, "wires", still_fails)
+
+            self.assertEqual(file_path.read_text(), "line 7\nline 31\n")
+
+    def test_shrink_spec(self):
+        spec = sf.FixtureSpec(boards=4, nodes=40, user_modifications=10)
+
+        # the 'failure' needs at least 2 boards, and 5 nodes.
+        shrunk = df.shrink_spec(spec, lambda new_spec: new_spec.boards >= 2 and new_spec.nodes >= 5)
+
+        self.assertEqual(shrunk.boards, 2)
+        self.assertEqual(shrunk.nodes, 5)
+        self.assertEqual(shrunk.user_modifications, 0)
+        self.assertEqual(shrunk.pins_per_node, 1)
+
+    def test_same_version_matches(self):
+        spec = sf.FixtureSpec(boards=1, nodes=6, user_modifications=2)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fixture_dir = Path(temp_dir) / "synthetic"
+            sf.write_synthetic_fixture(fixture_dir, spec)
+
+            result = df.check_fixture(fixture_dir, df.REPOSITORY_DIR, df.REPOSITORY_DIR,
+                                      Path(temp_dir) / "work", df.SYNTHETIC_OPTIONS)
+
+            self.assertEqual(result.legacy.error, "")
+            self.assertEqual(result.differences, [])
+            self.assertIn("parsed", result.candidate.checkpoints)
+            self.assertIn("parsing", result.candidate.stages)
+            self.assertIn("processing/wiring_machine", result.candidate.checkpoints)
+            self.assertIn("output_wires", result.candidate.stages)
+
+            # a changed output is found.
+            wires_path = result.candidate.outputs_dir / "wiring_machine" / "wires"
+            wires_path.write_bytes(wires_path.read_bytes() + b"extra\n")
+
+            differences = df.compare_runs(result.legacy, result.candidate)
+            self.assertEqual([(difference.kind, difference.name) for difference in differences],
+                             [("output", "wiring_machine/wires")])
+
+            self.assertEqual(df.compare_runs(result.legacy, result.candidate,
+                                             ignore=["*/wires"]), [])
+
+            report = df.format_report([result])
+            self.assertIn("## synthetic: MATCH", report)
+            self.assertIn("| total |", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import sys
+import unittest
+import tempfile
+from pathlib import Path
+from typing import NamedTuple
+
+from src.fixture_processor.performance_lib import memory_report as mr
+from src.fixture_processor.performance_lib import synthetic_fixture as sf
+
+
+class Point(NamedTuple):
+    x: int
+    y: int
+
+
+class Slotted:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class TestMemoryReport(unittest.TestCase):
+    def test_deep_sizeof(self):
+        name = "a fairly long name, which is not interned"
+        point = Point(1000, 2000)
+
+        self.assertEqual(mr.deep_sizeof([name, name]),
+                         sys.getsizeof([name, name]) + sys.getsizeof(name))
+
+        self.assertEqual(mr.deep_sizeof({name: point}),
+                         sys.getsizeof({name: point}) + sys.getsizeof(name)
+                         + sys.getsizeof(point) + sys.getsizeof(1000) + sys.getsizeof(2000))
+
+        slotted = Slotted(name)
+        self.assertEqual(mr.deep_sizeof(slotted), sys.getsizeof(slotted) + sys.getsizeof(name))
+
+    def test_exclusive_size(self):
+        points = [Point(1000 + number, 2000) for number in range(10)]
+        lookup = {number: point for number, point in enumerate(points)}
+
+        (points_size, lookup_size), object_counts = mr.get_structure_sizes(
+            {"points": points, "lookup": lookup})
+
+        self.assertEqual(points_size.exclusive_size, points_size.deep_size)
+
+        # the points are only counted once.
+        self.assertLess(lookup_size.exclusive_size, lookup_size.deep_size)
+        self.assertEqual(object_counts["Point"][0], 10)
+
+    def test_measure_fixture(self):
+        spec = sf.FixtureSpec(boards=2, nodes=10, ground_nodes=1, top_probes=1)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            synthetic = sf.write_synthetic_fixture(Path(temp_dir), spec)
+            report = mr.measure_fixture(Path(temp_dir), top=5)
+
+        structures = {structure["name"]: structure for structure in report["structures"]}
+
+        self.assertEqual(structures["bottom_wires"]["items"], synthetic.bottom_wires)
+        self.assertEqual(structures["bottom_inserts"]["items"], synthetic.bottom_inserts)
+        self.assertGreater(structures["pins_lookup"]["deep_size"], 0)
+
+        self.assertEqual([stage["stage"] for stage in report["stages"]],
+                         ["fixture.o", "inserts", "wires"])
+
+        for stage in report["stages"]:
+            self.assertTrue(stage["top_sites"])
+            self.assertLessEqual(len(stage["top_sites"]), 5)
+
+        self.assertIn("| Deep size", mr.format_report(report))
+
+        comparison = mr.compare_reports(report, report)
+        self.assertIn("pins_lookup", comparison)
+        self.assertIn("+0.0%", comparison)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import copy
+import unittest
+
+from src.fixture_processor.performance_lib import regression_gate as rg
+
+
+def make_report(calibration, seconds, peak_memory=0):
+    "a report with a single run, seconds is {stage: seconds}."
+
+    return {"calibration": calibration,
+            "runs": [{"target_wires": 1000,
+                      "stages": [{"stage": stage, "seconds": stage_seconds,
+                                  "peak_memory": peak_memory, "error": ""}
+                                 for stage, stage_seconds in seconds.items()]}]}
+
+
+class TestRegressionGate(unittest.TestCase):
+    def setUp(self):
+        self.baseline = make_report(0.02, {"get_fixture_info": 1.0,
+                                           "modify_inserts": 0.5,
+                                           "remove_ground_wires": 0.001})
+
+    def get_statuses(self, current, **kwargs):
+        comparisons = rg.compare_reports(self.baseline, current, **kwargs)
+        return {comparison.stage: comparison.status for comparison in comparisons}
+
+    def test_slower_stage_fails(self):
+        current = make_report(0.02, {"get_fixture_info": 1.0,
+                                     "modify_inserts": 1.0,
+                                     "remove_ground_wires": 0.01})
+
+        statuses = self.get_statuses(current)
+
+        self.assertEqual(statuses, {"get_fixture_info": "OK",
+                                    "modify_inserts": "FAILED",
+                                    "remove_ground_wires": "SKIPPED"})
+
+        comparisons = rg.compare_reports(self.baseline, current)
+        self.assertFalse(rg.gate_passed(comparisons))
+        self.assertIn("| FAILED", rg.format_comparisons(comparisons))
+
+        # within a larger tolerance.
+        self.assertEqual(self.get_statuses(current, tolerance=1.5)["modify_inserts"], "OK")
+
+    def test_slower_machine_passes(self):
+        # everything (including the calibration) is twice as slow.
+        current = make_report(0.04, {"get_fixture_info": 2.0,
+                                     "modify_inserts": 1.0,
+                                     "remove_ground_wires": 0.002,
+                                     "output_fixture_plot": 3.0})
+
+        statuses = self.get_statuses(current)
+
+        self.assertEqual(statuses["get_fixture_info"], "OK")
+        self.assertEqual(statuses["modify_inserts"], "OK")
+        self.assertEqual(statuses["output_fixture_plot"], "NEW")
+        self.assertTrue(rg.gate_passed(rg.compare_reports(self.baseline, current)))
+
+    def test_memory_growth_fails(self):
+        baseline = make_report(0.02, {"get_fixture_info": 1.0}, peak_memory=1000)
+        current = make_report(0.02, {"get_fixture_info": 1.0}, peak_memory=2000)
+
+        comparisons = rg.compare_reports(baseline, current)
+        self.assertEqual(comparisons[0].status, "FAILED")
+
+        # not compared, if it was not measured.
+        current = make_report(0.02, {"get_fixture_info": 1.0})
+        self.assertEqual(rg.compare_reports(baseline, current)[0].status, "OK")
+
+    def test_merge_reports(self):
+        slower = copy.deepcopy(self.baseline)
+        slower["calibration"] = 0.03
+        for stage_result in slower["runs"][0]["stages"]:
+            stage_result["seconds"] *= 2
+
+        merged = rg.merge_reports([slower, self.baseline])
+
+        self.assertEqual(merged["calibration"], 0.02)
+        self.assertEqual(rg.get_stage_results(merged), rg.get_stage_results(self.baseline))
+
+    def test_baseline(self):
+        baseline = rg.load_report(rg.BASELINE_PATH)
+
+        self.assertGreater(baseline["calibration"], 0)
+        self.assertEqual(tuple(run["target_wires"] for run in baseline["runs"]), rg.GATE_SIZES)
+
+        # the baseline passes against itself.
+        self.assertTrue(rg.gate_passed(rg.compare_reports(baseline, baseline)))
+
+
+if __name__ == "__main__":
+    unittest.main()
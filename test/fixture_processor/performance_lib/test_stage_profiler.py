@@ -0,0 +1,71 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.fixture_processor.batch_processor import process_fixture
+from src.fixture_processor.performance_lib import stage_profiler as sp
+from src.fixture_processor.performance_lib import synthetic_fixture as sf
+
+
+def leaf(count):
+    return sum(range(count))
+
+
+def branch(count):
+    return leaf(count) + leaf(count * 2)
+
+
+class TestStageProfiler(unittest.TestCase):
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            profiler = sp.StageProfiler(Path(temp_dir) / "run", top=5, collapsed=True)
+
+            self.assertEqual(profiler.run("verifier: branch", branch, 20000), branch(20000))
+            profiler.run("verifier: branch", branch, 10)
+            profiler.run("leaf", leaf, 10)
+
+            summary_path = profiler.write()
+
+            pstats_files = sorted(path.name for path in summary_path.parent.glob("*.pstats"))
+            self.assertEqual(pstats_files, ["01_verifier_branch.pstats", "02_leaf.pstats"])
+
+            summary = summary_path.read_text()
+            collapsed = (summary_path.parent / sp.COLLAPSED_FILENAME).read_text()
+
+        self.assertIn("===== verifier: branch =====", summary)
+        self.assertIn("function calls", summary)
+
+        # each line is "frame;...;frame microseconds".
+        stacks = dict(line.rsplit(" ", 1) for line in collapsed.splitlines())
+        self.assertTrue(any(stack.startswith("verifier: branch;branch (")
+                            and ";leaf (" in stack for stack in stacks))
+
+    def test_nothing_profiled(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.assertIsNone(sp.StageProfiler(Path(temp_dir) / "run").write())
+            self.assertFalse((Path(temp_dir) / "run").exists())
+
+    def test_profile_processing(self):
+        spec = sf.FixtureSpec(boards=2, nodes=10, ground_nodes=1, top_probes=1)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fixture_dir = Path(temp_dir) / "fixture"
+            sf.write_synthetic_fixture(fixture_dir, spec)
+
+            profile_options = sp.ProfileOptions(Path(temp_dir) / "profiles")
+            result = process_fixture(fixture_dir, profile_options)
+
+            self.assertTrue(result.success, result.message)
+
+            run_dir, = (Path(temp_dir) / "profiles").iterdir()
+            self.assertTrue(run_dir.name.startswith("fixture_"))
+
+            summary = (run_dir / sp.SUMMARY_FILENAME).read_text()
+
+        for stage in ("parsing", "wiring_machine: remove_terminal_wires",
+                      "verifier: output_wires", "verifier: output_inserts"):
+            self.assertIn(f"===== {stage} =====", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.fixture_processor.fixture_functions import extract_wires as ew
+from src.fixture_processor.performance_lib import synthetic_fixture as sf
+
+
+class TestSyntheticFixture(unittest.TestCase):
+    def check_fixture(self, spec):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            synthetic = sf.write_synthetic_fixture(Path(temp_dir), spec)
+
+            fixture_data, throughput_multiplier, _ = ew.get_fixture_info(Path(temp_dir))
+
+        # the parsed fixture matches what was written.
+        self.assertEqual(len(fixture_data.bottom_inserts), synthetic.bottom_inserts)
+        self.assertEqual(len(fixture_data.top_inserts), synthetic.top_inserts)
+        self.assertEqual(len(fixture_data.bottom_wires), synthetic.bottom_wires)
+        self.assertEqual(len(fixture_data.top_wires), synthetic.top_wires)
+        self.assertEqual(tuple(fixture_data.ground_nodes), synthetic.ground_nodes)
+
+        # every pin is matched with its fixture PinID.
+        for insert in fixture_data.bottom_inserts.values():
+            if insert._is_pin:
+                self.assertIsInstance(insert.fix_id.brc, ew.fm.PinID)
+
+        offset_pins = sum(insert.insert_type == "Offset"
+                          for insert in fixture_data.bottom_inserts.values())
+
+        return synthetic, throughput_multiplier, offset_pins
+
+    def test_synthetic_fixture(self):
+        spec = sf.FixtureSpec(boards=4, nodes=10, ground_nodes=2, top_probes=2)
+        synthetic, throughput_multiplier, offset_pins = self.check_fixture(spec)
+
+        pins = 4 * 10 * spec.pins_per_node
+        probes = 4 * 10 * spec.probes_per_node
+        transfers = 4 * 2
+
+        self.assertEqual(synthetic.bottom_inserts, pins + probes + transfers)
+        self.assertEqual(synthetic.top_inserts, 2 * transfers)
+        self.assertEqual(synthetic.top_wires, transfers)
+        self.assertEqual(offset_pins, (pins - 4 * 2 * spec.pins_per_node) // 10)
+        self.assertFalse(throughput_multiplier)
+
+    def test_manual_throughput_multiplier(self):
+        spec = sf.FixtureSpec(boards=4, nodes=10, ground_nodes=2, top_probes=1,
+                              wiring_method="Manual", throughput_multiplier=True)
+        _, throughput_multiplier, _ = self.check_fixture(spec)
+
+        self.assertTrue(throughput_multiplier)
+
+    def test_too_many_pins(self):
+        spec = sf.FixtureSpec(boards=1, nodes=10000)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValueError):
+                sf.write_synthetic_fixture(Path(temp_dir), spec)
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import threading
+
+from src.fixture_processor.background_task import BackgroundTask
+
+
+def count_to(limit, progress):
+    for number in range(limit):
+        progress(number, limit)
+    return limit
+
+
+def wait_for_cancel(started, progress):
+    started.set()
+    while True:
+        progress()
+
+
+def fail(progress):
+    raise ValueError("invalid fixture")
+
+
+class TestBackgroundTask(unittest.TestCase):
+    def test_done(self):
+        results = []
+        progress = []
+
+        task = BackgroundTask(count_to, 5, on_done=results.append,
+                              on_progress=lambda *args: progress.append(args)).start()
+        task.thread.join()
+
+        self.assertFalse(task.poll())
+        self.assertEqual(results, [5])
+
+        # only the latest progress is passed on.
+        self.assertEqual(progress, [(4, 5)])
+
+    def test_error(self):
+        errors = []
+
+        task = BackgroundTask(fail, on_error=errors.append).start()
+        task.thread.join()
+
+        self.assertFalse(task.poll())
+        self.assertIsInstance(errors[0], ValueError)
+
+    def test_cancel(self):
+        started = threading.Event()
+        results = []
+
+        task = BackgroundTask(wait_for_cancel, started, on_done=results.append,
+                              on_error=results.append).start()
+        started.wait()
+        task.cancel()
+        task.thread.join()
+
+        self.assertFalse(task.poll())
+        self.assertEqual(results, [])
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
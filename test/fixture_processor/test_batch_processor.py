@@ -0,0 +1,36 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.fixture_processor import batch_processor
+
+
+class TestBatchProcessor(unittest.TestCase):
+    def test_find_fixture_dirs(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+
+            for name in ("fix_a", "fix_b"):
+                (temp_path / name).mkdir()
+                (temp_path / name / "fixture.o").touch()
+            (temp_path / "not_a_fixture").mkdir()
+
+            fixture_dirs = batch_processor.find_fixture_dirs(
+                [f"{temp_dir}/*", f"{temp_dir}/fix_a/fixture.o"])
+
+            self.assertEqual([path.name for path in fixture_dirs], ["fix_a", "fix_b"])
+
+    def test_missing_fixture(self):
+        result = batch_processor.process_fixture(Path("no_such_fixture"))
+        self.assertFalse(result.success)
+
+    def test_format_summary(self):
+        results = [batch_processor.BatchResult("fix_a", True, 1.0),
+                   batch_processor.BatchResult("fix_b", False, 2.0, "error")]
+
+        summary = batch_processor.format_summary(results)
+        self.assertIn("1 succeeded (0 up to date), 1 failed", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,7 @@
 import unittest
+import tempfile
+from pathlib import Path
+
 from src.fixture_processor import file_operations
 
 class TestFilOperations(unittest.TestCase):
@@ -7,6 +10,25 @@ class TestFilOperations(unittest.TestCase):
         self.assertEqual(result,4)
         # file_operations()
 
+    def test_write_if_changed(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "wires"
+
+            self.assertTrue(file_operations.write_if_changed(
+                file_path, "DATE 1\nwire 1\n", ignore_prefixes=["DATE"]))
+
+            # only the date has changed.
+            self.assertFalse(file_operations.write_if_changed(
+                file_path, "DATE 2\nwire 1\n", ignore_prefixes=["DATE"]))
+            self.assertEqual(file_path.read_text(), "DATE 1\nwire 1\n")
+
+            self.assertTrue(file_operations.write_if_changed(
+                file_path, "DATE 3\nwire 2\n", ignore_prefixes=["DATE"]))
+            self.assertEqual(file_path.read_text(), "DATE 3\nwire 2\n")
+
+            # no temporary files are left behind.
+            self.assertEqual([path.name for path in Path(temp_dir).iterdir()], ["wires"])
+
 
 
 
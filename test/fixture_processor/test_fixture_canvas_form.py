@@ -1,4 +1,8 @@
 import unittest
+import tkinter as tk
+from types import SimpleNamespace
+from turtle import Vec2D
+
 from src.fixture_processor import fixture_canvas_form
 
 class TestFixtureCanvasForm(unittest.TestCase):
@@ -7,7 +11,63 @@ class TestFixtureCanvasForm(unittest.TestCase):
         self.assertEqual(result,4)
         # fixture_canvas_form()
 
+    def test_canvas_coords(self):
+        locations = [Vec2D(0, 0), Vec2D(10, 5), Vec2D(10, -5)]
+
+        self.assertEqual(fixture_canvas_form.canvas_coords(locations),
+                         [0, 0, 10, -5, 10, 5])
+        self.assertEqual(fixture_canvas_form.canvas_coords(locations, close=True),
+                         [0, 0, 10, -5, 10, 5, 0, 0])
+
+    def test_update_plot(self):
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            self.skipTest("no display available")
+
+        try:
+            window = SimpleNamespace(canvas_width=320, canvas_height=200)
+            fixture_canvas = fixture_canvas_form.FixtureCanvas(window, root)
+
+            colours = ["background_colour", "panel_outline_colour", "board_outline_colour",
+                       "panel_tooling_colour", "board_tooling_colour", "text_colour"]
+            fixture_canvas.program_options = {
+                "Plot_Colours": {colour: "#ffffff" for colour in colours}}
+
+            square = [Vec2D(0, 0), Vec2D(10, 0), Vec2D(10, 10), Vec2D(0, 10)]
+            fixture_canvas.offset_outlines = {"P_1": square, "B_1:1": square, "B_1:2": []}
+            fixture_canvas.offset_tooling = {"B_1:1": [(2, Vec2D(1, 1)), (2, Vec2D(9, 9))]}
+            fixture_canvas.board_center = {"B_1:1": Vec2D(5, 5), "B_1:2": Vec2D(5, 5)}
+            fixture_canvas.panel_fixture = True
+
+            # redrawing replaces the previous items.
+            fixture_canvas.update_plot()
+            fixture_canvas.update_plot()
+
+            canvas = fixture_canvas.cnv_plot
+            self.assertEqual(len(canvas.find_withtag(fixture_canvas_form.PANEL_OUTLINE_TAG)), 1)
+            self.assertEqual(len(canvas.find_withtag(fixture_canvas_form.BOARD_OUTLINE_TAG)), 1)
+            self.assertEqual(len(canvas.find_withtag(fixture_canvas_form.BOARD_TOOLING_TAG)), 2)
+            self.assertEqual(len(canvas.find_withtag(fixture_canvas_form.BOARD_NUMBER_TAG)), 2)
+            self.assertEqual(len(canvas.find_withtag(fixture_canvas_form.PLOT_TAG)), 6)
+
+            # zoom and pan move the existing items.
+            item = canvas.find_withtag(fixture_canvas_form.BOARD_TOOLING_TAG)[0]
+            original_coords = canvas.coords(item)
+
+            fixture_canvas.zoom_view(2, 0, 0)
+            fixture_canvas.pan_view(5, -5)
+            self.assertEqual(canvas.coords(item),
+                             [value * 2 + offset for value, offset
+                              in zip(original_coords, [5, -5, 5, -5])])
+
+            fixture_canvas.reset_view()
+            for value, original in zip(canvas.coords(item), original_coords):
+                self.assertAlmostEqual(value, original)
+        finally:
+            root.destroy()
+
 
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+import tempfile
+from pathlib import Path
+
+from src.fixture_processor.fixture_watcher import FixtureWatcher
+
+
+class TestFixtureWatcher(unittest.TestCase):
+    def test_fixture_watcher(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            fixture_dir = Path(temp_dir)
+            (fixture_dir / "wires").write_text("wires")
+
+            watcher = FixtureWatcher(fixture_dir, debounce_time=1)
+            self.assertEqual(watcher.poll(now=0), set())
+
+            (fixture_dir / "wires").write_text("changed wires")
+            (fixture_dir / "add_wires.csv").write_text("new file")
+
+            # the changes are only reported once they have settled.
+            self.assertEqual(watcher.poll(now=10), set())
+            self.assertEqual(watcher.poll(now=10.5), set())
+            self.assertEqual(watcher.poll(now=11), {"wires", "add_wires.csv"})
+            self.assertEqual(watcher.poll(now=12), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,8 @@
+import logging
 import unittest
+import tempfile
+from pathlib import Path
+
 from src.fixture_processor import helper_functions
 
 class TestHelperFunctions(unittest.TestCase):
@@ -7,6 +11,38 @@ class TestHelperFunctions(unittest.TestCase):
         self.assertEqual(result,4)
         # helper_functions()
 
+    def test_queue_logging(self):
+        logger = logging.getLogger("test_queue_logging")
+        root_level = logging.getLogger().level
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = Path(temp_dir) / "ffp.log"
+            log_path.write_text("the previous log\n")
+
+            queue_logging = helper_functions.QueueLogging(log_path, backup_count=2)
+
+            # the previous log is kept as a backup.
+            queue_logging.rollover()
+            self.assertEqual((Path(temp_dir) / "ffp.log.1").read_text(), "the previous log\n")
+
+            queue_logging.start()
+            try:
+                logger.info("queued %d", 1)
+
+                # shown errors write the log first.
+                with helper_functions.message_box.redirect(lambda *message: None):
+                    helper_functions.message_box.showerror("error", "message")
+
+                self.assertIn("queued 1", log_path.read_text())
+
+                logger.info("written at exit")
+            finally:
+                queue_logging.stop()
+                logging.getLogger().setLevel(root_level)
+
+            self.assertIn("written at exit", log_path.read_text())
+            self.assertIsNone(helper_functions.QueueLogging.active)
+
 
 
 
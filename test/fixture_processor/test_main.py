@@ -0,0 +1,93 @@
+import sys
+import unittest
+import subprocess
+import tkinter as tk
+from pathlib import Path
+from unittest import mock
+
+
+REPOSITORY_DIR = Path(__file__).resolve().parents[2]
+
+# main's (cumulative) import time, as a multiple of the
+# import time of tkinter (imported first, in the same run),
+# it is about 5 (so the budget catches main doubling).
+IMPORT_TIME_BUDGET = 10
+
+# the best of this many runs is compared with the budget.
+IMPORT_TIME_RUNS = 3
+
+# these are only imported once they are used.
+LAZY_MODULES = ("dxfwrite", "turtle", "multiprocessing",
+                "src.fixture_processor.batch_processor",
+                "src.fixture_processor.fixture_functions.extract_wires",
+                "src.fixture_processor.fixture_functions.output_data")
+
+
+def get_import_times(*modules):
+    """
+    imports the modules (in order) in a new interpreter (with -X importtime),
+    returns {module name: cumulative import time (in seconds)}.
+    """
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=REPOSITORY_DIR, capture_output=True, text=True, check=True)
+
+    import_times = {}
+
+    # import time: self [us] | cumulative | imported package
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        if cumulative.strip().isdigit():
+            import_times[name.strip()] = int(cumulative) / 1e6
+
+    return import_times
+
+
+class TestMain(unittest.TestCase):
+    def test_lazy_imports(self):
+        # the window can not appear until main has been imported,
+        # so the slow modules are left until they are used.
+        ratios = []
+
+        for _ in range(IMPORT_TIME_RUNS):
+            import_times = get_import_times("tkinter", "src.fixture_processor.main")
+
+            for module in LAZY_MODULES:
+                self.assertNotIn(module, import_times)
+
+            # tkinter is already imported, so isn't part of main's time.
+            ratios.append(import_times["src.fixture_processor.main"] /
+                          import_times["tkinter"])
+
+        self.assertLess(min(ratios), IMPORT_TIME_BUDGET)
+
+    def test_window_icon(self):
+        from src.fixture_processor import main
+
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            self.skipTest("no display available")
+
+        try:
+            # the icon is loaded from memory, not from a (temporary) file.
+            with mock.patch("tempfile.NamedTemporaryFile", side_effect=AssertionError), \
+                    mock.patch("tkinter.PhotoImage", wraps=tk.PhotoImage) as photo_image:
+                icon_image = main.set_window_icon(root)
+
+                # and is only decoded once.
+                self.assertIs(main.set_window_icon(root), icon_image)
+                self.assertEqual(photo_image.call_count, 1)
+
+            self.assertEqual((icon_image.width(), icon_image.height()), (16, 16))
+        finally:
+            root.destroy()
+
+
+if __name__ == "__main__":
+    unittest.main()